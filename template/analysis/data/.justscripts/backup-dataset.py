@@ -0,0 +1,58 @@
+import argparse
+import yaml
+from datetime import datetime
+from pathlib import Path
+
+from ingest import copy_and_hash
+
+BACKUP_DIR = Path("10_backups/timestamped")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Create a timestamped, checksummed backup of a dataset.")
+    parser.add_argument("path", help="Dataset file to back up")
+    parser.add_argument("name", help="Backup name")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    source_path = Path(args.path)
+    backup_name = args.name
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    if not source_path.exists():
+        print(f"❌ Source file not found: {source_path}")
+        exit(1)
+
+    # Create backup directory
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Create backup filename
+    backup_file = BACKUP_DIR / f"{backup_name}_{timestamp}{source_path.suffix}"
+
+    # Copy file, hashing in the same pass
+    checksum, size_bytes = copy_and_hash(source_path, backup_file)
+
+    # Create backup metadata
+    metadata = {
+        'backup_name': backup_name,
+        'source_file': str(source_path),
+        'backup_file': str(backup_file),
+        'created_at': datetime.now().isoformat(),
+        'checksum': checksum,
+        'size_bytes': size_bytes
+    }
+
+    # Save metadata
+    metadata_file = BACKUP_DIR / f"{backup_name}_{timestamp}.metadata.yaml"
+    with open(metadata_file, 'w') as f:
+        yaml.dump(metadata, f, default_flow_style=False)
+
+    print(f"💾 Created backup: {backup_file}")
+    print(f"📄 Metadata: {metadata_file}")
+    print(f"🔒 Checksum: {checksum}")
+
+
+if __name__ == "__main__":
+    main()
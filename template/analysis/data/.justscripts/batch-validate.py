@@ -0,0 +1,239 @@
+import argparse
+import glob
+import importlib.util
+import os
+import sys
+import time
+import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from report_cache import file_checksum
+from storage import READABLE_SUFFIXES
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DATA_REGISTRY = Path("data_registry.yaml")
+SUMMARY_DIR = Path("08_reporting")
+SUPPORTED_SUFFIXES = READABLE_SUFFIXES
+STAGES = ('validate', 'profile', 'quality')
+
+
+def load_script(name):
+    """Import one of the hyphenated .justscripts as a module."""
+    module_name = name.replace('-', '_')
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+validate_dataset = load_script("validate-dataset")
+profile_dataset = load_script("profile-dataset")
+quality_report = load_script("quality-report")
+
+
+def discover_from_patterns(patterns):
+    files = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.rglob("*")
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+        files.update(p for p in candidates if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES)
+    return sorted(files)
+
+
+def discover_from_registry(registry_file):
+    if not registry_file.exists():
+        return []
+    with open(registry_file, 'r') as f:
+        registry = yaml.safe_load(f) or {}
+    return sorted(
+        Path(info['path']) for info in (registry.get('datasets') or {}).values()
+        if info.get('status', 'active') == 'active' and Path(info['path']).suffix.lower() in SUPPORTED_SUFFIXES
+    )
+
+
+def process_dataset(filepath, stages, use_cache=True):
+    """Load one dataset once and run every requested stage on the shared frame."""
+    filepath = Path(filepath)
+    started = time.perf_counter()
+    entry = {'filepath': str(filepath), 'status': 'ok', 'reports': {}, 'cached': []}
+    validation = profile = None
+
+    try:
+        checksum = file_checksum(filepath)
+        validation_cache = validate_dataset.report_cache(stream=False)
+        profile_cache = profile_dataset.report_cache()
+        if use_cache and 'validate' in stages:
+            validation = validation_cache.get(checksum, filepath)
+        if use_cache and 'profile' in stages:
+            profile = profile_cache.get(checksum, filepath)
+
+        # Unchanged files never get parsed when every computed stage is cached
+        df = None
+        if ('validate' in stages and validation is None) or ('profile' in stages and profile is None):
+            df = validate_dataset.load_dataset(filepath)
+            entry['shape'] = list(df.shape)
+    except Exception as e:
+        entry.update({'status': 'error', 'error': f"Error loading file: {e}",
+                      'seconds': round(time.perf_counter() - started, 3)})
+        return entry
+
+    try:
+        if 'validate' in stages:
+            if validation is None:
+                validation = validate_dataset.validate_frame(df, filepath)
+                validation_cache.put(checksum, validation)
+            else:
+                entry['cached'].append('validate')
+            entry['shape'] = validation['basic_info']['shape']
+            entry['reports']['validation'] = str(validate_dataset.save_report(validation, filepath))
+            entry['overall_score'] = validation['quality_metrics']['overall_score']
+            entry['issues'] = len(validation['issues'])
+
+        if 'profile' in stages:
+            if profile is None:
+                profile = profile_dataset.profile_frame(df, filepath)
+                profile_cache.put(checksum, profile)
+            else:
+                entry['cached'].append('profile')
+            entry.setdefault('shape', profile['dataset_info']['shape'])
+            entry['reports']['profile'] = str(profile_dataset.save_profile(profile, filepath))
+
+        if 'quality' in stages:
+            # Stages not run in this batch fall back to whatever is already on disk
+            stored_validation, stored_profile = quality_report.load_inputs(filepath)
+            report = quality_report.build_report(filepath,
+                                                 validation if validation is not None else stored_validation,
+                                                 profile if profile is not None else stored_profile)
+            yaml_file, html_file = quality_report.save_report(report, filepath)
+            entry['reports']['quality'] = str(yaml_file)
+            entry['reports']['quality_html'] = str(html_file)
+            entry['recommendations'] = len(report['recommendations'])
+    except Exception as e:
+        entry.update({'status': 'error', 'error': str(e)})
+
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def run_batch(files, stages, workers, use_cache=True):
+    results = []
+    if workers <= 1:
+        for filepath in files:
+            results.append(process_dataset(filepath, stages, use_cache))
+            print_progress(results[-1], len(results), len(files))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_dataset, str(filepath), stages, use_cache) for filepath in files]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print_progress(results[-1], len(results), len(files))
+    return results
+
+
+def print_progress(entry, done, total):
+    icon = "✅" if entry['status'] == 'ok' else "❌"
+    detail = entry['error'] if 'error' in entry else f"score {entry.get('overall_score', '-')}"
+    if entry.get('cached'):
+        detail += f" (cached: {', '.join(entry['cached'])})"
+    print(f"   {icon} [{done}/{total}] {entry['filepath']} ({entry['seconds']}s) {detail}")
+
+
+def build_summary(results, stages, workers, elapsed):
+    results = sorted(results, key=lambda entry: entry['filepath'])
+    stems = {}
+    for entry in results:
+        stems.setdefault(Path(entry['filepath']).stem, []).append(entry['filepath'])
+
+    scores = [entry['overall_score'] for entry in results if 'overall_score' in entry]
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'stages': list(stages),
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'totals': {
+            'datasets': len(results),
+            'succeeded': sum(entry['status'] == 'ok' for entry in results),
+            'failed': sum(entry['status'] != 'ok' for entry in results),
+            'cache_hits': sum(len(entry.get('cached', [])) for entry in results),
+            'mean_overall_score': round(sum(scores) / len(scores), 2) if scores else None,
+            'min_overall_score': min(scores) if scores else None
+        },
+        # Reports are named by file stem, so same-named files overwrite each other
+        'stem_collisions': {stem: paths for stem, paths in stems.items() if len(paths) > 1},
+        'datasets': results
+    }
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Validate, profile and quality-report many datasets in parallel."
+    )
+    parser.add_argument("patterns", nargs="*",
+                        help="Files, directories or glob patterns (e.g. '01_raw/**/*.csv')")
+    parser.add_argument("--registry", nargs="?", const=str(DATA_REGISTRY), default=None,
+                        help=f"Also take active datasets from the registry (default: {DATA_REGISTRY})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute every report even for unchanged files")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    stages = tuple(stage for stage in STAGES if stage in args.stages.split(","))
+
+    if not stages:
+        print(f"❌ No valid stages in '{args.stages}'. Choose from: {', '.join(STAGES)}")
+        exit(1)
+
+    files = discover_from_patterns(args.patterns)
+    if args.registry:
+        files = sorted(set(files) | set(discover_from_registry(Path(args.registry))))
+
+    if not files:
+        print("📝 No datasets matched.")
+        exit(1)
+
+    workers = max(1, min(args.workers, len(files)))
+    print(f"🚀 Processing {len(files)} datasets with {workers} workers ({', '.join(stages)})")
+
+    started = time.perf_counter()
+    results = run_batch(files, stages, workers, not args.no_cache)
+    summary = build_summary(results, stages, workers, time.perf_counter() - started)
+
+    SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
+    summary_file = SUMMARY_DIR / f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
+    with open(summary_file, 'w') as f:
+        yaml.dump(summary, f, default_flow_style=False)
+
+    totals = summary['totals']
+    print(f"\n📊 Batch Results:")
+    print(f"   Datasets: {totals['datasets']} ({totals['succeeded']} ok, {totals['failed']} failed)")
+    print(f"   Cached reports reused: {totals['cache_hits']}")
+    if totals['mean_overall_score'] is not None:
+        print(f"   Mean overall score: {totals['mean_overall_score']:.1f}/100")
+    print(f"   Elapsed: {summary['elapsed_seconds']:.1f}s")
+    if summary['stem_collisions']:
+        print(f"\n⚠️  Files sharing a name overwrite each other's reports:")
+        for stem, paths in summary['stem_collisions'].items():
+            print(f"   - {stem}: {', '.join(paths)}")
+
+    print(f"\n📄 Summary saved: {summary_file}")
+
+    if totals['failed']:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
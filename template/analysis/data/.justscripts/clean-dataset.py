@@ -0,0 +1,355 @@
+import argparse
+import tempfile
+import numpy as np
+import yaml
+from datetime import datetime
+from pathlib import Path
+
+from storage import SUFFIXES, export_csv, read_table, table_path, write_table
+from streaming import DEFAULT_MEMORY_BUDGET_MB
+
+TARGET_DIR = Path("02_intermediate/023_cleaned")
+ENGINES = ('pandas', 'duckdb')
+
+# pandas.read_csv's default NA markers, so both engines see the same missing cells
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+# Types pandas.read_csv infers on its own (dates stay text)
+CSV_TYPE_CANDIDATES = ['BOOLEAN', 'BIGINT', 'DOUBLE', 'VARCHAR']
+DUCKDB_NUMERIC_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                        'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'DECIMAL')
+
+
+def clean_frame(df):
+    """Drop duplicates, impute missing values and remove IQR outliers."""
+    cleaning_log = []
+
+    # Remove duplicate rows
+    duplicates_before = int(df.duplicated().sum())
+    df = df.drop_duplicates()
+    if duplicates_before > 0:
+        cleaning_log.append(f"Removed {duplicates_before} duplicate rows")
+
+    # Handle missing values (basic strategy)
+    missing_before = int(df.isnull().sum().sum())
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    categorical_cols = df.select_dtypes(include=['object']).columns
+
+    fill_values = {}
+
+    # Fill numeric columns with median
+    for col in numeric_cols:
+        if df[col].isnull().any():
+            median_val = df[col].median()
+            fill_values[col] = median_val
+            cleaning_log.append(f"Filled missing values in '{col}' with median ({median_val})")
+
+    # Fill categorical columns with mode
+    for col in categorical_cols:
+        if df[col].isnull().any():
+            mode_val = df[col].mode().iloc[0] if not df[col].mode().empty else 'Unknown'
+            fill_values[col] = mode_val
+            cleaning_log.append(f"Filled missing values in '{col}' with mode ('{mode_val}')")
+
+    # One fillna for every column instead of a copy per column
+    if fill_values:
+        df = df.fillna(fill_values)
+
+    missing_after = int(df.isnull().sum().sum())
+
+    # Remove outliers using IQR method for numeric columns
+    outliers_removed = 0
+    for col in numeric_cols:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        outlier_mask = (df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)
+        outliers_in_col = int(outlier_mask.sum())
+        if outliers_in_col > 0:
+            df = df[~outlier_mask]
+            outliers_removed += outliers_in_col
+            cleaning_log.append(f"Removed {outliers_in_col} outliers from '{col}'")
+
+    statistics = {
+        'duplicates_removed': duplicates_before,
+        'missing_values_before': missing_before,
+        'missing_values_after': missing_after,
+        'outliers_removed': outliers_removed
+    }
+    return df, cleaning_log, statistics
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _double(value):
+    # Quoted so inf and nan survive as DOUBLE literals
+    return f"CAST('{float(value)!r}' AS DOUBLE)"
+
+
+def _duckdb_source(con, source_path):
+    """
+    Materialise the source as a DuckDB table whose rowid follows file order.
+
+    Returns the columns pandas would load as object although DuckDB gave
+    them another type (e.g. all-null Parquet columns).
+    """
+    suffix = source_path.suffix.lower()
+    object_cols = set()
+    if suffix == '.csv':
+        relation = con.read_csv(str(source_path), header=True, na_values=CSV_NA_VALUES,
+                                auto_type_candidates=CSV_TYPE_CANDIDATES)
+    elif suffix == '.parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        object_cols = {field.name for field in pq.read_schema(source_path) if pa.types.is_null(field.type)}
+        relation = con.read_parquet(str(source_path))
+    elif suffix in ['.feather', '.xlsx', '.xls']:
+        # No native reader: load through pandas and hand the frame over
+        df = read_table(source_path)
+        object_cols = set(df.select_dtypes(include=['object']).columns)
+        relation = con.from_df(df)
+    else:
+        raise ValueError(f"Unsupported file format: {source_path.suffix}")
+    relation.create('source')
+    return object_cols
+
+
+def clean_with_duckdb(source_path, target_file, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Run the clean_frame plan in DuckDB, spilling to disk beyond the memory budget.
+
+    The deduplicated rows are stored once (in a temporary database that
+    spills to disk); imputation and outlier filtering are composed as views
+    over them and the result is written by a single COPY, so the table is
+    never copied per step. The IQR fences of each column are
+    computed on the rows left by the previous columns, exactly like the
+    pandas loop, which takes one aggregate pass per numeric column.
+
+    Returns:
+        Tuple of (original_shape, cleaned_shape, cleaning_log, statistics)
+    """
+    import duckdb
+
+    cleaning_log = []
+    with tempfile.TemporaryDirectory(prefix="tmp_clean_") as workdir:
+        con = duckdb.connect(str(Path(workdir) / "clean.duckdb"))
+        con.execute(f"SET memory_limit = '{memory_budget_mb}MB'")
+        # Filtered scans of a table then keep its row order without another sort
+        con.execute("SET preserve_insertion_order = true")
+        object_cols = _duckdb_source(con, source_path)
+
+        schema = con.execute("SELECT column_name, data_type FROM information_schema.columns "
+                             "WHERE table_name = 'source' ORDER BY ordinal_position").fetchall()
+        schema = [(name, 'VARCHAR' if name in object_cols else dtype) for name, dtype in schema]
+        columns = [name for name, _ in schema]
+        quoted = {col: _quote(col) for col in columns}
+        all_cols = ", ".join(quoted[col] for col in columns)
+        rows_before = con.execute("SELECT count(*) FROM source").fetchone()[0]
+
+        # Remove duplicate rows, keeping the first occurrence (NULLs compare equal).
+        # Materialised once because every later step scans it.
+        con.execute(f"CREATE TABLE deduped AS SELECT rowid AS __row, * FROM source WHERE rowid IN "
+                    f"(SELECT min(rowid) FROM source GROUP BY {all_cols}) ORDER BY __row")
+        con.execute("DROP TABLE source")
+
+        # One pass for row count, per-column nulls and every numeric median
+        aggregates = ["count(*)"] + [f"count(*) - count({quoted[col]})" for col in columns]
+        numeric_candidates = [col for col, dtype in schema if dtype.split('(')[0] in DUCKDB_NUMERIC_TYPES]
+        aggregates += [f"median({quoted[col]})" for col in numeric_candidates]
+        stats = con.execute(f"SELECT {', '.join(aggregates)} FROM deduped").fetchone()
+        rows_deduped = stats[0]
+        nulls = dict(zip(columns, stats[1:1 + len(columns)]))
+        medians = dict(zip(numeric_candidates, stats[1 + len(columns):]))
+
+        duplicates_before = rows_before - rows_deduped
+        if duplicates_before > 0:
+            cleaning_log.append(f"Removed {duplicates_before} duplicate rows")
+
+        # Handle missing values (basic strategy); all-empty CSV columns are float NaN to pandas
+        missing_before = sum(nulls.values())
+        dtypes = dict(schema)
+        empty_cols = [col for col in columns if source_path.suffix.lower() == '.csv' and dtypes[col] == 'VARCHAR'
+                      and rows_deduped and nulls[col] == rows_deduped]
+        numeric_cols = [col for col in columns if col in medians or col in empty_cols]
+        # Booleans with gaps are object columns to pandas, so they get a mode too
+        categorical_cols = [col for col in columns if (dtypes[col] == 'VARCHAR' and col not in empty_cols)
+                            or (dtypes[col] == 'BOOLEAN' and nulls[col])]
+
+        expressions = {col: quoted[col] for col in columns}
+        for col in empty_cols:
+            expressions[col] = f"CAST({quoted[col]} AS DOUBLE)"
+        for col in object_cols:
+            expressions[col] = f"CAST({quoted[col]} AS VARCHAR)"
+
+        # Fill numeric columns with median
+        for col in numeric_cols:
+            if nulls[col]:
+                median_val = float('nan') if medians.get(col) is None else float(medians[col])
+                if not np.isnan(median_val):
+                    expressions[col] = f"coalesce({quoted[col]}, {_double(median_val)})"
+                cleaning_log.append(f"Filled missing values in '{col}' with median ({median_val})")
+
+        # Fill categorical columns with mode (smallest value among ties, like Series.mode)
+        for col in categorical_cols:
+            if nulls[col]:
+                mode = con.execute(f"SELECT {quoted[col]} FROM deduped WHERE {quoted[col]} IS NOT NULL "
+                                   f"GROUP BY 1 ORDER BY count(*) DESC, 1 LIMIT 1").fetchone()
+                mode_val = mode[0] if mode else 'Unknown'
+                literal = str(mode_val).lower() if isinstance(mode_val, bool) else "'" + mode_val.replace("'", "''") + "'"
+                expressions[col] = f"coalesce({expressions[col]}, {literal})"
+                cleaning_log.append(f"Filled missing values in '{col}' with mode ('{mode_val}')")
+
+        con.execute(f"CREATE VIEW imputed AS SELECT __row, "
+                    f"{', '.join(f'{expressions[col]} AS {quoted[col]}' for col in columns)} FROM deduped")
+
+        null_checks = [f"count(*) - count({quoted[col]})" for col in columns] or ["0"]
+        missing_after = con.execute(f"SELECT {' + '.join(null_checks)} FROM imputed").fetchone()[0] or 0
+
+        # Remove outliers using IQR method for numeric columns
+        outliers_removed = 0
+        keep = []
+        for col in numeric_cols:
+            where = f"WHERE {' AND '.join(keep)}" if keep else ""
+            q1, q3 = con.execute(f"SELECT quantile_cont({quoted[col]}, 0.25), quantile_cont({quoted[col]}, 0.75) "
+                                 f"FROM imputed {where}").fetchone()
+            if q1 is None or q3 is None:
+                continue
+            iqr = q3 - q1
+            lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            outlier = f"coalesce({quoted[col]} < {_double(lower)} OR {quoted[col]} > {_double(upper)}, false)"
+            outliers_in_col = con.execute(f"SELECT count(*) FROM imputed "
+                                          f"{where + ' AND' if keep else 'WHERE'} {outlier}").fetchone()[0]
+            if outliers_in_col > 0:
+                keep.append(f"NOT {outlier}")
+                outliers_removed += outliers_in_col
+                cleaning_log.append(f"Removed {outliers_in_col} outliers from '{col}'")
+
+        where = f"WHERE {' AND '.join(keep)}" if keep else ""
+        cleaned = f"SELECT {all_cols} FROM imputed {where}"
+        rows_after = con.execute(f"SELECT count(*) FROM imputed {where}").fetchone()[0]
+
+        suffix = Path(target_file).suffix.lower()
+        if suffix == '.parquet':
+            con.execute(f"COPY ({cleaned}) TO '{target_file}' (FORMAT parquet)")
+        elif suffix == '.csv':
+            con.execute(f"COPY ({cleaned}) TO '{target_file}' (FORMAT csv, HEADER)")
+        else:
+            write_table(con.execute(cleaned).df(), target_file)
+        con.close()
+
+    statistics = {
+        'duplicates_removed': int(duplicates_before),
+        'missing_values_before': int(missing_before),
+        'missing_values_after': int(missing_after),
+        'outliers_removed': int(outliers_removed)
+    }
+    return (rows_before, len(columns)), (rows_after, len(columns)), cleaning_log, statistics
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Clean a dataset into 02_intermediate.")
+    parser.add_argument("source", help="Dataset file (.csv, .xlsx, .xls, .parquet, .feather)")
+    parser.add_argument("target", help="Name for the cleaned dataset")
+    parser.add_argument("--format", choices=list(SUFFIXES), default=None,
+                        help="Storage format (default: configured format for 02_intermediate)")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="Also write a CSV copy of the cleaned dataset")
+    parser.add_argument("--engine", choices=ENGINES, default='pandas',
+                        help="pandas loads the table in memory; duckdb runs out of core (default: pandas)")
+    parser.add_argument("--memory-budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help=f"Memory limit for the duckdb engine (default: {DEFAULT_MEMORY_BUDGET_MB})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    source_path = Path(args.source)
+    target_name = args.target
+    timestamp = datetime.now().strftime('%Y%m%d')
+
+    if not source_path.exists():
+        print(f"❌ Source file not found: {source_path}")
+        exit(1)
+
+    print(f"🧹 Cleaning dataset: {source_path}" + (f" (duckdb, {args.memory_budget_mb} MB budget)"
+                                                    if args.engine == 'duckdb' else ""))
+
+    TARGET_DIR.mkdir(parents=True, exist_ok=True)
+    target_file = table_path(TARGET_DIR, f"{target_name}_cleaned_{timestamp}", args.format)
+
+    if args.engine == 'duckdb':
+        try:
+            import duckdb  # noqa: F401
+        except ImportError:
+            print("❌ duckdb not installed. Install with: pip install duckdb")
+            exit(1)
+        try:
+            original_shape, cleaned_shape, cleaning_log, statistics = clean_with_duckdb(
+                source_path, target_file, args.memory_budget_mb)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        except Exception as e:
+            print(f"❌ Error cleaning file: {e}")
+            exit(1)
+    else:
+        # Load data
+        try:
+            df = read_table(source_path)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        except Exception as e:
+            print(f"❌ Error loading file: {e}")
+            exit(1)
+
+        original_shape = df.shape
+        df, cleaning_log, statistics = clean_frame(df)
+        cleaned_shape = df.shape
+
+        # Save cleaned dataset
+        write_table(df, target_file)
+
+    csv_file = export_csv(target_file) if args.export_csv and target_file.suffix != '.csv' else None
+
+    # Create cleaning metadata
+    metadata = {
+        'source_file': str(source_path),
+        'target_file': str(target_file),
+        'format': target_file.suffix.lstrip('.'),
+        'engine': args.engine,
+        'cleaned_at': datetime.now().isoformat(),
+        'original_shape': list(original_shape),
+        'cleaned_shape': list(cleaned_shape),
+        'rows_removed': original_shape[0] - cleaned_shape[0],
+        'cleaning_operations': cleaning_log,
+        'statistics': statistics
+    }
+    if csv_file:
+        metadata['csv_export'] = str(csv_file)
+
+    metadata_file = TARGET_DIR / f"{target_name}_cleaned_{timestamp}.metadata.yaml"
+    with open(metadata_file, 'w') as f:
+        yaml.dump(metadata, f, default_flow_style=False)
+
+    print(f"\n✅ Dataset cleaned successfully!")
+    print(f"   Original shape: {original_shape}")
+    print(f"   Cleaned shape: {cleaned_shape}")
+    print(f"   Rows removed: {original_shape[0] - cleaned_shape[0]}")
+    print(f"   Operations performed: {len(cleaning_log)}")
+
+    if cleaning_log:
+        print(f"\n🔧 Cleaning operations:")
+        for operation in cleaning_log:
+            print(f"   - {operation}")
+
+    print(f"\n📄 Cleaned dataset: {target_file}")
+    if csv_file:
+        print(f"📄 CSV export: {csv_file}")
+    print(f"📄 Metadata: {metadata_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,56 @@
-import os
-import urllib.request
-import hashlib
+import argparse
 import yaml
 from datetime import datetime
 from pathlib import Path
 
-url = "{{url}}"
-name = "{{name}}"
-timestamp = "{{DATE}}"
-
-# Create target directory
-target_dir = Path("01_raw/011_external")
-target_dir.mkdir(parents=True, exist_ok=True)
-
-# Download file
-filename = f"{name}_{timestamp}.csv"
-filepath = target_dir / filename
-
-print(f"📥 Downloading {url} to {filepath}")
-urllib.request.urlretrieve(url, filepath)
-
-# Calculate checksum
-with open(filepath, 'rb') as f:
-    checksum = hashlib.sha256(f.read()).hexdigest()
-
-# Create metadata
-metadata = {
-    'name': name,
-    'source_url': url,
-    'downloaded_at': datetime.now().isoformat(),
-    'filepath': str(filepath),
-    'checksum': checksum,
-    'size_bytes': filepath.stat().st_size
-}
-
-# Save metadata
-metadata_file = target_dir / f"{filename}.metadata.yaml"
-with open(metadata_file, 'w') as f:
-    yaml.dump(metadata, f, default_flow_style=False)
-
-print(f"✅ Downloaded and cataloged: {filepath}")
-print(f"📄 Metadata saved: {metadata_file}")
+from ingest import download_and_hash
+
+TARGET_DIR = Path("01_raw/011_external")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Download and catalog an external dataset.")
+    parser.add_argument("url", help="Dataset URL")
+    parser.add_argument("name", help="Dataset name")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    timestamp = datetime.now().strftime('%Y%m%d')
+
+    # Create target directory
+    TARGET_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Download file, hashing it as it streams in
+    filename = f"{args.name}_{timestamp}.csv"
+    filepath = TARGET_DIR / filename
+
+    print(f"📥 Downloading {args.url} to {filepath}")
+    try:
+        checksum, size_bytes = download_and_hash(args.url, filepath)
+    except Exception as e:
+        print(f"❌ Download failed: {e}")
+        exit(1)
+
+    # Create metadata
+    metadata = {
+        'name': args.name,
+        'source_url': args.url,
+        'downloaded_at': datetime.now().isoformat(),
+        'filepath': str(filepath),
+        'checksum': checksum,
+        'size_bytes': size_bytes
+    }
+
+    # Save metadata
+    metadata_file = TARGET_DIR / f"{filename}.metadata.yaml"
+    with open(metadata_file, 'w') as f:
+        yaml.dump(metadata, f, default_flow_style=False)
+
+    print(f"✅ Downloaded and cataloged: {filepath}")
+    print(f"📄 Metadata saved: {metadata_file}")
+
+
+if __name__ == "__main__":
+    main()
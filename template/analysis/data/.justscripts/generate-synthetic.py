@@ -1,53 +1,356 @@
-import pandas as pd
-import numpy as np
+"""
+Chunked, parallel synthetic data generator.
+
+Rows are generated in fixed-size chunks. Every column of every chunk
+draws from its own ``numpy.random.Generator`` seeded from
+``SeedSequence(seed, spawn_key=(chunk, column))``, so a chunk's bytes
+depend only on the seed, the schema and ``--chunk-rows``: the output is
+identical whatever the number of workers, and adding a column leaves the
+others unchanged. Worker processes generate and write the chunks as
+temporary parts, which are appended in chunk order into one CSV or Parquet
+file. CSV is written by pandas, as ``DataFrame.to_csv`` always wrote it.
+
+Built-in schemas are ``tabular`` and ``timeseries``. Any other layout is
+described in a YAML file passed with ``--schema``:
+
+    columns:
+      - {name: id, kind: sequence}
+      - {name: user, kind: key, cardinality: 100000000, zipf: 1.3, prefix: "u"}
+      - {name: amount, kind: lognormal, mean: 3.0, sigma: 1.2, nulls: 0.01}
+      - {name: score, kind: normal, mean: 0, std: 1}
+      - {name: segment, kind: categorical, values: [A, B, C], weights: [0.7, 0.2, 0.1]}
+      - {name: ts, kind: datetime, start: "2023-01-01", freq: "1min"}
+      - {name: target, kind: logistic, intercept: -1.0, weights: {score: 1.5}}
+    correlations:
+      - [amount, score, 0.6]
+
+Column kinds: sequence, normal, lognormal, uniform, integer, bernoulli,
+categorical, key, datetime, logistic. ``nulls`` (share of missing values)
+works on every kind; ``correlations`` apply to normal and lognormal
+columns (lognormal ones are correlated on the log scale).
+
+Usage:
+    python3 .justscripts/generate-synthetic.py <name> <type> <size> [--schema schema.yaml]
+                                               [--seed N] [--chunk-rows N] [--workers N] [--format csv|parquet]
+"""
+
+import argparse
+import os
+import shutil
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
-name = "{{name}}"
-data_type = "{{type}}"
-size = int("{{size}}")
-timestamp = "{{DATE}}"
-
-target_dir = Path("01_raw/013_synthetic")
-target_dir.mkdir(parents=True, exist_ok=True)
-
-if data_type == "tabular":
-    df = pd.DataFrame({
-        'id': range(1, size + 1),
-        'feature_1': np.random.normal(0, 1, size),
-        'feature_2': np.random.normal(5, 2, size),
-        'feature_3': np.random.choice(['A', 'B', 'C'], size),
-        'target': np.random.choice([0, 1], size)
-    })
-elif data_type == "timeseries":
-    dates = pd.date_range('2023-01-01', periods=size, freq='D')
-    df = pd.DataFrame({
-        'date': dates,
-        'value': np.random.normal(100, 15, size) + np.sin(np.arange(size) * 2 * np.pi / 365) * 10
-    })
-else:
-    print(f"❌ Unsupported data type: {data_type}")
-    exit(1)
-
-filename = f"{name}_{data_type}_{timestamp}.csv"
-filepath = target_dir / filename
-df.to_csv(filepath, index=False)
-
-metadata = {
-    'name': name,
-    'type': data_type,
-    'size': size,
-    'generated_at': datetime.now().isoformat(),
-    'filepath': str(filepath),
-    'columns': list(df.columns),
-    'shape': list(df.shape)
+import numpy as np
+import pandas as pd
+
+TARGET_DIR = Path("01_raw/013_synthetic")
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_ROWS = 1_000_000
+FORMATS = {'csv': '.csv', 'parquet': '.parquet'}
+
+# Spawn key of the stream shared by correlated columns (columns use their index)
+CORRELATION_STREAM = 2 ** 32 - 1
+
+BUILTIN_SCHEMAS = {
+    'tabular': {
+        'columns': [
+            {'name': 'id', 'kind': 'sequence'},
+            {'name': 'feature_1', 'kind': 'normal', 'mean': 0, 'std': 1},
+            {'name': 'feature_2', 'kind': 'normal', 'mean': 5, 'std': 2},
+            {'name': 'feature_3', 'kind': 'categorical', 'values': ['A', 'B', 'C']},
+            {'name': 'target', 'kind': 'bernoulli', 'p': 0.5},
+        ],
+    },
+    'timeseries': {
+        'columns': [
+            {'name': 'date', 'kind': 'datetime', 'start': '2023-01-01', 'freq': 'D'},
+            {'name': 'value', 'kind': 'normal', 'mean': 100, 'std': 15,
+             'seasonality': {'period': 365, 'amplitude': 10}},
+        ],
+    },
 }
 
-metadata_file = target_dir / f"{filename}.metadata.yaml"
-with open(metadata_file, 'w') as f:
-    yaml.dump(metadata, f, default_flow_style=False)
+KINDS = {'sequence', 'normal', 'lognormal', 'uniform', 'integer', 'bernoulli',
+         'categorical', 'key', 'datetime', 'logistic'}
+
+
+def load_schema(data_type, schema_file=None):
+    if schema_file:
+        with open(schema_file, 'r') as f:
+            schema = yaml.safe_load(f) or {}
+    elif data_type in BUILTIN_SCHEMAS:
+        schema = BUILTIN_SCHEMAS[data_type]
+    else:
+        raise ValueError(f"Unsupported data type: {data_type} (use {', '.join(BUILTIN_SCHEMAS)} or --schema)")
+    validate_schema(schema)
+    return schema
+
+
+def validate_schema(schema):
+    columns = schema.get('columns') or []
+    if not columns:
+        raise ValueError("Schema has no columns")
+    kinds = {}
+    for column in columns:
+        if column.get('kind') not in KINDS:
+            raise ValueError(f"Column '{column.get('name')}': unknown kind '{column.get('kind')}'")
+        if column['name'] in kinds:
+            raise ValueError(f"Duplicate column '{column['name']}'")
+        for source in (column.get('weights') or {}) if column['kind'] == 'logistic' else ():
+            if kinds.get(source) in (None, 'categorical', 'key', 'datetime'):
+                raise ValueError(f"Column '{column['name']}': '{source}' must be an earlier numeric column")
+        kinds[column['name']] = column['kind']
+    for a, b, _ in schema.get('correlations') or []:
+        for name in (a, b):
+            if kinds.get(name) not in ('normal', 'lognormal'):
+                raise ValueError(f"Correlated column '{name}' must be a normal or lognormal column")
+    correlated, matrix = correlation_matrix(schema)
+    if correlated:
+        np.linalg.cholesky(matrix)  # raises LinAlgError unless positive definite
+
+
+def correlation_matrix(schema):
+    """Correlated column names and their correlation matrix."""
+    pairs = schema.get('correlations') or []
+    names = list(dict.fromkeys(name for a, b, _ in pairs for name in (a, b)))
+    matrix = np.eye(len(names))
+    for a, b, rho in pairs:
+        i, j = names.index(a), names.index(b)
+        matrix[i, j] = matrix[j, i] = float(rho)
+    return names, matrix
+
+
+def column_rng(seed, chunk, stream):
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(chunk, stream))))
+
+
+def generate_column(column, rng, rows, first_row, z=None):
+    """Values of one column for the rows ``[first_row, first_row + rows)``."""
+    kind = column['kind']
+    if kind == 'sequence':
+        return np.arange(first_row, first_row + rows, dtype="int64") + int(column.get('start', 1))
+    if kind == 'normal':
+        z = rng.standard_normal(rows) if z is None else z
+        values = float(column.get('mean', 0)) + float(column.get('std', 1)) * z
+        seasonality = column.get('seasonality')
+        if seasonality:
+            phase = np.arange(first_row, first_row + rows) * 2 * np.pi / float(seasonality['period'])
+            values += np.sin(phase) * float(seasonality.get('amplitude', 1))
+        return values
+    if kind == 'lognormal':
+        z = rng.standard_normal(rows) if z is None else z
+        return np.exp(float(column.get('mean', 0)) + float(column.get('sigma', 1)) * z)
+    if kind == 'uniform':
+        return rng.uniform(float(column.get('low', 0)), float(column.get('high', 1)), rows)
+    if kind == 'integer':
+        return rng.integers(int(column.get('low', 0)), int(column.get('high', 100)), rows, endpoint=True)
+    if kind == 'bernoulli':
+        return (rng.random(rows) < float(column.get('p', 0.5))).astype("int64")
+    if kind == 'categorical':
+        values = column['values']
+        weights = column.get('weights')
+        p = np.asarray(weights, dtype=float) / np.sum(weights) if weights else None
+        return rng.choice(len(values), size=rows, p=p).astype("int32")
+    if kind == 'key':
+        cardinality = int(column['cardinality'])
+        if column.get('zipf'):
+            # Popular keys first: rank r is drawn with probability ~ r^-zipf
+            return (rng.zipf(float(column['zipf']), rows) - 1) % cardinality
+        return rng.integers(0, cardinality, rows)
+    if kind == 'datetime':
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(column.get('freq', 'D')))
+        offsets = np.arange(first_row, first_row + rows, dtype="int64") * step.value
+        start = np.datetime64(pd.Timestamp(column.get('start', '2023-01-01')).value, 'ns')
+        return start + offsets.astype("timedelta64[ns]")
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def to_arrow(column, values, mask):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    kind = column['kind']
+    if kind == 'categorical':
+        indices = pa.array(values, type=pa.int32(), mask=mask)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(column['values']))
+    if kind == 'key' and column.get('prefix') is not None:
+        keys = pc.cast(pa.array(values, mask=mask), pa.string())
+        return pc.binary_join_element_wise(str(column['prefix']), keys, "")
+    if kind == 'datetime':
+        step = pd.Timedelta(pd.tseries.frequencies.to_offset(column.get('freq', 'D')))
+        unit = 's' if step.value % 10 ** 9 == 0 else 'ns'
+        return pa.array(values.astype(f"datetime64[{unit}]"), mask=mask)
+    return pa.array(values, mask=mask)
+
+
+def generate_chunk(schema, seed, chunk, first_row, rows):
+    """One chunk as an Arrow table; deterministic in (schema, seed, chunk, first_row, rows)."""
+    import pyarrow as pa
+
+    correlated, matrix = correlation_matrix(schema)
+    shared = {}
+    if correlated:
+        z = column_rng(seed, chunk, CORRELATION_STREAM).standard_normal((rows, len(correlated)))
+        z = z @ np.linalg.cholesky(matrix).T
+        shared = {name: z[:, index] for index, name in enumerate(correlated)}
+
+    raw, arrays = {}, {}
+    for index, column in enumerate(schema['columns']):
+        rng = column_rng(seed, chunk, index)
+        name = column['name']
+        if column['kind'] == 'logistic':
+            logit = np.full(rows, float(column.get('intercept', 0)))
+            for source, weight in (column.get('weights') or {}).items():
+                logit += float(weight) * raw[source]
+            values = (rng.random(rows) < 1 / (1 + np.exp(-logit))).astype("int64")
+        else:
+            values = generate_column(column, rng, rows, first_row, shared.get(name))
+        raw[name] = values
+        nulls = float(column.get('nulls', 0))
+        mask = rng.random(rows) < nulls if nulls > 0 else None
+        arrays[name] = to_arrow(column, values, mask)
+    return pa.table(arrays)
+
+
+def write_chunk(table, path, header=True):
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        # Integers with nulls stay integers rather than turning into floats
+        table.to_pandas(integer_object_nulls=True).to_csv(path, index=False, header=header)
+
+
+def write_part(schema, seed, chunk, first_row, rows, path):
+    """Generate and write one chunk in a worker (only the first CSV part has a header); returns its rows."""
+    table = generate_chunk(schema, seed, chunk, first_row, rows)
+    write_chunk(table, path, header=chunk == 0)
+    return rows
+
+
+class PartAppender:
+    """Append the parts, in chunk order, to one output file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def append(self, part):
+        if part.suffix == '.parquet':
+            import pyarrow.parquet as pq
+            table = pq.read_table(part)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'wb')
+            with open(part, 'rb') as f:
+                shutil.copyfileobj(f, self._file, 1024 * 1024)
+        part.unlink()
+
+    def close(self):
+        for handle in (self._writer, self._file):
+            if handle is not None:
+                handle.close()
+        self._writer = self._file = None
+
+
+def plan_chunks(size, chunk_rows):
+    return [(chunk, first_row, min(chunk_rows, size - first_row))
+            for chunk, first_row in enumerate(range(0, size, chunk_rows))]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset in parallel, reproducible chunks.")
+    parser.add_argument("name", help="Dataset name")
+    parser.add_argument("type", help=f"Built-in schema ({', '.join(BUILTIN_SCHEMAS)}) or a label for --schema")
+    parser.add_argument("size", type=int, help="Number of rows")
+    parser.add_argument("--schema", default=None, help="YAML schema file (see the module docstring)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Random seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows per generated chunk (default: {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=list(FORMATS), default='csv', help="Output format (default: csv)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    timestamp = datetime.now().strftime('%Y%m%d')
+
+    if args.size <= 0 or args.chunk_rows <= 0:
+        print("❌ Size and chunk rows must be positive")
+        exit(1)
+    try:
+        schema = load_schema(args.type, args.schema)
+    except (OSError, ValueError, KeyError, TypeError, np.linalg.LinAlgError) as e:
+        print(f"❌ Invalid schema: {e}")
+        exit(1)
+
+    TARGET_DIR.mkdir(parents=True, exist_ok=True)
+    suffix = FORMATS[args.format]
+    stem = f"{args.name}_{args.type}_{timestamp}"
+    output = TARGET_DIR / f"{stem}{suffix}"
+    chunks = plan_chunks(args.size, args.chunk_rows)
+    parts_dir = TARGET_DIR / f".{stem}.parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    width = max(5, len(str(len(chunks) - 1)))
+    parts = [parts_dir / f"part-{chunk:0{width}d}{suffix}" for chunk, _, _ in chunks]
+    partial = TARGET_DIR / f".{output.name}.tmp"
+
+    workers = min(args.workers or os.cpu_count() or 1, len(chunks))
+    print(f"🔄 Generating {args.size:,} rows in {len(chunks)} chunk(s) on {workers} worker(s)")
+    start = time.perf_counter()
+    rows = 0
+    report_every = max(1, len(chunks) // 20)
+    appender = PartAppender(partial)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(write_part, schema, args.seed, chunk, first_row, count, part)
+                       for (chunk, first_row, count), part in zip(chunks, parts)]
+            # Parts are appended in chunk order while later ones are still being generated
+            for done, (future, part) in enumerate(zip(futures, parts), start=1):
+                rows += future.result()
+                appender.append(part)
+                if len(chunks) > 1 and (done % report_every == 0 or done == len(chunks)):
+                    print(f"📊 {done}/{len(chunks)} chunks, {rows:,} rows")
+        appender.close()
+        os.replace(partial, output)
+    finally:
+        appender.close()
+        partial.unlink(missing_ok=True)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+
+    columns = [column['name'] for column in schema['columns']]
+    metadata = {
+        'name': args.name,
+        'type': args.type,
+        'size': args.size,
+        'generated_at': datetime.now().isoformat(),
+        'filepath': str(output),
+        'columns': columns,
+        'shape': [rows, len(columns)],
+        'format': args.format,
+        'seed': args.seed,
+        'chunk_rows': args.chunk_rows,
+        'size_bytes': output.stat().st_size,
+        'schema': schema,
+    }
+
+    metadata_file = TARGET_DIR / f"{output.name}.metadata.yaml"
+    with open(metadata_file, 'w') as f:
+        yaml.dump(metadata, f, default_flow_style=False)
+
+    print(f"✅ Generated synthetic {args.type} dataset: {output}")
+    print(f"📊 Shape: ({rows}, {len(columns)}) in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"📄 Metadata saved: {metadata_file}")
+
 
-print(f"✅ Generated synthetic {data_type} dataset: {filepath}")
-print(f"📊 Shape: {df.shape}")
-print(f"📄 Metadata saved: {metadata_file}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Constant-memory file ingest with SHA-256 checksums.
+
+Every helper hashes the bytes as they stream through a fixed-size buffer,
+so registering, downloading or backing up a multi-GB file reads it once
+and never holds more than one buffer in memory.
+"""
+
+import hashlib
+import os
+import shutil
+import urllib.request
+from pathlib import Path
+
+BUFFER_SIZE = 1024 * 1024
+
+# Linux FICLONE ioctl: share the source's extents (btrfs, XFS, overlayfs on those)
+FICLONE = 0x40049409
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def _advise_sequential(fd):
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def _pump(read_into, write, digest):
+    """Move bytes through one reusable buffer, hashing them on the way."""
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    size = 0
+    while True:
+        n = read_into(buffer)
+        if not n:
+            break
+        chunk = view[:n]
+        digest.update(chunk)
+        if write is not None:
+            write(chunk)
+        size += n
+    return size
+
+
+def hash_file(path):
+    """Return ``(sha256_hex, size_bytes)`` of a file read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        _advise_sequential(f.fileno())
+        size = _pump(f.readinto, None, digest)
+    return digest.hexdigest(), size
+
+
+def _reflink(src, dst):
+    """Clone ``src`` into ``dst`` without copying data; False if unsupported."""
+    if fcntl is None:
+        return False
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            return False
+
+
+def _staging_path(target):
+    return target.with_name(f".tmp_{target.name}.{os.getpid()}")
+
+
+def copy_and_hash(source, target):
+    """
+    Copy ``source`` to ``target`` (with metadata, like shutil.copy2) and hash it.
+
+    On filesystems that support reflinks the copy is a metadata-only clone
+    and the source is read once for the checksum. Otherwise every block is
+    hashed while it is copied, so the data is still read exactly once.
+
+    Returns:
+        Tuple of (sha256_hex, size_bytes)
+    """
+    source, target = Path(source), Path(target)
+    staging = _staging_path(target)
+    try:
+        if _reflink(source, staging):
+            checksum, size = hash_file(source)
+        else:
+            digest = hashlib.sha256()
+            with open(source, 'rb', buffering=0) as fsrc, open(staging, 'wb') as fdst:
+                _advise_sequential(fsrc.fileno())
+                size = _pump(fsrc.readinto, fdst.write, digest)
+            checksum = digest.hexdigest()
+        shutil.copystat(source, staging)
+        os.replace(staging, target)
+    finally:
+        if staging.exists():
+            staging.unlink()
+    return checksum, size
+
+
+def download_and_hash(url, target):
+    """
+    Stream ``url`` into ``target``, hashing the response body as it arrives.
+
+    Returns:
+        Tuple of (sha256_hex, size_bytes)
+    """
+    target = Path(target)
+    staging = _staging_path(target)
+    digest = hashlib.sha256()
+    try:
+        with urllib.request.urlopen(url) as response, open(staging, 'wb') as f:
+            size = _pump(response.readinto, f.write, digest)
+        os.replace(staging, target)
+    finally:
+        if staging.exists():
+            staging.unlink()
+    return digest.hexdigest(), size
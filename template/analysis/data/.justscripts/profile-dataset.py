@@ -1,84 +1,302 @@
+import argparse
+import json
 import pandas as pd
 import numpy as np
 import yaml
 from pathlib import Path
 from datetime import datetime
 
-filepath = Path("{{path}}")
+from report_cache import ReportCache, file_checksum
+from storage import read_table
+from streaming import DEFAULT_MEMORY_BUDGET_MB, ProfileTracker, iter_csv_chunks
 
-if not filepath.exists():
-    print(f"❌ File not found: {filepath}")
-    exit(1)
+PROFILE_DIR = Path("02_intermediate/022_profiled")
+# Bump whenever the profile contents change so cached profiles are recomputed
+PROFILER_VERSION = 1
 
-print(f"📈 Profiling dataset: {filepath}")
 
-try:
+def load_dataset(filepath):
+    return read_table(filepath)
+
+
+def profile_frame(df, filepath):
+    """Profile a fully loaded DataFrame."""
+    profile = {
+        'filepath': str(filepath),
+        'profiled_at': datetime.now().isoformat(),
+        'dataset_info': {
+            'shape': list(df.shape),
+            'memory_usage_mb': float(round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2)),
+            'columns': list(df.columns)
+        },
+        'column_profiles': {}
+    }
+
+    for col in df.columns:
+        col_profile = {
+            'dtype': str(df[col].dtype),
+            'null_count': int(df[col].isnull().sum()),
+            'null_percentage': float(round(df[col].isnull().sum() / len(df) * 100, 2)),
+            'unique_count': int(df[col].nunique()),
+            'unique_percentage': float(round(df[col].nunique() / len(df) * 100, 2))
+        }
+
+        if df[col].dtype in ['int64', 'float64', 'int32', 'float32']:
+            col_profile.update({
+                'min': float(df[col].min()) if pd.notna(df[col].min()) else None,
+                'max': float(df[col].max()) if pd.notna(df[col].max()) else None,
+                'mean': float(df[col].mean()) if pd.notna(df[col].mean()) else None,
+                'median': float(df[col].median()) if pd.notna(df[col].median()) else None,
+                'std': float(df[col].std()) if pd.notna(df[col].std()) else None,
+                'quantiles': {
+                    'q25': float(df[col].quantile(0.25)) if pd.notna(df[col].quantile(0.25)) else None,
+                    'q75': float(df[col].quantile(0.75)) if pd.notna(df[col].quantile(0.75)) else None
+                }
+            })
+        elif df[col].dtype == 'object':
+            value_counts = df[col].value_counts().head(10)
+            col_profile.update({
+                'top_values': {str(k): int(v) for k, v in value_counts.items()},
+                'avg_length': float(round(df[col].astype(str).str.len().mean(), 2)) if len(df[col].dropna()) > 0 else 0
+            })
+
+        profile['column_profiles'][col] = col_profile
+
+    return profile
+
+
+def sketch_dataset(filepath, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Summarise a dataset into mergeable sketches, streaming CSVs in chunks."""
+    tracker = ProfileTracker()
     if filepath.suffix.lower() == '.csv':
-        df = pd.read_csv(filepath)
-    elif filepath.suffix.lower() in ['.xlsx', '.xls']:
-        df = pd.read_excel(filepath)
+        for chunk in iter_csv_chunks(filepath, memory_budget_mb):
+            tracker.update(chunk)
     else:
-        print(f"❌ Unsupported file format: {filepath.suffix}")
-        exit(1)
-except Exception as e:
-    print(f"❌ Error loading file: {e}")
-    exit(1)
-
-profile = {
-    'filepath': str(filepath),
-    'profiled_at': datetime.now().isoformat(),
-    'dataset_info': {
-        'shape': list(df.shape),
-        'memory_usage_mb': round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2),
-        'columns': list(df.columns)
-    },
-    'column_profiles': {}
-}
-
-for col in df.columns:
-    col_profile = {
-        'dtype': str(df[col].dtype),
-        'null_count': int(df[col].isnull().sum()),
-        'null_percentage': round(df[col].isnull().sum() / len(df) * 100, 2),
-        'unique_count': int(df[col].nunique()),
-        'unique_percentage': round(df[col].nunique() / len(df) * 100, 2)
+        tracker.update(load_dataset(filepath))
+    return tracker
+
+
+def _optional_float(value):
+    return float(value) if pd.notna(value) else None
+
+
+def profile_sketch(tracker, filepath):
+    """Build a profile (same layout as profile_frame) from sketches, with error bounds."""
+    rows = tracker.rows
+    profile = {
+        'filepath': str(filepath),
+        'profiled_at': datetime.now().isoformat(),
+        'approximate': True,
+        'dataset_info': {
+            'shape': [rows, len(tracker.columns)],
+            'memory_usage_mb': float(round(tracker.memory_bytes / 1024 / 1024, 2)),
+            'columns': list(tracker.columns)
+        },
+        'column_profiles': {}
     }
 
-    if df[col].dtype in ['int64', 'float64', 'int32', 'float32']:
-        col_profile.update({
-            'min': float(df[col].min()) if pd.notna(df[col].min()) else None,
-            'max': float(df[col].max()) if pd.notna(df[col].max()) else None,
-            'mean': float(df[col].mean()) if pd.notna(df[col].mean()) else None,
-            'median': float(df[col].median()) if pd.notna(df[col].median()) else None,
-            'std': float(df[col].std()) if pd.notna(df[col].std()) else None,
-            'quantiles': {
-                'q25': float(df[col].quantile(0.25)) if pd.notna(df[col].quantile(0.25)) else None,
-                'q75': float(df[col].quantile(0.75)) if pd.notna(df[col].quantile(0.75)) else None
-            }
-        })
-    elif df[col].dtype == 'object':
-        value_counts = df[col].value_counts().head(10)
-        col_profile.update({
-            'top_values': {str(k): int(v) for k, v in value_counts.items()},
-            'avg_length': round(df[col].astype(str).str.len().mean(), 2) if len(df[col].dropna()) > 0 else 0
-        })
-
-    profile['column_profiles'][col] = col_profile
-
-profile_dir = Path("02_intermediate/022_profiled")
-profile_dir.mkdir(parents=True, exist_ok=True)
-profile_file = profile_dir / f"{filepath.stem}_profile.yaml"
-
-with open(profile_file, 'w') as f:
-    yaml.dump(profile, f, default_flow_style=False)
-
-print(f"\n📊 Dataset Profile:")
-print(f"   Shape: {df.shape}")
-print(f"   Memory: {profile['dataset_info']['memory_usage_mb']} MB")
-print(f"   Columns: {len(df.columns)}")
-
-print(f"\n📋 Column Summary:")
-for col, col_prof in profile['column_profiles'].items():
-    print(f"   {col}: {col_prof['dtype']} ({col_prof['null_percentage']:.1f}% null, {col_prof['unique_count']} unique)")
-
-print(f"\n📄 Profile saved: {profile_file}")
+    for col, sketch in tracker.columns.items():
+        dtype = sketch.resolved_dtype
+        # The estimate can overshoot slightly; there cannot be more distinct values than non-null ones
+        unique_count = min(sketch.distinct.estimate(), sketch.rows - sketch.nulls)
+        col_profile = {
+            'dtype': str(dtype),
+            'null_count': sketch.nulls,
+            'null_percentage': float(round(sketch.nulls / rows * 100, 2)) if rows else 0.0,
+            'unique_count': unique_count,
+            'unique_percentage': float(round(unique_count / rows * 100, 2)) if rows else 0.0
+        }
+        error_bounds = {'unique_count_relative_std_error': round(sketch.distinct.relative_error, 4)}
+
+        if str(dtype) in ['int64', 'float64', 'int32', 'float32']:
+            quantiles = sketch.quantiles
+            col_profile.update({
+                'min': _optional_float(sketch.min),
+                'max': _optional_float(sketch.max),
+                'mean': _optional_float(sketch.mean if sketch.count else np.nan),
+                'median': _optional_float(quantiles.quantile(0.5)),
+                'std': _optional_float(sketch.std),
+                'quantiles': {
+                    'q25': _optional_float(quantiles.quantile(0.25)),
+                    'q75': _optional_float(quantiles.quantile(0.75))
+                }
+            })
+            error_bounds['quantile_rank_error'] = round(quantiles.rank_error, 4)
+        elif dtype == 'object':
+            col_profile.update({
+                'top_values': {str(k): int(v) for k, v in sketch.frequent.top(10)},
+                'avg_length': float(round(sketch.length_sum / sketch.length_rows, 2))
+                if sketch.nulls < sketch.rows and sketch.length_rows else 0
+            })
+            error_bounds['top_values_max_undercount'] = int(sketch.frequent.error)
+
+        col_profile['error_bounds'] = error_bounds
+        profile['column_profiles'][col] = col_profile
+
+    return profile
+
+
+def sketch_file(filepath):
+    return PROFILE_DIR / f"{Path(filepath).stem}_profile.sketch.npz"
+
+
+def _split_arrays(state, arrays):
+    """Replace the numpy arrays in ``state`` by references to entries of ``arrays``."""
+    if isinstance(state, np.ndarray):
+        key = f"array_{len(arrays)}"
+        arrays[key] = state
+        return {'__array__': key}
+    if isinstance(state, dict):
+        return {key: _split_arrays(value, arrays) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [_split_arrays(value, arrays) for value in state]
+    return state
+
+
+def _join_arrays(state, arrays):
+    if isinstance(state, dict):
+        if set(state) == {'__array__'}:
+            return arrays[state['__array__']]
+        return {key: _join_arrays(value, arrays) for key, value in state.items()}
+    if isinstance(state, list):
+        return [_join_arrays(value, arrays) for value in state]
+    return state
+
+
+def save_sketch(tracker, filepath):
+    """Store the tracker's sketches as numpy arrays plus JSON (no pickle, so loading runs no code)."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = sketch_file(filepath)
+    arrays = {}
+    state = _split_arrays(tracker.state(), arrays)
+    np.savez(path, state=np.array(json.dumps(state)), **arrays)
+    return path
+
+
+def load_sketch(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files if key != 'state'}
+        return ProfileTracker.from_state(_join_arrays(json.loads(str(data['state'])), arrays))
+
+
+def report_cache(approx=False):
+    """Cache for profiles produced with this profiler version and mode."""
+    return ReportCache('profile', PROFILER_VERSION, {'mode': 'approx'} if approx else None)
+
+
+def save_profile(profile, filepath):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_file = PROFILE_DIR / f"{filepath.stem}_profile.yaml"
+
+    with open(profile_file, 'w') as f:
+        yaml.dump(profile, f, default_flow_style=False)
+
+    return profile_file
+
+
+def print_summary(profile, profile_file):
+    print(f"\n📊 Dataset Profile" + (" (approximate)" if profile.get('approximate') else "") + ":")
+    print(f"   Shape: {tuple(profile['dataset_info']['shape'])}")
+    print(f"   Memory: {profile['dataset_info']['memory_usage_mb']} MB")
+    print(f"   Columns: {len(profile['dataset_info']['columns'])}")
+
+    print(f"\n📋 Column Summary:")
+    for col, col_prof in profile['column_profiles'].items():
+        print(f"   {col}: {col_prof['dtype']} ({col_prof['null_percentage']:.1f}% null, {col_prof['unique_count']} unique)")
+
+    print(f"\n📄 Profile saved: {profile_file}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Write a statistical profile of a dataset.")
+    parser.add_argument("path", nargs="?", help="Dataset file (.csv, .xlsx, .xls, .parquet, .feather)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute the profile even if the file is unchanged")
+    parser.add_argument("--approx", action="store_true",
+                        help="Profile from mergeable sketches (HyperLogLog, KLL, Misra-Gries) in bounded memory")
+    parser.add_argument("--memory-budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help=f"Memory budget for reading CSVs in approximate mode (default: {DEFAULT_MEMORY_BUDGET_MB})")
+    parser.add_argument("--merge", nargs="+", metavar="SKETCH",
+                        help="Combine saved *_profile.sketch.npz files into one profile instead of reading data")
+    parser.add_argument("--name", help="Name of the combined profile (with --merge)")
+    return parser.parse_args()
+
+
+def merge_sketches(paths, name):
+    """Profile a partitioned dataset from the sketches of its partitions."""
+    missing = [path for path in paths if not Path(path).exists()]
+    if missing:
+        print(f"❌ Sketch not found: {', '.join(missing)}")
+        exit(1)
+
+    print(f"🧩 Merging {len(paths)} profile sketches into '{name}'")
+    tracker = None
+    for path in paths:
+        try:
+            sketch = load_sketch(path)
+            tracker = sketch if tracker is None else tracker.merge(sketch)
+        except (ValueError, KeyError, OSError) as e:
+            print(f"❌ {path}: {e}")
+            exit(1)
+
+    filepath = Path(name)
+    profile = profile_sketch(tracker, filepath)
+    profile['merged_from'] = [str(path) for path in paths]
+    save_sketch(tracker, filepath)
+    profile_file = save_profile(profile, filepath)
+    print_summary(profile, profile_file)
+
+
+def main():
+    args = parse_arguments()
+
+    if args.merge:
+        merge_sketches(args.merge, args.name or "merged")
+        return
+
+    if not args.path:
+        print("❌ Give a dataset path, or --merge with sketch files")
+        exit(1)
+
+    filepath = Path(args.path)
+
+    if not filepath.exists():
+        print(f"❌ File not found: {filepath}")
+        exit(1)
+
+    print(f"📈 Profiling dataset: {filepath}" + (" (approximate)" if args.approx else ""))
+
+    cache = report_cache(args.approx)
+    checksum = file_checksum(filepath)
+    # Approximate profiles are only reused while their sketch is still around to merge
+    use_cache = not args.no_cache and (not args.approx or sketch_file(filepath).exists())
+    profile = cache.get(checksum, filepath) if use_cache else None
+
+    if profile is not None:
+        print(f"♻️  Unchanged since last profile, reusing cached profile")
+    else:
+        try:
+            if args.approx:
+                tracker = sketch_dataset(filepath, args.memory_budget_mb)
+            else:
+                df = load_dataset(filepath)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        except Exception as e:
+            print(f"❌ Error loading file: {e}")
+            exit(1)
+
+        if args.approx:
+            profile = profile_sketch(tracker, filepath)
+            print(f"🧩 Sketch saved: {save_sketch(tracker, filepath)}")
+        else:
+            profile = profile_frame(df, filepath)
+        cache.put(checksum, profile)
+
+    profile_file = save_profile(profile, filepath)
+    print_summary(profile, profile_file)
+
+
+if __name__ == "__main__":
+    main()
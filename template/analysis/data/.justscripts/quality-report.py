@@ -1,54 +1,179 @@
-import pandas as pd
+import argparse
 import yaml
 from pathlib import Path
 from datetime import datetime
 
-filepath = Path("{{path}}")
+VALIDATION_DIR = Path("02_intermediate/021_validated")
+PROFILE_DIR = Path("02_intermediate/022_profiled")
+REPORT_DIR = Path("08_reporting")
 
-if not filepath.exists():
-    print(f"❌ File not found: {filepath}")
-    exit(1)
 
-print(f"📋 Generating quality report: {filepath}")
+def load_inputs(filepath):
+    """Load the validation and profile reports written for ``filepath``, if any."""
+    validation_file = VALIDATION_DIR / f"{filepath.stem}_validation_report.yaml"
+    profile_file = PROFILE_DIR / f"{filepath.stem}_profile.yaml"
 
-validation_file = Path("02_intermediate/021_validated") / f"{filepath.stem}_validation_report.yaml"
-profile_file = Path("02_intermediate/022_profiled") / f"{filepath.stem}_profile.yaml"
+    validation_data = None
+    profile_data = None
 
-report = {
-    'filepath': str(filepath),
-    'generated_at': datetime.now().isoformat(),
-    'summary': {},
-    'recommendations': []
-}
+    if validation_file.exists():
+        with open(validation_file, 'r') as f:
+            validation_data = yaml.safe_load(f)
 
-if validation_file.exists():
-    with open(validation_file, 'r') as f:
-        validation_data = yaml.safe_load(f)
+    if profile_file.exists():
+        with open(profile_file, 'r') as f:
+            profile_data = yaml.safe_load(f)
+
+    return validation_data, profile_data
+
+
+def build_report(filepath, validation_data=None, profile_data=None):
+    """Combine validation and profile results into a quality report with recommendations."""
+    report = {
+        'filepath': str(filepath),
+        'generated_at': datetime.now().isoformat(),
+        'summary': {},
+        'recommendations': []
+    }
+
+    if validation_data is not None:
         report['validation'] = validation_data
 
-if profile_file.exists():
-    with open(profile_file, 'r') as f:
-        profile_data = yaml.safe_load(f)
+    if profile_data is not None:
         report['profile'] = profile_data
 
-if 'validation' in report:
-    score = report['validation']['quality_metrics']['overall_score']
-    if score < 70:
-        report['recommendations'].append("Dataset quality is below acceptable threshold (70%). Consider data cleaning.")
-    if report['validation']['quality_metrics']['completeness'] < 90:
-        report['recommendations'].append("High missing data detected. Consider imputation strategies.")
-    if report['validation']['quality_metrics']['uniqueness'] < 95:
-        report['recommendations'].append("Duplicate records detected. Consider deduplication.")
-    if report['validation']['issues']:
-        report['recommendations'].append("Address data quality issues before proceeding to analysis.")
-
-# Save reports
-report_dir = Path("08_reporting")
-report_dir.mkdir(parents=True, exist_ok=True)
-
-yaml_report_file = report_dir / f"{filepath.stem}_quality_report.yaml"
-with open(yaml_report_file, 'w') as f:
-    yaml.dump(report, f, default_flow_style=False)
-
-print(f"✅ Quality report generated")
-print(f"📄 YAML report: {yaml_report_file}")
+    # Generate recommendations based on findings
+    if 'validation' in report:
+        score = report['validation']['quality_metrics']['overall_score']
+        if score < 70:
+            report['recommendations'].append("Dataset quality is below acceptable threshold (70%). Consider data cleaning.")
+        if report['validation']['quality_metrics']['completeness'] < 90:
+            report['recommendations'].append("High missing data detected. Consider imputation strategies.")
+        if report['validation']['quality_metrics']['uniqueness'] < 95:
+            report['recommendations'].append("Duplicate records detected. Consider deduplication.")
+        if report['validation']['issues']:
+            report['recommendations'].append("Address data quality issues before proceeding to analysis.")
+
+    return report
+
+
+def render_html(report, filepath):
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Data Quality Report - {filepath.name}</title>
+        <style>
+            body {{ font-family: Arial, sans-serif }}
+            body {{ margin: 40px }}
+            .header {{ background: #f0f8ff }}
+            .header {{ padding: 20px }}
+            .header {{ border-radius: 5px }}
+            .section {{ margin: 20px 0 }}
+            .metric {{ display: inline-block }}
+            .metric {{ margin: 10px }}
+            .metric {{ padding: 15px }}
+            .metric {{ background: #f9f9f9 }}
+            .metric {{ border-radius: 5px }}
+            .issue {{ color: #d32f2f }}
+            .recommendation {{ color: #1976d2 }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Data Quality Report</h1>
+            <p><strong>Dataset:</strong> {filepath.name}</p>
+            <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        </div>
+    """
+
+    if 'validation' in report:
+        metrics = report['validation']['quality_metrics']
+        html_content += f"""
+        <div class="section">
+            <h2>Quality Metrics</h2>
+            <div class="metric">
+                <h3>Overall Score</h3>
+                <p style="font-size: 24px; font-weight: bold;">{metrics['overall_score']}/100</p>
+            </div>
+            <div class="metric">
+                <h3>Completeness</h3>
+                <p>{metrics['completeness']:.1f}%</p>
+            </div>
+            <div class="metric">
+                <h3>Uniqueness</h3>
+                <p>{metrics['uniqueness']:.1f}%</p>
+            </div>
+            <div class="metric">
+                <h3>Consistency</h3>
+                <p>{metrics['consistency']:.1f}%</p>
+            </div>
+        </div>
+        """
+
+        if report['validation']['issues']:
+            html_content += """
+            <div class="section">
+                <h2>Issues Found</h2>
+                <ul>
+            """
+            for issue in report['validation']['issues']:
+                html_content += f'<li class="issue">{issue}</li>'
+            html_content += "</ul></div>"
+
+    if report['recommendations']:
+        html_content += """
+        <div class="section">
+            <h2>Recommendations</h2>
+            <ul>
+        """
+        for rec in report['recommendations']:
+            html_content += f'<li class="recommendation">{rec}</li>'
+        html_content += "</ul></div>"
+
+    html_content += "</body></html>"
+
+    return html_content
+
+
+def save_report(report, filepath):
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+    yaml_report_file = REPORT_DIR / f"{filepath.stem}_quality_report.yaml"
+    html_report_file = REPORT_DIR / f"{filepath.stem}_quality_report.html"
+
+    with open(yaml_report_file, 'w') as f:
+        yaml.dump(report, f, default_flow_style=False)
+
+    with open(html_report_file, 'w') as f:
+        f.write(render_html(report, filepath))
+
+    return yaml_report_file, html_report_file
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Generate a data quality report from validation and profile results.")
+    parser.add_argument("path", help="Dataset file the reports were generated for")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    filepath = Path(args.path)
+
+    if not filepath.exists():
+        print(f"❌ File not found: {filepath}")
+        exit(1)
+
+    print(f"📋 Generating quality report: {filepath}")
+
+    report = build_report(filepath, *load_inputs(filepath))
+    yaml_report_file, html_report_file = save_report(report, filepath)
+
+    print(f"✅ Quality report generated")
+    print(f"📄 YAML report: {yaml_report_file}")
+    print(f"🌐 HTML report: {html_report_file}")
+
+
+if __name__ == "__main__":
+    main()
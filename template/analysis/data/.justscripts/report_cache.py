@@ -0,0 +1,270 @@
+"""
+Content-addressed cache for validation and profiling reports.
+
+Reports are keyed by the SHA-256 of the input file plus the producing
+script's version and configuration, so a byte-identical file reuses its
+report no matter where it lives or when it was last touched.
+
+Every lookup appends a line to stats.log. The log is rolled up into
+per-kind totals in stats.yaml on every evict and whenever it grows past
+STATS_LOG_MAX_BYTES, so neither file grows with the number of lookups.
+
+Usage:
+    python3 .justscripts/report_cache.py stats
+    python3 .justscripts/report_cache.py evict [--max-size-mb N] [--max-age-days N]
+    python3 .justscripts/report_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import yaml
+from contextlib import contextmanager
+from pathlib import Path
+
+from ingest import hash_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CACHE_DIR = Path("02_intermediate/.report_cache")
+STATS_LOG = "stats.log"
+STATS_TOTALS = "stats.yaml"
+STATS_LOG_MAX_BYTES = 1024 * 1024
+DEFAULT_MAX_SIZE_MB = 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def recorded_checksum(filepath):
+    """
+    SHA-256 stored by download-external/register-internal, if still valid.
+
+    The sidecar ``<file>.metadata.yaml`` is trusted only when the recorded
+    size matches and the file has not been modified since it was written.
+    """
+    metadata_file = filepath.with_name(f"{filepath.name}.metadata.yaml")
+    if not metadata_file.exists():
+        return None
+    try:
+        with open(metadata_file, 'r') as f:
+            metadata = yaml.safe_load(f) or {}
+    except yaml.YAMLError:
+        return None
+    stat = filepath.stat()
+    if (metadata.get('checksum') and metadata.get('size_bytes') == stat.st_size
+            and stat.st_mtime <= metadata_file.stat().st_mtime):
+        return metadata['checksum']
+    return None
+
+
+def file_checksum(filepath):
+    """SHA-256 of ``filepath``, reusing a recorded checksum when possible."""
+    filepath = Path(filepath)
+    checksum = recorded_checksum(filepath)
+    if checksum:
+        return checksum
+    return hash_file(filepath)[0]
+
+
+class ReportCache:
+    """Persistent report store for one kind of report (e.g. 'validation')."""
+
+    def __init__(self, kind, version, config=None, cache_dir=CACHE_DIR):
+        self.kind = kind
+        self.version = version
+        self.config = config or {}
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, checksum):
+        material = json.dumps({'checksum': checksum, 'kind': self.kind,
+                               'version': self.version, 'config': self.config}, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / self.kind / key[:2] / f"{key}.yaml"
+
+    def _record(self, outcome):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Appends from worker processes share the lock; only a roll-up excludes them
+        with _stats_lock(self.cache_dir, fcntl.LOCK_SH if fcntl else None):
+            with open(self.cache_dir / STATS_LOG, 'a') as f:
+                f.write(f"{int(time.time())} {self.kind} {outcome}\n")
+                log_size = f.tell()
+        if log_size > STATS_LOG_MAX_BYTES:
+            roll_up_stats(self.cache_dir)
+
+    def get(self, checksum, filepath=None):
+        """Return the cached report for ``checksum`` or None."""
+        entry = self._entry_path(self.key(checksum))
+        try:
+            with open(entry, 'r') as f:
+                report = yaml.safe_load(f)
+        except (FileNotFoundError, yaml.YAMLError):
+            self.misses += 1
+            self._record('miss')
+            return None
+
+        # Refresh the entry's age so eviction is least-recently-used
+        os.utime(entry)
+        self.hits += 1
+        self._record('hit')
+        if filepath is not None:
+            report['filepath'] = str(filepath)
+        return report
+
+    def put(self, checksum, report):
+        entry = self._entry_path(self.key(checksum))
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            yaml.dump(report, f, default_flow_style=False)
+        os.replace(tmp, entry)
+
+
+def _entries(cache_dir):
+    return [path for path in Path(cache_dir).glob("*/*/*.yaml")]
+
+
+def _count_lookups(log, counts):
+    """Add the hits and misses recorded in ``log`` to ``counts`` (kind -> {'hits', 'misses'})."""
+    with open(log, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] in ('hit', 'miss'):
+                kind = counts.setdefault(parts[1], {'hits': 0, 'misses': 0})
+                kind['hits' if parts[2] == 'hit' else 'misses'] += 1
+    return counts
+
+
+def _read_totals(cache_dir):
+    try:
+        with open(Path(cache_dir) / STATS_TOTALS, 'r') as f:
+            return yaml.safe_load(f) or {}
+    except (FileNotFoundError, yaml.YAMLError):
+        return {}
+
+
+@contextmanager
+def _stats_lock(cache_dir, operation):
+    with open(Path(cache_dir) / f"{STATS_TOTALS}.lock", 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), operation)
+        yield
+
+
+def roll_up_stats(cache_dir=CACHE_DIR):
+    """Fold stats.log into the totals in stats.yaml and start a new log."""
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return
+    with _stats_lock(cache_dir, fcntl.LOCK_EX if fcntl else None):
+        # Lookups recorded from here on go to a fresh log
+        rolling = cache_dir / f"{STATS_LOG}.{os.getpid()}.rollup"
+        try:
+            os.replace(cache_dir / STATS_LOG, rolling)
+        except FileNotFoundError:
+            return
+        totals = _count_lookups(rolling, _read_totals(cache_dir))
+        tmp = cache_dir / f"{STATS_TOTALS}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            yaml.dump(totals, f, default_flow_style=False)
+        os.replace(tmp, cache_dir / STATS_TOTALS)
+        rolling.unlink()
+
+
+def evict(cache_dir=CACHE_DIR, max_size_mb=DEFAULT_MAX_SIZE_MB, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """
+    Drop entries older than ``max_age_days``, then least recently used ones
+    above ``max_size_mb``; the lookup log is rolled up into its totals.
+    """
+    roll_up_stats(cache_dir)
+    now = time.time()
+    entries = []
+    removed = 0
+    for path in _entries(cache_dir):
+        stat = path.stat()
+        if max_age_days is not None and now - stat.st_mtime > max_age_days * 24 * 3600:
+            path.unlink(missing_ok=True)
+            removed += 1
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    if max_size_mb is not None:
+        budget = max_size_mb * 1024 * 1024
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= budget:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+    return removed
+
+
+def cache_stats(cache_dir=CACHE_DIR):
+    """Entry counts, size and hit/miss totals per report kind."""
+    cache_dir = Path(cache_dir)
+    stats = {}
+    for path in _entries(cache_dir):
+        kind = stats.setdefault(path.parent.parent.name, {'entries': 0, 'size_bytes': 0, 'hits': 0, 'misses': 0})
+        kind['entries'] += 1
+        kind['size_bytes'] += path.stat().st_size
+
+    # Rolled-up totals plus the lookups logged since the last roll-up
+    counts = _read_totals(cache_dir)
+    log = cache_dir / STATS_LOG
+    if log.exists():
+        _count_lookups(log, counts)
+    for name, lookups in counts.items():
+        kind = stats.setdefault(name, {'entries': 0, 'size_bytes': 0, 'hits': 0, 'misses': 0})
+        kind['hits'] += lookups.get('hits', 0)
+        kind['misses'] += lookups.get('misses', 0)
+
+    for kind in stats.values():
+        lookups = kind['hits'] + kind['misses']
+        kind['hit_rate'] = round(kind['hits'] / lookups * 100, 1) if lookups else None
+    return stats
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Inspect and maintain the report cache.")
+    parser.add_argument("command", choices=["stats", "evict", "clear"])
+    parser.add_argument("--max-size-mb", type=float, default=DEFAULT_MAX_SIZE_MB,
+                        help=f"Size limit for evict (default: {DEFAULT_MAX_SIZE_MB})")
+    parser.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f"Age limit for evict (default: {DEFAULT_MAX_AGE_DAYS})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if args.command == "stats":
+        stats = cache_stats()
+        if not stats:
+            print(f"📝 Report cache is empty: {CACHE_DIR}")
+            return
+        print(f"🗄️  Report cache: {CACHE_DIR}")
+        for kind, info in sorted(stats.items()):
+            hit_rate = f"{info['hit_rate']}%" if info['hit_rate'] is not None else "n/a"
+            print(f"   {kind}: {info['entries']} entries, {info['size_bytes'] / 1024:.1f} KB, "
+                  f"{info['hits']} hits / {info['misses']} misses (hit rate {hit_rate})")
+    elif args.command == "evict":
+        removed = evict(max_size_mb=args.max_size_mb, max_age_days=args.max_age_days)
+        print(f"🧹 Evicted {removed} cached reports")
+    else:
+        if CACHE_DIR.exists():
+            shutil.rmtree(CACHE_DIR)
+        print(f"🧹 Cleared report cache: {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
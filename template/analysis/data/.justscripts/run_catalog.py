@@ -0,0 +1,320 @@
+"""
+Indexed catalog of Nextflow experiment runs.
+
+nextflow-run-experiment records every run here when it finishes, together
+with a manifest of its result files, so listing and filtering runs is an
+indexed SQLite query instead of a walk over every run directory (and a
+YAML parse plus a recursive results scan per run).
+
+Usage:
+    python3 .justscripts/run_catalog.py record <run_dir>
+    python3 .justscripts/run_catalog.py list [--analysis A] [--pipeline P] [--dataset D] [--status S] [--since TS]
+    python3 .justscripts/run_catalog.py results <analysis> [--files N]
+    python3 .justscripts/run_catalog.py rebuild [--full]
+
+``rebuild`` backfills the catalog from existing run directories. It only
+re-reads runs whose run_metadata.yaml changed since they were indexed;
+``--full`` also rescans every results tree.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+EXPERIMENTS_DIR = Path("15_pipelines/151_nextflow/experiments")
+ANALYSES_DIR = EXPERIMENTS_DIR / "by_analysis"
+CATALOG_DB = EXPERIMENTS_DIR / "run_catalog.sqlite"
+METADATA_FILE = "run_metadata.yaml"
+SCHEMA_VERSION = 2
+SCAN_WORKERS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_directory TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    pipeline TEXT,
+    dataset TEXT,
+    status TEXT,
+    timestamp TEXT,
+    results_directory TEXT,
+    metadata TEXT NOT NULL,
+    metadata_mtime REAL,
+    result_files INTEGER NOT NULL DEFAULT 0,
+    result_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_analysis ON runs (analysis, timestamp);
+CREATE INDEX IF NOT EXISTS runs_pipeline ON runs (pipeline);
+CREATE INDEX IF NOT EXISTS runs_dataset ON runs (dataset);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status);
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs (timestamp);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS result_files (
+    run_directory TEXT NOT NULL REFERENCES runs (run_directory) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (run_directory, path)
+) WITHOUT ROWID;
+"""
+
+
+def connect(db_path=CATALOG_DB, analyses_dir=ANALYSES_DIR, backfill=True):
+    """
+    Open the catalog, creating or resetting its schema as needed.
+
+    A catalog that has never been backfilled from the run directories on
+    disk (new, or reset by a schema change) is backfilled here first, so a
+    ``record`` into a fresh catalog cannot hide the runs made before it.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS result_files; DROP TABLE IF EXISTS runs; "
+                           "DROP TABLE IF EXISTS catalog_meta;")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    if backfill and not _initialized(conn):
+        print(f"♻️  Building run catalog from {analyses_dir}...")
+        with conn:
+            indexed, _, _ = _sync(conn, analyses_dir)
+        print(f"✅ Indexed {indexed} runs into {db_path}")
+    return conn
+
+
+def _initialized(conn):
+    return conn.execute("SELECT 1 FROM catalog_meta WHERE key = 'initialized'").fetchone() is not None
+
+
+def scan_results(results_dir):
+    """``[(relative_path, size_bytes), ...]`` for every file under ``results_dir``."""
+    results_dir = str(results_dir)
+    files = []
+    stack = [results_dir]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    files.append((os.path.relpath(entry.path, results_dir), entry.stat().st_size))
+    return files
+
+
+def read_run(run_dir):
+    """Metadata, metadata mtime and results manifest of one run directory."""
+    run_dir = Path(run_dir)
+    metadata_file = run_dir / METADATA_FILE
+    mtime = metadata_file.stat().st_mtime
+    with open(metadata_file, 'r') as f:
+        metadata = yaml.safe_load(f) or {}
+    results_dir = Path(metadata.get('results_directory') or run_dir / "results")
+    return metadata, mtime, scan_results(results_dir)
+
+
+def _store(conn, run_dir, metadata, mtime, files):
+    run_directory = str(run_dir)
+    conn.execute("DELETE FROM runs WHERE run_directory = ?", (run_directory,))
+    conn.execute(
+        "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (run_directory, metadata.get('experiment') or Path(run_dir).parent.name,
+         metadata.get('pipeline'), metadata.get('dataset'), metadata.get('status'),
+         str(metadata.get('timestamp', '')), metadata.get('results_directory'),
+         json.dumps(metadata, default=str), mtime,
+         len(files), sum(size for _, size in files)),
+    )
+    conn.executemany("INSERT INTO result_files VALUES (?, ?, ?)",
+                     ((run_directory, path, size) for path, size in files))
+
+
+def record_run(run_dir, db_path=CATALOG_DB):
+    """Index (or re-index) one finished run."""
+    run_dir = Path(run_dir)
+    with closing(connect(db_path)) as conn, conn:
+        _store(conn, run_dir, *read_run(run_dir))
+
+
+def _try_read_run(run_dir):
+    try:
+        return read_run(run_dir)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"⚠️  Skipping {run_dir}: {e}")
+        return None
+
+
+def _run_directories(analyses_dir):
+    for analysis in os.scandir(analyses_dir):
+        if not analysis.is_dir():
+            continue
+        with os.scandir(analysis.path) as runs:
+            for run in runs:
+                if run.is_dir() and os.path.exists(os.path.join(run.path, METADATA_FILE)):
+                    yield Path(run.path)
+
+
+def _sync(conn, analyses_dir, full=False):
+    analyses_dir = Path(analyses_dir)
+    run_dirs = list(_run_directories(analyses_dir)) if analyses_dir.exists() else []
+
+    known = {row['run_directory']: row['metadata_mtime']
+             for row in conn.execute("SELECT run_directory, metadata_mtime FROM runs")}
+    stale = [run_dir for run_dir in run_dirs
+             if full or known.get(str(run_dir)) != (run_dir / METADATA_FILE).stat().st_mtime]
+
+    # Reading metadata and scanning results is I/O bound; overlap it on
+    # network filesystems and keep the single SQLite writer here
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for run_dir, run in zip(stale, executor.map(_try_read_run, stale)):
+            if run is not None:
+                _store(conn, run_dir, *run)
+
+    present = {str(run_dir) for run_dir in run_dirs}
+    removed = [path for path in known if path not in present]
+    conn.executemany("DELETE FROM runs WHERE run_directory = ?", ((path,) for path in removed))
+    conn.execute("INSERT OR REPLACE INTO catalog_meta VALUES ('initialized', datetime('now'))")
+
+    return len(stale), len(run_dirs) - len(stale), len(removed)
+
+
+def rebuild(analyses_dir=ANALYSES_DIR, db_path=CATALOG_DB, full=False):
+    """
+    Backfill the catalog from the run directories on disk.
+
+    Runs already indexed with an unchanged run_metadata.yaml are skipped
+    unless ``full`` is set; runs whose directory is gone are dropped.
+
+    Returns:
+        Tuple of (indexed, unchanged, removed) run counts
+    """
+    with closing(connect(db_path, analyses_dir, backfill=False)) as conn, conn:
+        return _sync(conn, analyses_dir, full)
+
+
+def list_runs(conn, analysis=None, pipeline=None, dataset=None, status=None, since=None):
+    """Catalog rows matching every given filter, newest first."""
+    clauses, params = [], []
+    for column, value in (('analysis', analysis), ('pipeline', pipeline),
+                          ('dataset', dataset), ('status', status)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return conn.execute(f"SELECT * FROM runs {where} ORDER BY analysis, timestamp DESC", params).fetchall()
+
+
+def result_manifest(conn, run_directory, limit=None):
+    query = "SELECT path, size_bytes FROM result_files WHERE run_directory = ? ORDER BY path"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return conn.execute(query, (run_directory,)).fetchall()
+
+
+def open_catalog():
+    """Connect to the catalog, backfilling it first if it has not been yet."""
+    return connect()
+
+
+def print_runs(runs):
+    print("🔬 Nextflow Analyses")
+    print("=" * 40)
+    current = None
+    for run in runs:
+        if run['analysis'] != current:
+            current = run['analysis']
+            print(f"\n📁 {current}")
+        status_icon = "✅" if run['status'] == "SUCCESS" else "❌"
+        print(f"   {status_icon} {run['pipeline'] or 'unknown'} - {run['dataset']} ({run['timestamp']})")
+
+
+def print_results(conn, analysis, runs, files_shown):
+    print(f"📊 Results for analysis: {analysis}")
+    print("=" * 50)
+    for run in runs:
+        results_dir = run['results_directory'] or str(Path(run['run_directory']) / "results")
+        print(f"\n🔬 {run['pipeline'] or 'unknown'} - {run['dataset']}")
+        print(f"   Time: {run['timestamp']}")
+        print(f"   Status: {run['status']}")
+        print(f"   Results: {results_dir}")
+        if run['result_files']:
+            print(f"   Files: {run['result_files']} total ({run['result_bytes']} bytes)")
+            for path, size in result_manifest(conn, run['run_directory'], files_shown):
+                print(f"     - {Path(path).name} ({size} bytes)")
+            if run['result_files'] > files_shown:
+                print(f"     ... and {run['result_files'] - files_shown} more files")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Query and maintain the Nextflow run catalog.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Index one finished run")
+    record.add_argument("run_dir", help="Run directory containing run_metadata.yaml")
+
+    listing = subparsers.add_parser("list", help="List runs, grouped by analysis")
+    listing.add_argument("--analysis", default=None)
+    listing.add_argument("--pipeline", default=None)
+    listing.add_argument("--dataset", default=None)
+    listing.add_argument("--status", default=None, help="SUCCESS or FAILED")
+    listing.add_argument("--since", default=None, help="Earliest timestamp (YYYYMMDD or YYYYMMDD_HHMMSS)")
+
+    results = subparsers.add_parser("results", help="Show result files for an analysis")
+    results.add_argument("analysis")
+    results.add_argument("--files", type=int, default=5, help="Result files shown per run (default: 5)")
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Backfill the catalog from run directories")
+    rebuild_parser.add_argument("--full", action="store_true", help="Rescan every run, not just changed ones")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if args.command == "record":
+        run_dir = Path(args.run_dir)
+        if not (run_dir / METADATA_FILE).exists():
+            print(f"❌ No {METADATA_FILE} in: {run_dir}")
+            exit(1)
+        record_run(run_dir)
+        print(f"🗂️  Run indexed in catalog: {CATALOG_DB}")
+
+    elif args.command == "rebuild":
+        indexed, unchanged, removed = rebuild(full=args.full)
+        print(f"✅ Run catalog rebuilt: {indexed} indexed, {unchanged} unchanged, {removed} removed")
+        print(f"📁 Catalog: {CATALOG_DB}")
+
+    elif args.command == "list":
+        with closing(open_catalog()) as conn:
+            runs = list_runs(conn, args.analysis, args.pipeline, args.dataset, args.status, args.since)
+        if not runs:
+            print("📝 No analyses found.")
+            return
+        print_runs(runs)
+
+    else:
+        with closing(open_catalog()) as conn:
+            runs = list_runs(conn, analysis=args.analysis)
+            if not runs:
+                print(f"❌ Analysis not found: {args.analysis}")
+                exit(1)
+            print_results(conn, args.analysis, runs, args.files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Mergeable streaming sketches for dataset statistics.
+
+Every sketch supports ``update`` with a numpy array of values and
+``merge`` with another sketch of the same kind, so chunks or partitions
+can be summarised independently and combined afterwards. ``state``
+returns a sketch as JSON-compatible values and numpy arrays, and
+``from_state`` rebuilds it, so a partition's summary can be stored and
+merged later without re-reading the data (and without pickle).
+"""
+
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _plain(value):
+    """JSON-compatible form of a counted value: plain scalars as they are, anything else as text."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch.
+
+    Keeps a hierarchy of compactors where an item at level ``h`` stands for
+    ``2**h`` input values. While nothing has been compacted the sketch holds
+    every value and quantiles are exact (linear interpolation, as pandas).
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self):
+        return len(self.levels) == 1
+
+    @property
+    def rank_error(self):
+        """Normalised rank error (99% confidence) once the sketch has compacted."""
+        if self.is_exact:
+            return 0.0
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Keep one item back when the level is odd so weights stay exact
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self._rng.integers(0, 2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def state(self):
+        return {'k': self.k, 'count': self.count, 'levels': list(self.levels),
+                'rng': self._rng.bit_generator.state}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.count = state['count']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        sketch._rng.bit_generator.state = state['rng']
+        return sketch
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2 ** h, dtype=np.int64) for h, v in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        """Estimate the ``q`` quantile (0 <= q <= 1); NaN when empty."""
+        if self.count == 0:
+            return np.nan
+        items, weights = self._weighted()
+        cumulative = np.cumsum(weights)
+        position = q * (cumulative[-1] - 1)
+        lower = math.floor(position)
+        fraction = position - lower
+        a = items[np.searchsorted(cumulative, lower, side="right")]
+        b = items[np.searchsorted(cumulative, min(lower + 1, cumulative[-1] - 1), side="right")]
+        # Same two-sided interpolation numpy uses for method="linear"
+        if fraction >= 0.5:
+            return b - (b - a) * (1 - fraction)
+        return a + (b - a) * fraction
+
+
+def _bit_length(values):
+    """Vectorised int.bit_length for uint64 arrays (exact, via float64 exponents)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class DistinctSketch:
+    """
+    HyperLogLog distinct counter with ``2**precision`` one-byte registers.
+
+    Numeric values are hashed as float64 so a column parsed as int in one
+    chunk and float in another counts the same value once. Cardinality uses
+    Ertl's improved estimator, which needs no empirical bias correction.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Relative standard error of the estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    @staticmethod
+    def hash_values(values):
+        values = np.asarray(values)
+        if values.dtype.kind in 'biuf':
+            # + 0.0 folds -0.0 into 0.0, which pandas counts as one value
+            values = values.astype(np.float64) + 0.0
+            values = values[~np.isnan(values)]
+        else:
+            values = values[pd.notna(values)]
+        return pd.util.hash_array(values)
+
+    def update(self, values):
+        hashes = self.hash_values(values)
+        if len(hashes) == 0:
+            return
+        q = 64 - self.precision
+        index = (hashes >> np.uint64(q)).astype(np.int64)
+        rest = hashes & np.uint64((1 << q) - 1)
+        rank = (q + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def state(self):
+        return {'precision': self.precision, 'registers': self.registers}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(precision=state['precision'])
+        sketch.registers = np.asarray(state['registers'], dtype=np.uint8).copy()
+        return sketch
+
+    def estimate(self):
+        m = len(self.registers)
+        q = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=q + 2)
+
+        def sigma(x):
+            if x == 1:
+                return math.inf
+            y, z = 1.0, x
+            while True:
+                x *= x
+                previous = z
+                z += x * y
+                y += y
+                if z == previous:
+                    return z
+
+        def tau(x):
+            if x == 0 or x == 1:
+                return 0.0
+            y, z = 1.0, 1 - x
+            while True:
+                x = math.sqrt(x)
+                previous = z
+                y *= 0.5
+                z -= (1 - x) ** 2 * y
+                if z == previous:
+                    return z / 3
+
+        z = m * tau(1 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * sigma(histogram[0] / m)
+        return int(round(m * m / (2 * math.log(2)) / z))
+
+
+class FrequentItems:
+    """
+    Mergeable Misra-Gries summary of the most frequent values.
+
+    Holds at most ``capacity`` counters. Reported counts are lower bounds
+    and undercount any value by at most ``error`` (<= n / (capacity + 1)),
+    so every value more frequent than that is guaranteed to be kept.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+        self.error = 0
+
+    def _absorb(self, counts):
+        for value, count in counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        if len(self.counts) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            threshold = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+            self.counts = {value: count - threshold for value, count in self.counts.items() if count > threshold}
+            self.error += threshold
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts()
+        self.total += int(counts.sum())
+        if len(counts) > self.capacity:
+            # Reduce the chunk itself first (a Misra-Gries step on its exact
+            # counts), so a chunk of many distinct values never becomes a dict
+            threshold = int(counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity] - threshold
+            counts = counts[counts > 0]
+            self.error += threshold
+        self._absorb({value: int(count) for value, count in counts.items()})
+
+    def merge(self, other):
+        self.total += other.total
+        self.error += other.error
+        self._absorb(other.counts)
+        return self
+
+    def state(self):
+        return {'capacity': self.capacity, 'total': self.total, 'error': self.error,
+                'counts': [[_plain(value), count] for value, count in self.counts.items()]}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(capacity=state['capacity'])
+        sketch.total = state['total']
+        sketch.error = state['error']
+        # A value stored as text may coincide with a string counted separately
+        for value, count in state['counts']:
+            sketch.counts[value] = sketch.counts.get(value, 0) + count
+        return sketch
+
+    def top(self, n=10):
+        """The ``n`` most frequent values as (value, estimated count) pairs."""
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
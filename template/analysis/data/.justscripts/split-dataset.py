@@ -0,0 +1,324 @@
+"""
+Streaming train/validation/test splitter.
+
+Rows are read in fixed-size chunks and appended to the three splits as
+they are assigned, so memory is bounded by one chunk. Assignment is
+deterministic:
+
+- default: each row goes to a split by a seeded hash of its row number,
+  or of ``--key`` columns (rows sharing a key, e.g. a group id, always land
+  in the same split);
+- ``--stratify COL``: within every chunk and class the rows are ranked by
+  that hash and dealt out so each class keeps the split ratios (exact to
+  one row per class, given the same ``--chunk-rows``);
+- ``--time COL``: oldest rows to train, then validation, newest to test,
+  at cutoffs given with ``--cutoffs`` or estimated from a quantile sketch
+  of the time column.
+
+Usage:
+    python3 .justscripts/split-dataset.py <source> <target> [--key COL ...] [--stratify COL]
+                                          [--time COL [--cutoffs VAL_START TEST_START]]
+"""
+
+import argparse
+import yaml
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sketches import QuantileSketch
+from storage import SUFFIXES, SchemaGroup, TableWriter, iter_table, table_path
+
+TRAIN_DIR = Path("05_model_input/051_train")
+VAL_DIR = Path("05_model_input/052_validation")
+TEST_DIR = Path("05_model_input/053_test")
+
+# Split ratios
+TEST_SIZE = 0.2
+VAL_SIZE = 0.2  # 20% of the remaining 80%
+RANDOM_STATE = 42
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Split codes, in the order rows are dealt out: (metadata name, directory, file label)
+TEST, VAL, TRAIN = 0, 1, 2
+SPLITS = {TRAIN: ('train', TRAIN_DIR, 'train'), VAL: ('validation', VAL_DIR, 'val'), TEST: ('test', TEST_DIR, 'test')}
+
+
+def split_fractions(test_size, val_size):
+    """Shares of test, validation and train (validation is a share of what is left after test)."""
+    val = (1 - test_size) * val_size
+    return np.array([test_size, val, 1 - test_size - val])
+
+
+def uniform_hash(chunk, key, seed, first_row):
+    """
+    Seeded hash of each row mapped to [0, 1).
+
+    Numeric key columns are hashed as float64 so a key parsed as int in
+    one chunk and float in another still hashes the same.
+    """
+    if key:
+        values = chunk[key].copy()
+        for col in key:
+            if pd.api.types.is_numeric_dtype(values[col]) and not pd.api.types.is_bool_dtype(values[col]):
+                values[col] = values[col].astype("float64")
+    else:
+        values = pd.Series(np.arange(first_row, first_row + len(chunk), dtype="uint64"))
+    hashes = pd.util.hash_pandas_object(values, index=False, hash_key=f"{seed:016d}"[-16:]).to_numpy()
+    return (hashes >> np.uint64(11)).astype("float64") / 2.0 ** 53
+
+
+def assign_hashed(u, fractions):
+    return np.searchsorted(np.cumsum(fractions[:2]), u, side='right').astype("int8")
+
+
+class StratifiedAssigner:
+    """
+    Deal rows of each class out to the splits in proportion.
+
+    Every class tracks how many of its rows each split has received; the
+    rows of a chunk go, in hash order, to the splits furthest below their
+    share of all rows of that class seen so far.
+    """
+
+    def __init__(self, fractions):
+        self.fractions = fractions
+        self.assigned = {}
+
+    @staticmethod
+    def _class_values(series):
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = series.astype("float64")
+        return series.astype(object).where(series.notna(), None)
+
+    def assign(self, strata, u):
+        codes = np.empty(len(u), dtype="int8")
+        groups = pd.Series(np.arange(len(u))).groupby(self._class_values(strata).to_numpy(), dropna=False)
+        for value, rows in groups.indices.items():
+            value = None if isinstance(value, float) and np.isnan(value) else value
+            assigned = self.assigned.setdefault(value, np.zeros(3, dtype="int64"))
+            needed = np.maximum((assigned.sum() + len(rows)) * self.fractions - assigned, 0)
+            # Largest-remainder rounding of the needed rows to this chunk's rows
+            share = needed / needed.sum() * len(rows)
+            take = np.floor(share).astype("int64")
+            for split in np.argsort(-(share - take), kind='stable')[:len(rows) - take.sum()]:
+                take[split] += 1
+            ordered = rows[np.argsort(u[rows], kind='stable')]
+            codes[ordered] = np.repeat(np.arange(3, dtype="int8"), take)
+            assigned += take
+        return codes
+
+
+def time_values(series):
+    """Time column as float64 (nanoseconds for dates and timestamps, NaN when missing)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float64").to_numpy()
+    times = pd.to_datetime(series, errors='coerce')
+    if getattr(times.dt, 'tz', None) is not None:
+        times = times.dt.tz_convert(None)
+    values = times.astype("int64").astype("float64").to_numpy()
+    values[times.isna().to_numpy()] = np.nan
+    return values
+
+
+def parse_cutoff(value):
+    """``(value, is_datetime)`` for a cutoff given as a number or a date/time string."""
+    try:
+        return float(value), False
+    except ValueError:
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert(None)
+        return float(timestamp.value), True
+
+
+def estimate_cutoffs(source_path, column, fractions, chunk_rows):
+    """
+    Validation and test start times from a quantile sketch of ``column``.
+
+    Returns:
+        Tuple of ((validation_start, test_start), is_datetime)
+    """
+    sketch = QuantileSketch(k=1000)
+    is_datetime = False
+    for chunk in iter_table(source_path, chunk_rows, columns=[column]):
+        is_datetime = not pd.api.types.is_numeric_dtype(chunk[column])
+        sketch.update(time_values(chunk[column]))
+    train_share = fractions[TRAIN]
+    return (sketch.quantile(train_share), sketch.quantile(train_share + fractions[VAL])), is_datetime
+
+
+def assign_by_time(times, cutoffs):
+    codes = np.full(len(times), TRAIN, dtype="int8")
+    codes[times >= cutoffs[0]] = VAL
+    codes[times >= cutoffs[1]] = TEST
+    return codes
+
+
+def _format_time(value, is_datetime):
+    return pd.Timestamp(int(value)).isoformat() if is_datetime else float(value)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Split a dataset into train/validation/test sets.")
+    parser.add_argument("source", help="Dataset file (.csv, .xlsx, .xls, .parquet, .feather)")
+    parser.add_argument("target", help="Name for the split datasets")
+    parser.add_argument("--format", choices=list(SUFFIXES), default=None,
+                        help="Storage format (default: configured format for 05_model_input)")
+    parser.add_argument("--export-csv", action="store_true",
+                        help="Also write CSV copies of the splits")
+    parser.add_argument("--test-size", type=float, default=TEST_SIZE,
+                        help=f"Share of rows for test (default: {TEST_SIZE})")
+    parser.add_argument("--val-size", type=float, default=VAL_SIZE,
+                        help=f"Share of the remaining rows for validation (default: {VAL_SIZE})")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE, help=f"Hash seed (default: {RANDOM_STATE})")
+    parser.add_argument("--key", nargs="+", default=None,
+                        help="Hash these columns instead of the row number; rows sharing a key stay together")
+    parser.add_argument("--stratify", default=None, help="Keep the split ratios within each class of this column")
+    parser.add_argument("--time", default=None, help="Split by this time column: train oldest, test newest")
+    parser.add_argument("--cutoffs", nargs=2, default=None, metavar=("VAL_START", "TEST_START"),
+                        help="Start of validation and test for --time (default: estimated from the ratios)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows per chunk (default: {DEFAULT_CHUNK_ROWS}); stratified splits depend on it")
+    args = parser.parse_args()
+    if args.time and (args.key or args.stratify):
+        parser.error("--time cannot be combined with --key or --stratify")
+    if args.cutoffs and not args.time:
+        parser.error("--cutoffs requires --time")
+    return args
+
+
+def main():
+    args = parse_arguments()
+    source_path = Path(args.source)
+    target_name = args.target
+    timestamp = datetime.now().strftime('%Y%m%d')
+
+    if not source_path.exists():
+        print(f"❌ Source file not found: {source_path}")
+        exit(1)
+
+    fractions = split_fractions(args.test_size, args.val_size)
+    if (fractions < 0).any():
+        print("❌ Split sizes must be between 0 and 1")
+        exit(1)
+
+    method = 'time' if args.time else 'stratified' if args.stratify else 'hash'
+    print(f"🔄 Splitting dataset: {source_path} ({method})")
+
+    cutoffs, is_datetime = None, False
+    if args.time:
+        try:
+            if args.cutoffs:
+                parsed = [parse_cutoff(value) for value in args.cutoffs]
+                cutoffs, is_datetime = tuple(value for value, _ in parsed), parsed[0][1]
+            else:
+                cutoffs, is_datetime = estimate_cutoffs(source_path, args.time, fractions, args.chunk_rows)
+        except Exception as e:
+            print(f"❌ Error reading time column '{args.time}': {e}")
+            exit(1)
+
+    # Create output directories
+    for dir_path in [TRAIN_DIR, VAL_DIR, TEST_DIR]:
+        dir_path.mkdir(parents=True, exist_ok=True)
+
+    # One schema for all splits: a promotion forced by one split's chunk rewrites the others too
+    schema = SchemaGroup()
+    writers = {code: TableWriter(table_path(directory, f"{target_name}_{label}_{timestamp}", args.format), schema)
+               for code, (_, directory, label) in SPLITS.items()}
+    csv_writers = {}
+    if args.export_csv:
+        csv_writers = {code: TableWriter(writer.filepath.with_suffix('.csv'))
+                       for code, writer in writers.items() if writer.suffix != '.csv'}
+
+    stratifier = StratifiedAssigner(fractions) if args.stratify else None
+    rows, columns, untimed = 0, 0, 0
+    try:
+        for chunk in iter_table(source_path, args.chunk_rows):
+            if args.time:
+                times = time_values(chunk[args.time])
+                untimed += int(np.isnan(times).sum())
+                codes = assign_by_time(times, cutoffs)
+            else:
+                u = uniform_hash(chunk, args.key, args.seed, rows)
+                codes = stratifier.assign(chunk[args.stratify], u) if stratifier else assign_hashed(u, fractions)
+
+            for code in SPLITS:
+                part = chunk[codes == code]
+                writers[code].write(part)
+                if code in csv_writers:
+                    csv_writers[code].write(part)
+            rows += len(chunk)
+            columns = chunk.shape[1]
+    except Exception as e:
+        print(f"❌ Error splitting file: {e}")
+        exit(1)
+    finally:
+        for writer in list(writers.values()) + list(csv_writers.values()):
+            writer.close()
+
+    if rows == 0:
+        print(f"❌ No rows to split in {source_path}")
+        exit(1)
+    if untimed:
+        print(f"⚠️  {untimed} rows without a valid '{args.time}' value were put in train")
+
+    # Create split metadata
+    split_config = {
+        'test_size': args.test_size,
+        'val_size': args.val_size,
+        'random_state': args.seed,
+        'method': method,
+        'chunk_rows': args.chunk_rows,
+    }
+    if args.key:
+        split_config['key'] = list(args.key)
+    if args.stratify:
+        split_config['stratify'] = args.stratify
+    if args.time:
+        split_config['time_column'] = args.time
+        split_config['cutoffs'] = {'validation_start': _format_time(cutoffs[0], is_datetime),
+                                   'test_start': _format_time(cutoffs[1], is_datetime)}
+
+    metadata = {
+        'source_file': str(source_path),
+        'split_at': datetime.now().isoformat(),
+        'original_shape': [rows, columns],
+        'split_config': split_config,
+        'splits': {
+            SPLITS[code][0]: {
+                'file': str(writers[code].filepath),
+                'shape': [writers[code].rows, columns],
+                'percentage': round(writers[code].rows / rows * 100, 1)
+            }
+            for code in (TRAIN, VAL, TEST)
+        }
+    }
+
+    for code, writer in csv_writers.items():
+        metadata['splits'][SPLITS[code][0]]['csv_export'] = str(writer.filepath)
+
+    # Save metadata in all directories
+    for dir_path in [TRAIN_DIR, VAL_DIR, TEST_DIR]:
+        metadata_file = dir_path / f"{target_name}_split_{timestamp}.metadata.yaml"
+        with open(metadata_file, 'w') as f:
+            yaml.dump(metadata, f, default_flow_style=False)
+
+    splits = metadata['splits']
+    print(f"\n✅ Dataset split successfully!")
+    print(f"   Original: {rows} rows")
+    print(f"   Train: {splits['train']['shape'][0]} rows ({splits['train']['percentage']}%)")
+    print(f"   Validation: {splits['validation']['shape'][0]} rows ({splits['validation']['percentage']}%)")
+    print(f"   Test: {splits['test']['shape'][0]} rows ({splits['test']['percentage']}%)")
+
+    print(f"\n📄 Split files:")
+    print(f"   Train: {splits['train']['file']}")
+    print(f"   Validation: {splits['validation']['file']}")
+    print(f"   Test: {splits['test']['file']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Per-layer table storage for the data directory.
+
+Intermediate layers default to Parquet so each hop keeps its dtypes and
+avoids re-parsing text; 01_raw stays in whatever format was ingested.
+Formats can be overridden per layer in data_config.yaml:
+
+    storage:
+      formats:
+        02_intermediate: feather
+        05_model_input: csv
+
+CSV remains available everywhere as an export:
+
+    python3 .justscripts/storage.py export-csv <path> [--output <csv>]
+
+Tables too large for memory can be read with ``iter_table`` and written
+with ``TableWriter``, one chunk at a time.
+"""
+
+import argparse
+import os
+import pandas as pd
+import yaml
+from pathlib import Path
+
+DATA_CONFIG = Path("data_config.yaml")
+
+SUFFIXES = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv'}
+READABLE_SUFFIXES = {'.csv', '.xlsx', '.xls', '.parquet', '.feather'}
+
+DEFAULT_FORMATS = {
+    '02_intermediate': 'parquet',
+    '03_primary': 'parquet',
+    '04_feature': 'parquet',
+    '05_model_input': 'parquet',
+}
+FALLBACK_FORMAT = 'csv'
+
+
+def configured_formats(config_file=DATA_CONFIG):
+    formats = dict(DEFAULT_FORMATS)
+    if config_file.exists():
+        with open(config_file, 'r') as f:
+            config = yaml.safe_load(f) or {}
+        formats.update((config.get('storage') or {}).get('formats') or {})
+    return formats
+
+
+def layer_format(directory, fmt=None):
+    """Storage format for files written under ``directory`` (``fmt`` wins if given)."""
+    if fmt:
+        if fmt not in SUFFIXES:
+            raise ValueError(f"Unsupported storage format: {fmt} (choose from {', '.join(SUFFIXES)})")
+        return fmt
+    formats = configured_formats()
+    for part in Path(directory).parts:
+        if part in formats:
+            return formats[part]
+    return FALLBACK_FORMAT
+
+
+def table_path(directory, stem, fmt=None):
+    """Path for a table named ``stem`` in ``directory`` using the layer's format."""
+    return Path(directory) / f"{stem}{SUFFIXES[layer_format(directory, fmt)]}"
+
+
+def _apply_filters(df, filters):
+    for column, op, value in filters:
+        series = df[column]
+        if op in ('=', '=='):
+            mask = series == value
+        elif op == '!=':
+            mask = series != value
+        elif op == '<':
+            mask = series < value
+        elif op == '<=':
+            mask = series <= value
+        elif op == '>':
+            mask = series > value
+        elif op == '>=':
+            mask = series >= value
+        elif op == 'in':
+            mask = series.isin(value)
+        elif op == 'not in':
+            mask = ~series.isin(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        df = df[mask]
+    return df.reset_index(drop=True)
+
+
+def read_table(filepath, columns=None, filters=None):
+    """
+    Load a table, reading only ``columns`` and rows matching ``filters``.
+
+    ``filters`` uses the pyarrow form ``[(column, op, value), ...]`` (ANDed).
+    Parquet pushes both down to the file, skipping unneeded column chunks
+    and row groups; the other formats project on read and filter after.
+    """
+    filepath = Path(filepath)
+    suffix = filepath.suffix.lower()
+
+    if suffix == '.parquet':
+        return pd.read_parquet(filepath, columns=columns, filters=filters or None)
+
+    if suffix == '.feather':
+        df = pd.read_feather(filepath, columns=columns)
+    elif suffix == '.csv':
+        df = pd.read_csv(filepath, usecols=columns)
+    elif suffix in ['.xlsx', '.xls']:
+        df = pd.read_excel(filepath, usecols=columns)
+    else:
+        raise ValueError(f"Unsupported file format: {filepath.suffix}")
+
+    return _apply_filters(df, filters) if filters else df
+
+
+def _rebatch(batches, chunk_rows):
+    """Regroup Arrow record batches into tables of exactly ``chunk_rows`` rows (the last may be shorter)."""
+    import pyarrow as pa
+
+    pending, pending_rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def iter_table(filepath, chunk_rows, columns=None):
+    """
+    Yield a table as DataFrames of ``chunk_rows`` rows (the last may be shorter).
+
+    Chunk boundaries depend only on ``chunk_rows``, not on the file's row
+    groups or record batches. Parquet is read batch by batch and Feather
+    through a memory map; Excel has no incremental reader and is loaded
+    whole before being sliced.
+    """
+    filepath = Path(filepath)
+    suffix = filepath.suffix.lower()
+
+    if suffix == '.csv':
+        yield from pd.read_csv(filepath, chunksize=chunk_rows, usecols=columns)
+    elif suffix == '.parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(filepath).iter_batches(batch_size=chunk_rows, columns=columns)
+        for table in _rebatch(batches, chunk_rows):
+            yield table.to_pandas()
+    elif suffix == '.feather':
+        import pyarrow as pa
+        with pa.memory_map(str(filepath)) as source:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            for table in _rebatch(batches, chunk_rows):
+                yield (table.select(columns) if columns else table).to_pandas()
+    elif suffix in ['.xlsx', '.xls']:
+        df = read_table(filepath, columns=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+    else:
+        raise ValueError(f"Unsupported file format: {filepath.suffix}")
+
+
+def _promote_field(current, new):
+    """Narrowest field holding both types; text when they have no common type."""
+    import pyarrow as pa
+
+    if current.type == new.type:
+        return current
+    try:
+        return pa.unify_schemas([pa.schema([current]), pa.schema([new])], promote_options='permissive').field(0)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        return pa.field(current.name, pa.string())
+
+
+class SchemaGroup:
+    """
+    One Arrow schema shared by several ``TableWriter``s, e.g. the splits of
+    one table: a type promotion needed by any of them rewrites all of them,
+    so every part ends up with the same column types.
+    """
+
+    def __init__(self):
+        self.schema = None
+        self.writers = []
+
+    def promote(self, schema):
+        import pyarrow as pa
+
+        self.schema = pa.schema([_promote_field(current, new) for current, new in zip(self.schema, schema)])
+        for writer in self.writers:
+            if writer._writer is not None:
+                writer._rewrite(self.schema)
+
+
+class TableWriter:
+    """
+    Write a table chunk by chunk in the format given by ``filepath``'s suffix.
+
+    Parquet and Feather chunks are appended under the schema of the first
+    chunk. When a later chunk needs a wider type (a CSV column that held
+    only integers so far turns out to hold floats or text), what has been
+    written is rewritten once under the promoted schema, batch by batch.
+    Writers given the same ``schema_group`` promote together.
+    """
+
+    def __init__(self, filepath, schema_group=None):
+        self.filepath = Path(filepath)
+        self.suffix = self.filepath.suffix.lower()
+        if self.suffix not in SUFFIXES.values():
+            raise ValueError(f"Unsupported file format: {self.filepath.suffix}")
+        self.rows = 0
+        self.columns = None
+        self._group = schema_group or SchemaGroup()
+        self._group.writers.append(self)
+        self._writer = None
+        self._path = self.filepath
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open(self, schema, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._path = path
+        if self.suffix == '.parquet':
+            self._writer = pq.ParquetWriter(path, schema)
+        else:
+            self._writer = pa.ipc.new_file(str(path), schema)
+
+    def _written_batches(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.suffix == '.parquet':
+            yield from pq.ParquetFile(path).iter_batches()
+        else:
+            with pa.memory_map(str(path)) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i)
+
+    def _rewrite(self, schema):
+        import pyarrow as pa
+
+        self._writer.close()
+        written = self._path
+        spare = [self.filepath.with_name(f".{self.filepath.name}.{n}.tmp") for n in (0, 1)]
+        target = spare[1] if written == spare[0] else spare[0]
+        self._open(schema, target)
+        for batch in self._written_batches(written):
+            self._writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+        os.remove(written)
+
+    def write(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            raise ValueError("All chunks of a table must have the same columns")
+
+        if self.suffix == '.csv':
+            df.to_csv(self.filepath, mode='a' if self._writer else 'w', header=not self._writer, index=False)
+            self._writer = True
+        else:
+            import pyarrow as pa
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            group = self._group
+            if group.schema is None:
+                group.schema = table.schema
+            elif not table.schema.equals(group.schema):
+                try:
+                    table = table.cast(group.schema)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                    group.promote(table.schema)
+                    table = table.cast(group.schema)
+            if self._writer is None:
+                self._open(group.schema, self.filepath)
+            if table.num_rows or not self.rows:
+                self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self.suffix != '.csv' and self._writer is not None:
+            self._writer.close()
+            if self._path != self.filepath:
+                os.replace(self._path, self.filepath)
+        self._writer = None
+        return self.filepath
+
+
+def write_table(df, filepath):
+    """Write ``df`` in the format given by ``filepath``'s suffix."""
+    filepath = Path(filepath)
+    suffix = filepath.suffix.lower()
+
+    if suffix == '.parquet':
+        df.to_parquet(filepath, index=False)
+    elif suffix == '.feather':
+        df.reset_index(drop=True).to_feather(filepath)
+    elif suffix == '.csv':
+        df.to_csv(filepath, index=False)
+    else:
+        raise ValueError(f"Unsupported file format: {filepath.suffix}")
+    return filepath
+
+
+def export_csv(filepath, target=None):
+    """Write a CSV copy of a stored table next to it (or to ``target``)."""
+    filepath = Path(filepath)
+    target = Path(target) if target else filepath.with_suffix('.csv')
+    return write_table(read_table(filepath), target)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Convert stored tables.")
+    parser.add_argument("command", choices=["export-csv"])
+    parser.add_argument("path", help="Stored table (.parquet, .feather)")
+    parser.add_argument("--output", default=None, help="CSV path (default: next to the table)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    filepath = Path(args.path)
+
+    if not filepath.exists():
+        print(f"❌ File not found: {filepath}")
+        exit(1)
+
+    print(f"📄 CSV export: {export_csv(filepath, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
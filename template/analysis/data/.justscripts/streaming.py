@@ -0,0 +1,524 @@
+"""
+Chunked CSV reading and mergeable accumulators for streaming validation
+and approximate profiling.
+
+Each accumulator consumes one DataFrame chunk at a time and can be merged
+with another accumulator of the same kind, so a file can be processed in
+bounded memory (or split across workers) and still produce whole-file
+metrics.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sketches import DistinctSketch, FrequentItems, QuantileSketch
+
+# Shared analysis engines live with the other Python analysis scripts
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts" / "python"))
+
+from type_classification import TypeProfile, classify_series  # noqa: E402
+
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+# Share of the memory budget a single parsed chunk may occupy; the rest is
+# headroom for the CSV parser and the accumulators themselves.
+CHUNK_BUDGET_FRACTION = 0.25
+
+# Share of the memory budget for the duplicate tracker's row hashes (8 bytes
+# per distinct row); beyond it the hashes spill to temporary files
+DUPLICATE_BUDGET_FRACTION = 0.25
+SPILL_PARTITIONS = 256
+# Row-hash contribution of a null, whatever the dtype of the chunk holding it
+NULL_HASH = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+SAMPLE_ROWS = 1000
+
+
+def estimate_chunk_rows(filepath, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Estimate how many CSV rows fit in the chunk share of the memory budget."""
+    sample = pd.read_csv(filepath, nrows=SAMPLE_ROWS)
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = max(1.0, sample.memory_usage(deep=True).sum() / len(sample))
+    budget_bytes = memory_budget_mb * 1024 * 1024 * CHUNK_BUDGET_FRACTION
+    return max(SAMPLE_ROWS, int(budget_bytes / bytes_per_row))
+
+
+def iter_csv_chunks(filepath, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, usecols=None):
+    """Yield DataFrame chunks sized to stay within ``memory_budget_mb``."""
+    chunk_rows = estimate_chunk_rows(filepath, memory_budget_mb)
+    yield from pd.read_csv(filepath, chunksize=chunk_rows, usecols=usecols)
+
+
+class MissingCounter:
+    """Per-column missing-value counts."""
+
+    def __init__(self):
+        self.rows = 0
+        self.missing = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, count in other.missing.items():
+            self.missing[col] = self.missing.get(col, 0) + count
+        return self
+
+    @property
+    def total_missing(self):
+        return sum(self.missing.values())
+
+
+class DuplicateTracker:
+    """
+    Exact-row duplicate counter over 64-bit row hashes.
+
+    Hashes seen so far are kept as sorted runs (merged log-structured style),
+    costing 8 bytes per distinct row. With a ``memory_budget_bytes``, runs
+    that would outgrow it (a merge briefly needs twice their size) are
+    spilled to ``SPILL_PARTITIONS`` temporary files by hash prefix and later
+    hashes are appended there; each partition is then de-duplicated on its
+    own, split again by the next prefix byte if it still does not fit.
+    Values are hashed in one standard form so rows compare as in
+    ``DataFrame.duplicated`` whatever dtype each chunk was parsed as: ints
+    as int64, whole-number floats as the same int64 (-0.0 as 0), booleans
+    as the objects they are in a chunk that also holds nulls, and every
+    null alike.
+    """
+
+    def __init__(self, memory_budget_bytes=None, spill_dir=None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir
+        self.counted = 0
+        self.runs = []
+        self.spilled_to = None
+        self._resolved = None
+
+    @staticmethod
+    def column_hashes(series):
+        values = series.to_numpy()
+        if values.dtype.kind in 'iu':
+            hashes = pd.util.hash_array(values.astype(np.int64))
+        elif values.dtype.kind == 'f':
+            values = values.astype(np.float64) + 0.0
+            whole = (np.floor(values) == values) & (np.abs(values) < 2.0 ** 63)
+            hashes = pd.util.hash_array(values)
+            hashes[whole] = pd.util.hash_array(values[whole].astype(np.int64))
+        elif values.dtype.kind == 'b':
+            hashes = pd.util.hash_array(values.astype(object))
+        else:
+            hashes = pd.util.hash_array(values)
+        hashes[pd.isna(values)] = NULL_HASH
+        return hashes
+
+    @classmethod
+    def row_hashes(cls, chunk):
+        hashes = np.zeros(len(chunk), dtype=np.uint64)
+        for _, series in chunk.items():
+            hashes = hashes * np.uint64(0x100000001B3) ^ cls.column_hashes(series)
+        return hashes
+
+    def _seen(self, hashes):
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            seen |= run[positions] == hashes
+        return seen
+
+    def _add_run(self, run):
+        self.runs.append(run)
+        # Merge runs of similar size so lookups touch O(log n) runs
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            newest = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], newest)
+
+    def _add_unique(self, unique_hashes):
+        seen = self._seen(unique_hashes)
+        self.counted += int(seen.sum())
+        fresh = unique_hashes[~seen]
+        if len(fresh):
+            self._add_run(fresh)
+
+    def _over_budget(self):
+        return self.memory_budget_bytes is not None and 2 * self.memory_bytes > self.memory_budget_bytes
+
+    def _append(self, hashes, directory=None, shift=56):
+        # Partition by one byte of the hash and append each part to its file
+        directory = directory or self.spilled_to
+        partitions = ((hashes >> np.uint64(shift)) & np.uint64(0xFF)).astype(np.intp)
+        order = np.argsort(partitions, kind="stable")
+        bounds = np.searchsorted(partitions[order], np.arange(SPILL_PARTITIONS + 1))
+        for partition in range(SPILL_PARTITIONS):
+            part = hashes[order[bounds[partition]:bounds[partition + 1]]]
+            if len(part):
+                with open(os.path.join(directory, f"{partition:02x}.bin"), "ab") as f:
+                    part.tofile(f)
+        self._resolved = None
+
+    def _spill(self):
+        """Move the in-memory runs to partition files; later hashes go there too."""
+        self.spilled_to = tempfile.mkdtemp(prefix="duplicates-", dir=self.spill_dir)
+        for run in self.runs:
+            self._append(run)
+        self.runs = []
+
+    def update(self, chunk):
+        hashes = self.row_hashes(chunk)
+        if self.spilled_to is not None:
+            self._append(hashes)
+            return
+        unique_hashes = np.unique(hashes)
+        self.counted += len(hashes) - len(unique_hashes)
+        self._add_unique(unique_hashes)
+        if self._over_budget():
+            self._spill()
+
+    def merge(self, other):
+        self.counted += other.counted
+        if self.spilled_to is None and other.spilled_to is None:
+            for run in other.runs:
+                self._add_unique(run)
+            if self._over_budget():
+                self._spill()
+            return self
+
+        if self.spilled_to is None:
+            self._spill()
+        for run in other.runs:
+            self._append(run)
+        if other.spilled_to is not None:
+            for name in sorted(os.listdir(other.spilled_to)):
+                with open(os.path.join(other.spilled_to, name), "rb") as src, \
+                        open(os.path.join(self.spilled_to, name), "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+        self._resolved = None
+        return self
+
+    def _partition_duplicates(self, path, shift):
+        size = os.path.getsize(path) // 8
+        budget = self.memory_budget_bytes
+        if shift < 0 or 2 * size * 8 <= budget:
+            hashes = np.fromfile(path, dtype=np.uint64)
+            return len(hashes) - len(np.unique(hashes))
+
+        # Still too large: split by the next byte of the hash, a block at a time
+        directory = tempfile.mkdtemp(prefix="split-", dir=os.path.dirname(path))
+        try:
+            block = max(1, budget // 16)
+            for offset in range(0, size, block):
+                self._append(np.fromfile(path, dtype=np.uint64, count=block, offset=offset * 8), directory, shift)
+            return sum(self._partition_duplicates(os.path.join(directory, name), shift - 8)
+                       for name in sorted(os.listdir(directory)))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    @property
+    def duplicates(self):
+        """Rows identical to an earlier row."""
+        if self.spilled_to is None:
+            return self.counted
+        if self._resolved is None:
+            self._resolved = self.counted + sum(
+                self._partition_duplicates(os.path.join(self.spilled_to, name), 48)
+                for name in sorted(os.listdir(self.spilled_to)) if name.endswith(".bin"))
+        return self._resolved
+
+    @property
+    def memory_bytes(self):
+        return sum(run.nbytes for run in self.runs)
+
+    def close(self):
+        """Remove spilled partition files."""
+        if self.spilled_to is not None:
+            shutil.rmtree(self.spilled_to, ignore_errors=True)
+            self.spilled_to = None
+            self.runs = []
+
+
+class TypeTracker:
+    """
+    Per-column dtype resolution and value-type histograms across chunks.
+
+    A CSV column that resolves to text but had chunks parsed as numbers
+    holds numeric-looking strings; those chunks are folded back in as
+    strings so the histogram matches a whole-file read.
+    """
+
+    def __init__(self):
+        self.dtypes = {}
+        self.text_profiles = {}
+        self.parsed_profiles = {}
+        # dtype pandas picks for a column that was entirely null in every chunk so far
+        self.null_dtypes = {}
+
+    @staticmethod
+    def _resolve(current, new):
+        if current is None or current == new:
+            return new
+        if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new):
+            return np.result_type(current, new)
+        return np.dtype("object")
+
+    def _observe(self, col, dtype, profile):
+        self.dtypes[col] = self._resolve(self.dtypes.get(col), dtype)
+        profiles = self.text_profiles if dtype == "object" else self.parsed_profiles
+        if col in profiles:
+            profiles[col].merge(profile)
+        else:
+            profiles[col] = profile
+
+    def update(self, chunk):
+        for col, dtype in chunk.dtypes.items():
+            profile = classify_series(chunk[col])
+            if not profile.histogram:
+                self.null_dtypes.setdefault(col, dtype)
+                continue
+            self._observe(col, dtype, profile)
+
+    def merge(self, other):
+        for profiles in (other.text_profiles, other.parsed_profiles):
+            for col, profile in profiles.items():
+                self._observe(col, np.dtype("object") if profiles is other.text_profiles
+                              else other.dtypes[col], profile)
+        for col, dtype in other.null_dtypes.items():
+            self.null_dtypes.setdefault(col, dtype)
+        return self
+
+    def resolved(self, col):
+        """Whole-file dtype of ``col``."""
+        return self.dtypes.get(col, self.null_dtypes.get(col, np.dtype("object")))
+
+    def profile(self, col):
+        """Whole-file TypeProfile of ``col`` (None when it was always null)."""
+        text = self.text_profiles.get(col)
+        parsed = self.parsed_profiles.get(col)
+        if text is None or parsed is None:
+            return text or parsed
+        values = sum(parsed.histogram.values())
+        numeric_text = TypeProfile(inferred_dtype=text.inferred_dtype,
+                                   histogram={'string': values},
+                                   string_content={'numeric': values})
+        return TypeProfile(inferred_dtype=text.inferred_dtype,
+                           histogram=dict(text.histogram),
+                           string_content=dict(text.string_content),
+                           string_content_sampled=text.string_content_sampled,
+                           date_sample=text.date_sample).merge(numeric_text)
+
+    @property
+    def mixed(self):
+        """Text columns holding more than one kind of value (builds every profile; read it once)."""
+        mixed = set()
+        for col in self.dtypes:
+            profile = self.profile(col)
+            if self.resolved(col) == "object" and profile is not None and profile.is_mixed:
+                mixed.add(col)
+        return mixed
+
+
+class OutlierTracker:
+    """
+    IQR outlier counts for numeric columns.
+
+    Quartiles come from mergeable quantile sketches; the exact number of
+    values outside the resulting fences needs a second pass over the data
+    via ``count``.
+    """
+
+    def __init__(self, k=1000):
+        self.k = k
+        self.sketches = {}
+        self.outliers = {}
+
+    def update(self, chunk):
+        for col in chunk.select_dtypes(include=[np.number]).columns:
+            sketch = self.sketches.setdefault(col, QuantileSketch(k=self.k))
+            sketch.update(chunk[col].to_numpy(dtype="float64", na_value=np.nan))
+
+    def merge(self, other):
+        for col, sketch in other.sketches.items():
+            if col in self.sketches:
+                self.sketches[col].merge(sketch)
+            else:
+                self.sketches[col] = sketch
+        for col, count in other.outliers.items():
+            self.outliers[col] = self.outliers.get(col, 0) + count
+        return self
+
+    def fences(self, col):
+        sketch = self.sketches[col]
+        Q1 = sketch.quantile(0.25)
+        Q3 = sketch.quantile(0.75)
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+    def count(self, chunk, fences):
+        for col, (lower, upper) in fences.items():
+            if col in chunk.columns and pd.api.types.is_numeric_dtype(chunk[col]):
+                outliers = int(((chunk[col] < lower) | (chunk[col] > upper)).sum())
+                self.outliers[col] = self.outliers.get(col, 0) + outliers
+
+
+class ColumnSketch:
+    """
+    Mergeable profile of one column.
+
+    Row, null and moment statistics are exact; distinct counts, quantiles
+    and top values come from sketches with the error bounds they report.
+    Text statistics cover the chunks that were read as text.
+    """
+
+    def __init__(self, quantile_k=1000, distinct_precision=14, top_capacity=1000):
+        self.dtype = None
+        # dtype pandas picks while every value seen so far is null
+        self.null_dtype = None
+        self.rows = 0
+        self.nulls = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.quantiles = QuantileSketch(k=quantile_k)
+        self.distinct = DistinctSketch(precision=distinct_precision)
+        self.frequent = FrequentItems(capacity=top_capacity)
+        self.length_sum = 0
+        self.length_rows = 0
+
+    def _add_moments(self, count, mean, m2):
+        # Chan et al. parallel update of mean and sum of squared deviations
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, series):
+        values = series.to_numpy()
+        nulls = int(series.isnull().sum())
+        self.rows += len(series)
+        self.nulls += nulls
+        if nulls < len(series):
+            self.dtype = TypeTracker._resolve(self.dtype, series.dtype)
+        elif self.null_dtype is None and len(series):
+            self.null_dtype = series.dtype
+        self.distinct.update(values)
+
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            numbers = series.to_numpy(dtype="float64", na_value=np.nan)
+            numbers = numbers[~np.isnan(numbers)]
+            if len(numbers):
+                self.min = np.fmin(self.min, numbers.min())
+                self.max = np.fmax(self.max, numbers.max())
+                mean = numbers.mean()
+                self._add_moments(len(numbers), mean, float(((numbers - mean) ** 2).sum()))
+                self.quantiles.update(numbers)
+        elif series.dtype == object:
+            self.frequent.update(series.dropna().to_numpy())
+            self.length_sum += int(series.astype(str).str.len().sum())
+            self.length_rows += len(series)
+
+    def merge(self, other):
+        if other.dtype is not None:
+            self.dtype = TypeTracker._resolve(self.dtype, other.dtype)
+        if self.null_dtype is None:
+            self.null_dtype = other.null_dtype
+        self.rows += other.rows
+        self.nulls += other.nulls
+        if other.count:
+            self.min = np.fmin(self.min, other.min)
+            self.max = np.fmax(self.max, other.max)
+            self._add_moments(other.count, other.mean, other.m2)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.length_sum += other.length_sum
+        self.length_rows += other.length_rows
+        return self
+
+    def state(self):
+        state = {key: getattr(self, key) for key in ('rows', 'nulls', 'count', 'length_sum', 'length_rows')}
+        state.update({
+            'dtype': None if self.dtype is None else str(self.dtype),
+            'null_dtype': None if self.null_dtype is None else str(self.null_dtype),
+            'mean': float(self.mean), 'm2': float(self.m2), 'min': float(self.min), 'max': float(self.max),
+            'quantiles': self.quantiles.state(),
+            'distinct': self.distinct.state(),
+            'frequent': self.frequent.state(),
+        })
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls()
+        for key in ('rows', 'nulls', 'count', 'mean', 'm2', 'min', 'max', 'length_sum', 'length_rows'):
+            setattr(sketch, key, state[key])
+        for key in ('dtype', 'null_dtype'):
+            if state[key] is not None:
+                setattr(sketch, key, pd.api.types.pandas_dtype(state[key]))
+        sketch.quantiles = QuantileSketch.from_state(state['quantiles'])
+        sketch.distinct = DistinctSketch.from_state(state['distinct'])
+        sketch.frequent = FrequentItems.from_state(state['frequent'])
+        return sketch
+
+    @property
+    def resolved_dtype(self):
+        if self.dtype is not None:
+            return self.dtype
+        return self.null_dtype if self.null_dtype is not None else np.dtype("object")
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+
+
+class ProfileTracker:
+    """Mergeable per-column sketches for a whole table."""
+
+    def __init__(self, quantile_k=1000, distinct_precision=14, top_capacity=1000):
+        self.settings = {'quantile_k': quantile_k, 'distinct_precision': distinct_precision,
+                         'top_capacity': top_capacity}
+        self.rows = 0
+        self.memory_bytes = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True, index=False).sum())
+        for col in chunk.columns:
+            self.columns.setdefault(col, ColumnSketch(**self.settings)).update(chunk[col])
+
+    def merge(self, other):
+        if other.settings != self.settings:
+            raise ValueError("Cannot merge profiles sketched with different settings")
+        self.rows += other.rows
+        self.memory_bytes += other.memory_bytes
+        for col, sketch in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(sketch)
+            else:
+                self.columns[col] = sketch
+        return self
+
+    def state(self):
+        """JSON-compatible values and numpy arrays that ``from_state`` turns back into this tracker."""
+        return {'settings': self.settings, 'rows': self.rows, 'memory_bytes': self.memory_bytes,
+                'columns': [[col, sketch.state()] for col, sketch in self.columns.items()]}
+
+    @classmethod
+    def from_state(cls, state):
+        tracker = cls(**state['settings'])
+        tracker.rows = state['rows']
+        tracker.memory_bytes = state['memory_bytes']
+        tracker.columns = {col: ColumnSketch.from_state(sketch) for col, sketch in state['columns']}
+        return tracker
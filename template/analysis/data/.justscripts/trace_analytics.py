@@ -0,0 +1,317 @@
+"""
+Per-process performance analytics from Nextflow ``trace.txt`` files.
+
+Each run's ``logs/trace.txt`` is parsed once into ``logs/trace.parquet``
+(durations in seconds, memory and I/O in bytes) and re-parsed only when
+the trace changes. Runs are located through the run catalog, so a report
+over thousands of runs reads just the columnar traces it needs.
+
+The report covers per-process wall time, CPU%, peak RSS and I/O for the
+latest run, flags processes that regressed against the previous run of
+the same pipeline and dataset, and suggests ``cpus``/``memory``
+directives from the observed usage across all matching runs.
+
+Usage:
+    python3 .justscripts/trace_analytics.py ingest [<run_dir>] [--full]
+    python3 .justscripts/trace_analytics.py report [--analysis A] [--pipeline P] [--dataset D]
+                                                   [--threshold 1.25] [--output report.yaml]
+"""
+
+import argparse
+import math
+import re
+import yaml
+from pathlib import Path
+
+import pandas as pd
+
+from run_catalog import list_runs, open_catalog
+from storage import read_table, write_table
+
+TRACE_FILE = Path("logs/trace.txt")
+TRACE_TABLE = Path("logs/trace.parquet")
+DEFAULT_THRESHOLD = 1.25
+MIN_REGRESSION_SECONDS = 1.0
+MEMORY_HEADROOM = 1.2
+MEMORY_STEP = 256 * 1024 ** 2
+
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MEMORY_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4, 'PB': 1024 ** 5}
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)')
+MEMORY_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)\s*([KMGTP]?B)$')
+
+DURATION_COLUMNS = ['duration', 'realtime']
+MEMORY_COLUMNS = ['peak_rss', 'peak_vmem', 'rss', 'vmem', 'rchar', 'wchar', 'read_bytes', 'write_bytes', 'memory']
+PERCENT_COLUMNS = ['%cpu', '%mem']
+
+
+def parse_duration(value):
+    """Nextflow duration ('1h 2m 3s', '350ms', or raw milliseconds) in seconds."""
+    if value in (None, '', '-') or pd.isna(value):
+        return None
+    value = str(value).strip()
+    if re.fullmatch(r'\d+(?:\.\d+)?', value):
+        return float(value) / 1000
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_memory(value):
+    """Nextflow memory size ('1.5 GB', '512 MB', or raw bytes) in bytes."""
+    if value in (None, '', '-') or pd.isna(value):
+        return None
+    value = str(value).strip()
+    if re.fullmatch(r'\d+(?:\.\d+)?', value):
+        return float(value)
+    match = MEMORY_PATTERN.match(value)
+    if not match:
+        return None
+    return float(match.group(1)) * MEMORY_UNITS[match.group(2)]
+
+
+def parse_percent(value):
+    if value in (None, '', '-') or pd.isna(value):
+        return None
+    try:
+        return float(str(value).rstrip('%'))
+    except ValueError:
+        return None
+
+
+def parse_trace(trace_file):
+    """Load a trace.txt into a typed frame with one row per task."""
+    df = pd.read_csv(trace_file, sep='\t', dtype=str, keep_default_na=False)
+    if 'process' not in df.columns:
+        # Default trace fields only carry "PROCESS_NAME (tag)"
+        df['process'] = df['name'].str.replace(r'\s*\(.*\)$', '', regex=True)
+    for column in DURATION_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(parse_duration).astype(float)
+    for column in MEMORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(parse_memory).astype(float)
+    for column in PERCENT_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(parse_percent).astype(float)
+    if 'cpus' in df.columns:
+        df['cpus'] = pd.to_numeric(df['cpus'], errors='coerce')
+    return df
+
+
+def ingest_run(run_dir, full=False):
+    """Convert a run's trace.txt to Parquet unless the table is already current."""
+    run_dir = Path(run_dir)
+    trace_file, table = run_dir / TRACE_FILE, run_dir / TRACE_TABLE
+    if not trace_file.exists():
+        return None
+    if not full and table.exists() and table.stat().st_mtime >= trace_file.stat().st_mtime:
+        return table
+    return write_table(parse_trace(trace_file), table)
+
+
+def load_traces(runs, full=False):
+    """Concatenate the traces of catalog ``runs``, tagged with their run identity."""
+    frames = []
+    for run in runs:
+        table = ingest_run(run['run_directory'], full)
+        if table is None:
+            continue
+        df = read_table(table)
+        df['run_directory'] = run['run_directory']
+        df['pipeline'] = run['pipeline']
+        df['dataset'] = run['dataset']
+        df['timestamp'] = run['timestamp']
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _optional(df, column):
+    return df[column] if column in df.columns else pd.Series(float('nan'), index=df.index)
+
+
+def process_summary(tasks):
+    """Per-process wall time, CPU, memory and I/O for one run's tasks."""
+    completed = tasks[tasks['status'].isin(['COMPLETED', 'CACHED'])] if 'status' in tasks.columns else tasks
+    grouped = completed.assign(
+        realtime=_optional(completed, 'realtime'),
+        cpu=_optional(completed, '%cpu'),
+        peak_rss=_optional(completed, 'peak_rss'),
+        rchar=_optional(completed, 'rchar'),
+        wchar=_optional(completed, 'wchar'),
+    ).groupby('process')
+    summary = pd.DataFrame({
+        'tasks': grouped.size(),
+        'realtime_total_s': grouped['realtime'].sum(),
+        'realtime_mean_s': grouped['realtime'].mean(),
+        'realtime_max_s': grouped['realtime'].max(),
+        'cpu_mean_pct': grouped['cpu'].mean(),
+        'peak_rss_max_bytes': grouped['peak_rss'].max(),
+        'read_bytes': grouped['rchar'].sum(),
+        'write_bytes': grouped['wchar'].sum(),
+    })
+    if 'status' in tasks.columns:
+        failed = tasks[tasks['status'] == 'FAILED'].groupby('process').size()
+        summary['failed'] = failed.reindex(summary.index, fill_value=0)
+    return summary
+
+
+def find_regressions(current, previous, threshold=DEFAULT_THRESHOLD):
+    """Processes whose mean wall time or peak RSS grew by more than ``threshold``x."""
+    regressions = []
+    for process in current.index.intersection(previous.index):
+        for metric in ('realtime_mean_s', 'peak_rss_max_bytes'):
+            now, before = current.at[process, metric], previous.at[process, metric]
+            if pd.isna(now) or pd.isna(before) or before <= 0:
+                continue
+            # Sub-second tasks jitter too much for a ratio to mean anything
+            if metric == 'realtime_mean_s' and now - before < MIN_REGRESSION_SECONDS:
+                continue
+            if now / before > threshold:
+                regressions.append({
+                    'process': process,
+                    'metric': metric,
+                    'previous': float(before),
+                    'current': float(now),
+                    'ratio': round(float(now / before), 2),
+                })
+    return regressions
+
+
+def _format_memory(size):
+    for unit in ('GB', 'MB'):
+        if size >= MEMORY_UNITS[unit] or unit == 'MB':
+            amount = size / MEMORY_UNITS[unit]
+            return f"{int(amount)} {unit}" if amount == int(amount) else f"{amount:.2f} {unit}"
+
+
+def suggest_resources(tasks):
+    """
+    ``cpus``/``memory`` directives per process from all observed tasks.
+
+    CPUs cover the 95th percentile %cpu; memory covers the largest peak
+    RSS plus headroom, rounded up to a 256 MB step.
+    """
+    suggestions = {}
+    completed = tasks[tasks['status'] == 'COMPLETED'] if 'status' in tasks.columns else tasks
+    for process, group in completed.groupby('process'):
+        suggestion = {'observed_tasks': int(len(group))}
+        cpu = _optional(group, '%cpu').dropna()
+        if not cpu.empty:
+            suggestion['cpus'] = max(1, math.ceil(cpu.quantile(0.95) / 100))
+        rss = _optional(group, 'peak_rss').dropna()
+        if not rss.empty:
+            memory = math.ceil(rss.max() * MEMORY_HEADROOM / MEMORY_STEP) * MEMORY_STEP
+            suggestion['memory'] = _format_memory(max(memory, MEMORY_STEP))
+        requested_cpus = _optional(group, 'cpus').dropna()
+        if not requested_cpus.empty:
+            suggestion['requested_cpus'] = int(requested_cpus.max())
+        requested_memory = _optional(group, 'memory').dropna()
+        if not requested_memory.empty:
+            suggestion['requested_memory'] = _format_memory(requested_memory.max())
+        suggestions[process] = suggestion
+    return suggestions
+
+
+def build_report(traces, threshold=DEFAULT_THRESHOLD):
+    """Latest-run summary, regressions and right-sizing per pipeline/dataset pair."""
+    report = {}
+    for (pipeline, dataset), group in traces.groupby(['pipeline', 'dataset'], dropna=False):
+        runs = (group[['run_directory', 'timestamp']].drop_duplicates()
+                .sort_values('timestamp', ascending=False)['run_directory'].tolist())
+        latest = process_summary(group[group['run_directory'] == runs[0]])
+        entry = {
+            'latest_run': runs[0],
+            'runs': len(runs),
+            'processes': {process: {key: (int(value) if key in ('tasks', 'failed') else round(float(value), 2))
+                                    for key, value in row.items() if pd.notna(value)}
+                          for process, row in latest.iterrows()},
+            'regressions': [],
+            'suggestions': suggest_resources(group),
+        }
+        if len(runs) > 1:
+            entry['previous_run'] = runs[1]
+            previous = process_summary(group[group['run_directory'] == runs[1]])
+            entry['regressions'] = find_regressions(latest, previous, threshold)
+        report[f"{pipeline or 'unknown'}/{dataset}"] = entry
+    return report
+
+
+def print_report(report):
+    for key, entry in report.items():
+        print(f"\n🧬 {key} ({entry['runs']} runs, latest: {Path(entry['latest_run']).name})")
+        print(f"   {'process':<30} {'tasks':>5} {'wall s':>9} {'cpu %':>7} {'peak rss':>10} {'read MB':>9} {'write MB':>9}")
+        for process, stats in entry['processes'].items():
+            rss = stats.get('peak_rss_max_bytes')
+            print(f"   {process:<30} {stats['tasks']:>5} {stats.get('realtime_total_s', 0):>9.1f} "
+                  f"{stats.get('cpu_mean_pct', float('nan')):>7.1f} "
+                  f"{_format_memory(rss) if rss is not None else '-':>10} "
+                  f"{stats.get('read_bytes', 0) / 1024 ** 2:>9.1f} {stats.get('write_bytes', 0) / 1024 ** 2:>9.1f}")
+        for regression in entry['regressions']:
+            print(f"   ⚠️  {regression['process']}: {regression['metric']} "
+                  f"x{regression['ratio']} vs {Path(entry['previous_run']).name}")
+        for process, suggestion in entry['suggestions'].items():
+            directives = ", ".join(f"{name} = {suggestion[name]!r}" if name == 'memory' else f"{name} = {suggestion[name]}"
+                                   for name in ('cpus', 'memory') if name in suggestion)
+            if directives:
+                print(f"   💡 withName: '{process}' {{ {directives} }}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Analyse Nextflow trace files per process.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Convert trace.txt files to Parquet")
+    ingest.add_argument("run_dir", nargs="?", default=None, help="Single run (default: every cataloged run)")
+    ingest.add_argument("--full", action="store_true", help="Re-parse traces even if already converted")
+
+    report = subparsers.add_parser("report", help="Per-process performance report")
+    report.add_argument("--analysis", default=None)
+    report.add_argument("--pipeline", default=None)
+    report.add_argument("--dataset", default=None)
+    report.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Regression ratio vs the previous run (default: {DEFAULT_THRESHOLD})")
+    report.add_argument("--output", default=None, help="Also save the report as YAML")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if args.command == "ingest":
+        if args.run_dir:
+            table = ingest_run(args.run_dir, full=args.full)
+            if table is None:
+                print(f"⚠️  No trace found: {Path(args.run_dir) / TRACE_FILE}")
+            else:
+                print(f"📊 Trace table: {table}")
+            return
+        conn = open_catalog()
+        runs = list_runs(conn)
+        conn.close()
+        converted = sum(1 for run in runs if ingest_run(run['run_directory'], full=args.full) is not None)
+        print(f"✅ {converted} of {len(runs)} runs have trace tables")
+        return
+
+    conn = open_catalog()
+    runs = list_runs(conn, analysis=args.analysis, pipeline=args.pipeline, dataset=args.dataset)
+    conn.close()
+    traces = load_traces(runs)
+    if traces.empty:
+        print("📝 No trace files found for the selected runs.")
+        return
+
+    report = build_report(traces, args.threshold)
+    print("⏱️  Nextflow Process Performance")
+    print("=" * 40)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            yaml.dump(report, f, default_flow_style=False)
+        print(f"\n📄 Report saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
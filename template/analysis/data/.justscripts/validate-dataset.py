@@ -1,101 +1,264 @@
-import pandas as pd
+import argparse
+import sys
 import numpy as np
+import pandas as pd
 import yaml
 from pathlib import Path
 from datetime import datetime
 
-filepath = Path("{{path}}")
+from report_cache import ReportCache, file_checksum
+from storage import read_table
+from streaming import (
+    DEFAULT_MEMORY_BUDGET_MB,
+    DUPLICATE_BUDGET_FRACTION,
+    DuplicateTracker,
+    MissingCounter,
+    OutlierTracker,
+    TypeTracker,
+    iter_csv_chunks,
+)
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "scripts" / "python"))
+
+from type_classification import classify_series  # noqa: E402
+
+REPORT_DIR = Path("02_intermediate/021_validated")
+# Bump whenever the report contents change so cached reports are recomputed
+VALIDATOR_VERSION = 1
+
+
+def load_dataset(filepath):
+    return read_table(filepath)
+
+
+def build_report(filepath, shape, columns, dtypes, missing_cells, duplicate_rows, type_profiles, outliers):
+    """Assemble the validation report from whole-file aggregates."""
+    validation_results = {
+        'filepath': str(filepath),
+        'validated_at': datetime.now().isoformat(),
+        'basic_info': {
+            'shape': list(shape),
+            'columns': list(columns),
+            'dtypes': {col: str(dtype) for col, dtype in dtypes.items()}
+        },
+        'quality_metrics': {},
+        'type_histograms': {
+            col: {
+                'inferred_dtype': profile.inferred_dtype,
+                'value_types': profile.histogram,
+                'string_content': profile.string_content
+            }
+            for col, profile in type_profiles.items()
+        },
+        'issues': []
+    }
+    # Mark datetime/text counts scaled up from a sample of date-parsed strings
+    for col, profile in type_profiles.items():
+        if profile.string_content_sampled:
+            validation_results['type_histograms'][col]['string_content_sampled'] = profile.string_content_sampled
+
+    rows, n_columns = shape
+
+    # Completeness score
+    total_cells = rows * n_columns
+    completeness = ((total_cells - missing_cells) / total_cells) * 100 if total_cells > 0 else 0
+    validation_results['quality_metrics']['completeness'] = round(completeness, 2)
+
+    # Uniqueness score (for rows)
+    uniqueness = ((rows - duplicate_rows) / rows) * 100 if rows > 0 else 0
+    validation_results['quality_metrics']['uniqueness'] = round(uniqueness, 2)
+
+    # Data type consistency
+    mixed_columns = [col for col, profile in type_profiles.items() if profile.is_mixed]
+    for col in mixed_columns:
+        validation_results['issues'].append(f"Mixed data types in column '{col}'")
+
+    consistency = ((n_columns - len(mixed_columns)) / n_columns) * 100 if n_columns > 0 else 0
+    validation_results['quality_metrics']['consistency'] = round(consistency, 2)
+
+    # Overall quality score
+    overall_score = (completeness + uniqueness + consistency) / 3
+    validation_results['quality_metrics']['overall_score'] = round(overall_score, 2)
+
+    # Check for common issues
+    if missing_cells > 0:
+        validation_results['issues'].append(f"Missing values: {missing_cells} cells ({missing_cells/total_cells*100:.1f}%)")
+
+    if duplicate_rows > 0:
+        validation_results['issues'].append(f"Duplicate rows: {duplicate_rows}")
+
+    for col, count in outliers.items():
+        if count > 0:
+            validation_results['issues'].append(f"Outliers in '{col}': {count} values")
+
+    return validation_results
+
+
+def validate_frame(df, filepath):
+    """Validate a fully loaded DataFrame."""
+    missing_cells = int(df.isnull().sum().sum())
+    duplicate_rows = int(df.duplicated().sum())
+
+    # Value-type histograms for object columns (mixed types break consistency)
+    type_profiles = {col: classify_series(df[col]) for col in df.columns if df[col].dtype == 'object'}
+
+    outliers = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        outliers[col] = int(df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)][col].count())
+
+    return build_report(filepath, df.shape, df.columns, df.dtypes.to_dict(),
+                        missing_cells, duplicate_rows, type_profiles, outliers)
+
+
+def validate_stream(filepath, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Validate a CSV in bounded-size chunks without materialising the whole file.
+
+    The first pass feeds every accumulator; a second pass reads only the
+    numeric columns to count values outside the sketched IQR fences.
+    Duplicate-row hashes beyond their share of the budget spill to
+    temporary files.
+    """
+    missing = MissingCounter()
+    duplicates = DuplicateTracker(int(memory_budget_mb * 1024 * 1024 * DUPLICATE_BUDGET_FRACTION))
+    types = TypeTracker()
+    outlier_tracker = OutlierTracker()
+    columns = None
 
-if not filepath.exists():
-    print(f"❌ File not found: {filepath}")
-    exit(1)
+    try:
+        for chunk in iter_csv_chunks(filepath, memory_budget_mb):
+            if columns is None:
+                columns = list(chunk.columns)
+            missing.update(chunk)
+            duplicates.update(chunk)
+            types.update(chunk)
+            outlier_tracker.update(chunk)
+        duplicate_rows = duplicates.duplicates
+    finally:
+        duplicates.close()
 
-print(f"🔍 Validating dataset: {filepath}")
+    if columns is None:
+        columns = list(pd.read_csv(filepath, nrows=0).columns)
 
-try:
-    if filepath.suffix.lower() == '.csv':
-        df = pd.read_csv(filepath)
-    elif filepath.suffix.lower() in ['.xlsx', '.xls']:
-        df = pd.read_excel(filepath)
+    dtypes = {col: types.resolved(col) for col in columns}
+    mixed = types.mixed
+    numeric_cols = [col for col in columns
+                    if col not in mixed
+                    and pd.api.types.is_numeric_dtype(dtypes[col])
+                    and not pd.api.types.is_bool_dtype(dtypes[col])]
+    fences = {col: outlier_tracker.fences(col) for col in numeric_cols if col in outlier_tracker.sketches}
+    if fences:
+        for chunk in iter_csv_chunks(filepath, memory_budget_mb, usecols=list(fences)):
+            outlier_tracker.count(chunk, fences)
+
+    type_profiles = {}
+    for col in columns:
+        if dtypes[col] == 'object':
+            profile = types.profile(col)
+            if profile is not None:
+                type_profiles[col] = profile
+    outliers = {col: outlier_tracker.outliers.get(col, 0) for col in fences}
+
+    return build_report(filepath, (missing.rows, len(columns)), columns, dtypes,
+                        missing.total_missing, duplicate_rows, type_profiles, outliers)
+
+
+def should_stream(filepath, memory_budget_mb):
+    """Stream CSVs that would not comfortably fit in the memory budget."""
+    return (filepath.suffix.lower() == '.csv'
+            and filepath.stat().st_size > memory_budget_mb * 1024 * 1024 / 4)
+
+
+def report_cache(stream, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """Cache for reports produced with this validator version and mode."""
+    # Sketch results depend on chunking, so the budget is part of the key
+    config = {'mode': 'stream', 'memory_budget_mb': memory_budget_mb} if stream else {'mode': 'full'}
+    return ReportCache('validation', VALIDATOR_VERSION, config)
+
+
+def save_report(validation_results, filepath):
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    report_file = REPORT_DIR / f"{filepath.stem}_validation_report.yaml"
+
+    with open(report_file, 'w') as f:
+        yaml.dump(validation_results, f, default_flow_style=False)
+
+    return report_file
+
+
+def print_summary(validation_results, report_file):
+    print(f"\n📊 Validation Results:")
+    print(f"   Shape: {tuple(validation_results['basic_info']['shape'])}")
+    print(f"   Completeness: {validation_results['quality_metrics']['completeness']:.1f}%")
+    print(f"   Uniqueness: {validation_results['quality_metrics']['uniqueness']:.1f}%")
+    print(f"   Consistency: {validation_results['quality_metrics']['consistency']:.1f}%")
+    print(f"   Overall Score: {validation_results['quality_metrics']['overall_score']:.1f}/100")
+
+    if validation_results['issues']:
+        print(f"\n⚠️  Issues Found:")
+        for issue in validation_results['issues']:
+            print(f"   - {issue}")
     else:
-        print(f"❌ Unsupported file format: {filepath.suffix}")
+        print(f"\n✅ No issues found!")
+
+    print(f"\n📄 Report saved: {report_file}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Validate a dataset and write a quality report.")
+    parser.add_argument("path", help="Dataset file (.csv, .xlsx, .xls, .parquet, .feather)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the CSV in bounded chunks instead of loading it whole")
+    parser.add_argument("--memory-budget-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="Memory budget for streaming mode: parsed chunks and duplicate-row hashes "
+                             "(8 bytes per distinct row) each get a quarter, hashes beyond that spill to "
+                             f"temporary files (default: {DEFAULT_MEMORY_BUDGET_MB})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute the report even if the file is unchanged")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    filepath = Path(args.path)
+
+    if not filepath.exists():
+        print(f"❌ File not found: {filepath}")
         exit(1)
-except Exception as e:
-    print(f"❌ Error loading file: {e}")
-    exit(1)
-
-validation_results = {
-    'filepath': str(filepath),
-    'validated_at': datetime.now().isoformat(),
-    'basic_info': {
-        'shape': list(df.shape),
-        'columns': list(df.columns),
-        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}
-    },
-    'quality_metrics': {},
-    'issues': []
-}
-
-total_cells = df.shape[0] * df.shape[1]
-missing_cells = df.isnull().sum().sum()
-completeness = ((total_cells - missing_cells) / total_cells) * 100 if total_cells > 0 else 0
-validation_results['quality_metrics']['completeness'] = round(completeness, 2)
-
-duplicate_rows = df.duplicated().sum()
-uniqueness = ((df.shape[0] - duplicate_rows) / df.shape[0]) * 100 if df.shape[0] > 0 else 0
-validation_results['quality_metrics']['uniqueness'] = round(uniqueness, 2)
-
-consistency_issues = 0
-for col in df.columns:
-    if df[col].dtype == 'object':
-        non_null_values = df[col].dropna()
-        if len(non_null_values) > 0:
-            first_type = type(non_null_values.iloc[0])
-            mixed_types = any(type(val) != first_type for val in non_null_values)
-            if mixed_types:
-                consistency_issues += 1
-                validation_results['issues'].append(f"Mixed data types in column '{col}'")
-
-consistency = ((len(df.columns) - consistency_issues) / len(df.columns)) * 100 if len(df.columns) > 0 else 0
-validation_results['quality_metrics']['consistency'] = round(consistency, 2)
-
-overall_score = (completeness + uniqueness + consistency) / 3
-validation_results['quality_metrics']['overall_score'] = round(overall_score, 2)
-
-if missing_cells > 0:
-    validation_results['issues'].append(f"Missing values: {missing_cells} cells ({missing_cells/total_cells*100:.1f}%)")
-
-if duplicate_rows > 0:
-    validation_results['issues'].append(f"Duplicate rows: {duplicate_rows}")
-
-numeric_cols = df.select_dtypes(include=[np.number]).columns
-for col in numeric_cols:
-    Q1 = df[col].quantile(0.25)
-    Q3 = df[col].quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)][col].count()
-    if outliers > 0:
-        validation_results['issues'].append(f"Outliers in '{col}': {outliers} values")
-
-report_dir = Path("02_intermediate/021_validated")
-report_dir.mkdir(parents=True, exist_ok=True)
-report_file = report_dir / f"{filepath.stem}_validation_report.yaml"
-
-with open(report_file, 'w') as f:
-    yaml.dump(validation_results, f, default_flow_style=False)
-
-print(f"\n📊 Validation Results:")
-print(f"   Shape: {df.shape}")
-print(f"   Completeness: {validation_results['quality_metrics']['completeness']:.1f}%")
-print(f"   Uniqueness: {validation_results['quality_metrics']['uniqueness']:.1f}%")
-print(f"   Consistency: {validation_results['quality_metrics']['consistency']:.1f}%")
-print(f"   Overall Score: {validation_results['quality_metrics']['overall_score']:.1f}/100")
-
-if validation_results['issues']:
-    print(f"\n⚠️  Issues Found:")
-    for issue in validation_results['issues']:
-        print(f"   - {issue}")
-else:
-    print(f"\n✅ No issues found!")
-
-print(f"\n📄 Report saved: {report_file}")
+
+    stream = args.stream or should_stream(filepath, args.memory_budget_mb)
+    if stream and filepath.suffix.lower() != '.csv':
+        print(f"⚠️  Streaming is only supported for CSV files, loading {filepath.suffix} whole")
+        stream = False
+
+    print(f"🔍 Validating dataset: {filepath}" + (f" (streaming, {args.memory_budget_mb} MB budget)" if stream else ""))
+
+    cache = report_cache(stream, args.memory_budget_mb)
+    checksum = file_checksum(filepath)
+    validation_results = None if args.no_cache else cache.get(checksum, filepath)
+
+    if validation_results is not None:
+        print(f"♻️  Unchanged since last validation, reusing cached report")
+    else:
+        try:
+            if stream:
+                validation_results = validate_stream(filepath, args.memory_budget_mb)
+            else:
+                validation_results = validate_frame(load_dataset(filepath), filepath)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        except Exception as e:
+            print(f"❌ Error loading file: {e}")
+            exit(1)
+        cache.put(checksum, validation_results)
+
+    report_file = save_report(validation_results, filepath)
+    print_summary(validation_results, report_file)
+
+
+if __name__ == "__main__":
+    main()
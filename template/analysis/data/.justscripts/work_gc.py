@@ -0,0 +1,249 @@
+"""
+Garbage collector for Nextflow work directories.
+
+Age is judged per task directory (``work/ab/cdef...``) from the newest
+mtime of anything inside it, not from the top-level ``work/`` directory,
+whose mtime barely moves while tasks update. Task directories are scanned
+and deleted concurrently, and sizes are counted in allocated blocks.
+
+Runs are never touched when they are marked ``resumable: true`` in their
+metadata, since ``nextflow -resume`` needs their cached task directories,
+or when they are still in progress. A run without run_metadata.yaml
+counts as in progress only while its logs or task directories changed
+within ``--days``; otherwise it was killed or never recorded ("no
+metadata") and is collected like any other run.
+
+Usage:
+    python3 .justscripts/work_gc.py <analysis|all> [--days N] [--budget-gb N] [--dry-run] [--workers N]
+"""
+
+import argparse
+import os
+import shutil
+import time
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ANALYSES_DIR = Path("15_pipelines/151_nextflow/experiments/by_analysis")
+METADATA_FILE = "run_metadata.yaml"
+DEFAULT_DAYS = 7
+DEFAULT_WORKERS = 16
+
+
+def _disk_usage(stat):
+    blocks = getattr(stat, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+def scan_task_dir(path):
+    """``(size_bytes, newest_mtime)`` of everything under one task directory."""
+    stat = os.stat(path)
+    size, newest = _disk_usage(stat), stat.st_mtime
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, PermissionError):
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                size += _disk_usage(entry_stat)
+                newest = max(newest, entry_stat.st_mtime)
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return size, newest
+
+
+def task_directories(work_dir):
+    """Nextflow task directories: ``work/<2 hex>/<rest of hash>``."""
+    tasks = []
+    with os.scandir(work_dir) as prefixes:
+        for prefix in prefixes:
+            if prefix.is_dir(follow_symlinks=False) and len(prefix.name) == 2:
+                with os.scandir(prefix.path) as entries:
+                    tasks.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+    return tasks
+
+
+def run_protection(run_dir):
+    """Reason a recorded run's work must be kept, or None if it may be collected."""
+    metadata_file = Path(run_dir) / METADATA_FILE
+    try:
+        with open(metadata_file, 'r') as f:
+            metadata = yaml.safe_load(f) or {}
+    except yaml.YAMLError:
+        return "unreadable metadata"
+    if metadata.get('resumable'):
+        return "resumable"
+    return None
+
+
+def discover_runs(analysis):
+    analysis_dirs = ([path for path in ANALYSES_DIR.iterdir() if path.is_dir()] if analysis == "all"
+                     else [ANALYSES_DIR / analysis])
+    return [run_dir for analysis_dir in analysis_dirs for run_dir in sorted(analysis_dir.iterdir())
+            if (run_dir / "work").is_dir()]
+
+
+def last_log_activity(run_dir):
+    """Newest mtime under the run's logs/ (the trace is appended to as tasks finish)."""
+    newest = 0.0
+    logs_dir = Path(run_dir) / "logs"
+    if logs_dir.is_dir():
+        for path in logs_dir.rglob("*"):
+            try:
+                newest = max(newest, path.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+    return newest
+
+
+def scan_runs(run_dirs, days=DEFAULT_DAYS, workers=DEFAULT_WORKERS, now=None):
+    """
+    Scan the work directories of ``run_dirs`` concurrently.
+
+    Returns:
+        Tuple of (tasks, protected, unrecorded): tasks as dicts with run,
+        path, size, mtime and protected flag; protected as
+        ``{run_dir: reason}``; unrecorded as the runs without metadata and
+        without recent activity, which are collected normally
+    """
+    cutoff = (now or time.time()) - days * 24 * 3600
+    protected, unrecorded, scannable = {}, [], []
+    for run_dir in run_dirs:
+        if not (run_dir / METADATA_FILE).exists():
+            unrecorded.append(run_dir)
+        else:
+            reason = run_protection(run_dir)
+            if reason:
+                protected[run_dir] = reason
+        scannable.extend((run_dir, path) for path in task_directories(run_dir / "work"))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        scanned = list(executor.map(lambda item: scan_task_dir(item[1]), scannable))
+
+    # No metadata: live only if the run wrote logs or task files recently
+    newest = {run_dir: last_log_activity(run_dir) for run_dir in unrecorded}
+    for (run_dir, _), (_, mtime) in zip(scannable, scanned):
+        if run_dir in newest:
+            newest[run_dir] = max(newest[run_dir], mtime)
+    for run_dir, mtime in newest.items():
+        if mtime >= cutoff:
+            protected[run_dir] = "in progress"
+    unrecorded = [run_dir for run_dir in unrecorded if run_dir not in protected]
+
+    return [{'run': run_dir, 'path': path, 'size': size, 'mtime': mtime, 'protected': run_dir in protected}
+            for (run_dir, path), (size, mtime) in zip(scannable, scanned)], protected, unrecorded
+
+
+def select_for_deletion(tasks, days, budget_bytes=None, now=None):
+    """
+    Task directories to delete: every unprotected one older than ``days``,
+    then, while all work (protected included) is still above
+    ``budget_bytes``, the oldest unprotected ones, largest first among
+    equally old ones.
+    """
+    now = now or time.time()
+    cutoff = now - days * 24 * 3600
+    candidates = [task for task in tasks if not task['protected']]
+    expired = [task for task in candidates if task['mtime'] < cutoff]
+    remaining = sorted((task for task in candidates if task['mtime'] >= cutoff),
+                       key=lambda task: (task['mtime'], -task['size']))
+
+    if budget_bytes is not None:
+        kept = sum(task['size'] for task in tasks) - sum(task['size'] for task in expired)
+        for task in remaining:
+            if kept <= budget_bytes:
+                break
+            expired.append(task)
+            kept -= task['size']
+    return expired
+
+
+def _remove_task(path):
+    shutil.rmtree(path, ignore_errors=True)
+    parent = os.path.dirname(path)
+    try:
+        os.rmdir(parent)  # drop the two-character prefix directory once empty
+    except OSError:
+        pass
+
+
+def delete_tasks(tasks, workers=DEFAULT_WORKERS):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_remove_task, [task['path'] for task in tasks]))
+
+
+def _format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Collect old Nextflow task directories.")
+    parser.add_argument("analysis", help="Analysis name, or 'all'")
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS,
+                        help=f"Delete task directories untouched for this many days (default: {DEFAULT_DAYS})")
+    parser.add_argument("--budget-gb", type=float, default=None,
+                        help="Also delete the oldest/largest task directories until work fits this size")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parallel scan/delete threads (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    if not ANALYSES_DIR.exists():
+        print("📝 No analyses found.")
+        return
+    if args.analysis != "all" and not (ANALYSES_DIR / args.analysis).exists():
+        print(f"❌ Analysis not found: {args.analysis}")
+        exit(1)
+
+    start = time.perf_counter()
+    tasks, protected, unrecorded = scan_runs(discover_runs(args.analysis), args.days, args.workers)
+    budget = args.budget_gb * 1024 ** 3 if args.budget_gb is not None else None
+    doomed = select_for_deletion(tasks, args.days, budget)
+
+    for run_dir, reason in sorted(protected.items()):
+        print(f"🔒 Keeping {run_dir / 'work'} ({reason})")
+    for run_dir in unrecorded:
+        print(f"⚠️  {run_dir}: no metadata and no activity for {args.days:g} days; collecting by age")
+
+    per_run = {}
+    for task in tasks:
+        info = per_run.setdefault(task['run'], {'tasks': 0, 'size': 0, 'reclaim_tasks': 0, 'reclaim': 0})
+        info['tasks'] += 1
+        info['size'] += task['size']
+    for task in doomed:
+        per_run[task['run']]['reclaim_tasks'] += 1
+        per_run[task['run']]['reclaim'] += task['size']
+    for run_dir, info in sorted(per_run.items()):
+        if info['reclaim_tasks']:
+            print(f"🧹 {run_dir / 'work'}: {info['reclaim_tasks']}/{info['tasks']} task dirs, "
+                  f"{_format_size(info['reclaim'])} of {_format_size(info['size'])} reclaimable")
+
+    reclaim = sum(task['size'] for task in doomed)
+    total = sum(task['size'] for task in tasks)
+    if args.dry_run:
+        print(f"📝 Dry run: would free {_format_size(reclaim)} of {_format_size(total)} "
+              f"({len(doomed)} task dirs)")
+        return
+
+    delete_tasks(doomed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Freed {_format_size(reclaim)} from {len(doomed)} task dirs in {elapsed:.1f}s "
+          f"({_format_size(total - reclaim)} of work remains)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Parallel, change-aware notebook execution.
+
+Discovers .qmd, .ipynb and .Rmd notebooks under the given paths and runs
+them on a pool of ``--workers`` concurrent kernels, each with the engine
+for its format (quarto render, jupyter nbconvert --execute, rmarkdown).
+
+Notebooks declare the data they read and write, in the YAML front matter
+of .qmd/.Rmd files or the notebook metadata of .ipynb files:
+
+    inputs:
+      - ../../data/03_primary/penguins.parquet
+    outputs:
+      - ../../data/04_feature/penguin_features.parquet
+
+Paths are relative to the notebook and may be globs or directories. A
+notebook whose inputs are another notebook's outputs runs after it. A
+notebook is skipped when its source (code and text, not stored outputs),
+its inputs and its engine hash the same as at its last successful run and
+its rendered and declared outputs still exist. Run state and per-notebook
+runtimes are kept in .notebook_state.yaml next to notebooks.just.
+
+Usage:
+    python3 .justscripts/run-notebooks.py [paths...] [--workers N] [--force]
+                                          [--types qmd,ipynb,Rmd] [--dry-run] [--timeout SECONDS]
+"""
+
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import time
+import yaml
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+NOTEBOOKS_DIR = Path(__file__).resolve().parent.parent
+STATE_FILE = NOTEBOOKS_DIR / ".notebook_state.yaml"
+SUFFIXES = {'.qmd': 'qmd', '.ipynb': 'ipynb', '.rmd': 'Rmd'}
+# Templates and tool directories are never executed
+EXCLUDED_DIRS = {'.ipynb_checkpoints', '_freeze', '.quarto', 'backups', 'archive', '.justscripts'}
+EXCLUDED_NAMES = ('experiment_template.qmd', '*.template.qmd', '*.template.ipynb', '*.nbconvert.ipynb')
+STATE_VERSION = 1
+
+
+def engine_command(notebook):
+    """Command that executes and renders ``notebook``."""
+    kind = SUFFIXES[notebook.suffix.lower()]
+    if kind == 'ipynb':
+        return ['jupyter', 'nbconvert', '--execute', '--to', 'html', notebook.name]
+    if kind == 'Rmd':
+        return ['Rscript', '-e', f"rmarkdown::render('{notebook.name}')"]
+    return ['quarto', 'render', notebook.name]
+
+
+def discover(paths, types):
+    """Notebooks under ``paths`` (files or directories) of the given types."""
+    found = set()
+    for path in paths:
+        path = Path(path)
+        candidates = [path] if path.is_file() else path.rglob("*")
+        for candidate in candidates:
+            if SUFFIXES.get(candidate.suffix.lower()) not in types or not candidate.is_file():
+                continue
+            if any(fnmatch.fnmatch(candidate.name, pattern) for pattern in EXCLUDED_NAMES):
+                continue
+            if EXCLUDED_DIRS.intersection(candidate.parts) or any(part.endswith('_files') for part in candidate.parts[:-1]):
+                continue
+            found.add(candidate.resolve())
+    return sorted(found)
+
+
+def read_notebook(notebook):
+    """
+    Source fingerprint material and declared inputs/outputs of ``notebook``.
+
+    For .ipynb files only cell sources and the kernel are hashed, so
+    clearing or re-saving outputs does not count as a change.
+    """
+    if notebook.suffix.lower() == '.ipynb':
+        with open(notebook, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        metadata = content.get('metadata', {})
+        source = json.dumps({
+            'kernel': metadata.get('kernelspec', {}).get('name'),
+            'cells': [(cell.get('cell_type'), ''.join(cell.get('source', []))) for cell in content.get('cells', [])],
+        }, sort_keys=True).encode()
+        declared = metadata
+    else:
+        source = notebook.read_bytes()
+        text = source.decode('utf-8', errors='replace')
+        declared = {}
+        if text.startswith('---'):
+            end = text.find('\n---', 3)
+            if end != -1:
+                try:
+                    declared = yaml.safe_load(text[3:end]) or {}
+                except yaml.YAMLError:
+                    print(f"⚠️  Could not parse front matter of {notebook}")
+    if not isinstance(declared, dict):
+        declared = {}
+
+    def paths(key):
+        value = declared.get(key) or []
+        return [value] if isinstance(value, str) else [str(item) for item in value]
+
+    return source, paths('inputs'), paths('outputs')
+
+
+def expand(notebook, pattern):
+    """Files matching a declared input/output path, relative to the notebook."""
+    path = Path(pattern).expanduser()
+    if not path.is_absolute():
+        path = notebook.parent / path
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file())
+    if glob.has_magic(str(path)):
+        return sorted(Path(p) for p in glob.glob(str(path), recursive=True) if Path(p).is_file())
+    return [path]
+
+
+def _declared_path(notebook, pattern):
+    return os.path.normpath(notebook.parent / Path(pattern).expanduser())
+
+
+class Notebook:
+    """One discovered notebook with its declared data dependencies."""
+
+    def __init__(self, path):
+        self.path = path
+        self.source, self.inputs, self.outputs = read_notebook(path)
+        self.upstream = set()
+        self.downstream = set()
+
+    @property
+    def name(self):
+        try:
+            return str(self.path.relative_to(NOTEBOOKS_DIR))
+        except ValueError:
+            return str(self.path)
+
+    def rendered(self):
+        # quarto, nbconvert and rmarkdown all write <stem>.html next to the notebook by default
+        return self.path.with_suffix('.html')
+
+    def produces(self, notebook, pattern):
+        """Whether one of our declared outputs satisfies ``pattern`` of ``notebook``."""
+        wanted = _declared_path(notebook.path, pattern)
+        for output in self.outputs:
+            produced = _declared_path(self.path, output)
+            if (produced == wanted or fnmatch.fnmatch(produced, wanted) or fnmatch.fnmatch(wanted, produced)
+                    or wanted.startswith(produced.rstrip(os.sep) + os.sep)
+                    or produced.startswith(wanted.rstrip(os.sep) + os.sep)):
+                return True
+        return False
+
+
+class FileHasher:
+    """SHA-256 of input files, reusing state entries whose size and mtime are unchanged."""
+
+    def __init__(self, known=None):
+        self.known = known or {}
+        self.seen = {}
+
+    def __call__(self, path):
+        key = str(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+        entry = self.known.get(key)
+        if entry and entry.get('signature') == signature:
+            checksum = entry['sha256']
+        else:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            checksum = digest.hexdigest()
+        self.seen[key] = {'signature': signature, 'sha256': checksum}
+        return checksum
+
+
+def fingerprint(notebook, hasher):
+    """Hash of the notebook source, its engine and the content of every declared input."""
+    digest = hashlib.sha256()
+    digest.update(notebook.source)
+    digest.update(json.dumps(engine_command(notebook.path)).encode())
+    for pattern in sorted(notebook.inputs):
+        files = expand(notebook.path, pattern)
+        digest.update(pattern.encode())
+        for path in files:
+            digest.update(f"\0{path}\0{hasher(path)}".encode())
+    return digest.hexdigest()
+
+
+def link_dependencies(notebooks):
+    """Connect each notebook to the notebooks producing its inputs; fail on cycles."""
+    for consumer in notebooks:
+        for producer in notebooks:
+            if producer is not consumer and any(producer.produces(consumer, pattern) for pattern in consumer.inputs):
+                consumer.upstream.add(producer)
+                producer.downstream.add(consumer)
+
+    # Kahn's algorithm, only to detect cycles before anything runs
+    remaining = {notebook: len(notebook.upstream) for notebook in notebooks}
+    ready = [notebook for notebook, count in remaining.items() if count == 0]
+    ordered = 0
+    while ready:
+        notebook = ready.pop()
+        ordered += 1
+        for consumer in notebook.downstream:
+            remaining[consumer] -= 1
+            if remaining[consumer] == 0:
+                ready.append(consumer)
+    if ordered < len(notebooks):
+        cycle = sorted(notebook.name for notebook, count in remaining.items() if count > 0)
+        raise ValueError(f"Notebook inputs and outputs form a cycle: {', '.join(cycle)}")
+
+
+def load_state():
+    if not STATE_FILE.exists():
+        return {'notebooks': {}, 'files': {}}
+    with open(STATE_FILE, 'r') as f:
+        state = yaml.safe_load(f) or {}
+    if state.get('version') != STATE_VERSION:
+        return {'notebooks': {}, 'files': {}}
+    state.setdefault('notebooks', {})
+    state.setdefault('files', {})
+    return state
+
+
+def save_state(state):
+    state['version'] = STATE_VERSION
+    tmp = STATE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        yaml.dump(state, f, default_flow_style=False)
+    os.replace(tmp, STATE_FILE)
+
+
+def up_to_date(notebook, key, record):
+    if not record or record.get('status') != 'ok' or record.get('fingerprint') != key:
+        return False
+    if not notebook.rendered().exists():
+        return False
+    for pattern in notebook.outputs:
+        files = expand(notebook.path, pattern)
+        if not files or not all(path.exists() for path in files):
+            return False
+    return True
+
+
+def execute(notebook, timeout=None):
+    """Run one notebook in its own directory; returns (status, seconds, output tail)."""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(engine_command(notebook.path), cwd=notebook.path.parent,
+                                capture_output=True, text=True, timeout=timeout)
+        status = 'ok' if result.returncode == 0 else 'failed'
+        output = (result.stdout or '') + (result.stderr or '')
+    except subprocess.TimeoutExpired:
+        status, output = 'timeout', f"Timed out after {timeout}s"
+    except FileNotFoundError as e:
+        status, output = 'failed', f"Engine not available: {e.filename}"
+    return status, time.perf_counter() - start, '\n'.join(output.strip().splitlines()[-15:])
+
+
+def run_all(notebooks, state, workers=4, force=False, dry_run=False, timeout=None):
+    """
+    Execute ``notebooks`` in dependency order on ``workers`` concurrent
+    kernels, skipping up-to-date ones. Fingerprints are taken when a
+    notebook becomes ready, i.e. after its producers have rewritten its inputs.
+    """
+    hasher = FileHasher(state['files'])
+    records = state['notebooks']
+    results = {}
+    waiting = {notebook: len(notebook.upstream) for notebook in notebooks}
+    ready = [notebook for notebook, count in waiting.items() if count == 0]
+    running = {}
+
+    def finish(notebook, status, seconds=0.0, key=None, output=''):
+        results[notebook] = (status, seconds)
+        icon = {'ok': '✅', 'skipped': '⏭️ ', 'would run': '🔄', 'blocked': '⚠️ '}.get(status, '❌')
+        timing = f" ({seconds:.1f}s)" if status in ('ok', 'failed', 'timeout') else ''
+        print(f"{icon} {notebook.name}: {status}{timing}")
+        if output and status not in ('ok', 'skipped'):
+            print('   ' + output.replace('\n', '\n   '))
+        if status in ('ok', 'failed', 'timeout'):
+            records[notebook.name] = {'fingerprint': key, 'status': status, 'runtime_seconds': round(seconds, 2),
+                                      'ran_at': datetime.now().isoformat(timespec='seconds')}
+        for consumer in notebook.downstream:
+            waiting[consumer] -= 1
+            if status in ('failed', 'timeout', 'blocked'):
+                # Inputs were not (re)produced, so dependents cannot run
+                results.setdefault(consumer, ('blocked', 0.0))
+            if waiting[consumer] == 0:
+                ready.append(consumer)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while ready or running:
+            while ready:
+                notebook = ready.pop(0)
+                if results.get(notebook, ('', 0))[0] == 'blocked':
+                    finish(notebook, 'blocked', output="An upstream notebook did not complete")
+                    continue
+                key = fingerprint(notebook, hasher)
+                if not force and up_to_date(notebook, key, records.get(notebook.name)):
+                    finish(notebook, 'skipped', records[notebook.name].get('runtime_seconds', 0.0))
+                elif dry_run:
+                    finish(notebook, 'would run')
+                else:
+                    print(f"▶️  {notebook.name}")
+                    running[pool.submit(execute, notebook, timeout)] = (notebook, key)
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    notebook, key = running.pop(future)
+                    status, seconds, output = future.result()
+                    finish(notebook, status, seconds, key, output)
+                    # Outputs just written are hashed afresh by consumers
+                    for pattern in notebook.outputs:
+                        for path in expand(notebook.path, pattern):
+                            hasher.known.pop(str(path), None)
+                    if not dry_run:
+                        state['files'] = {**hasher.known, **hasher.seen}
+                        save_state(state)
+
+    state['files'] = {**hasher.known, **hasher.seen}
+    return results
+
+
+def print_summary(results, elapsed):
+    counts = {}
+    for status, _ in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    executed = sorted(((seconds, notebook.name) for notebook, (status, seconds) in results.items()
+                       if status in ('ok', 'failed', 'timeout')), reverse=True)
+
+    print(f"\n📊 Notebook run summary")
+    print(f"   {', '.join(f'{count} {status}' for status, count in sorted(counts.items()))}")
+    if executed:
+        total = sum(seconds for seconds, _ in executed)
+        print(f"   Kernel time {total:.1f}s in {elapsed:.1f}s wall time")
+        print("   Slowest notebooks:")
+        for seconds, name in executed[:10]:
+            print(f"     {seconds:8.1f}s  {name}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run notebooks in parallel, skipping unchanged ones.")
+    parser.add_argument("paths", nargs="*", default=["."], help="Notebooks or directories to search (default: .)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Notebooks (kernels) executing at once (default: min(4, CPUs))")
+    parser.add_argument("--types", default="qmd,ipynb,Rmd",
+                        help="Comma-separated notebook types to run (default: qmd,ipynb,Rmd)")
+    parser.add_argument("--force", action="store_true", help="Run every notebook even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-notebook time limit in seconds")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    types = {kind.strip() for kind in args.types.split(',') if kind.strip()}
+    unknown = types - set(SUFFIXES.values())
+    if unknown:
+        print(f"❌ Unknown notebook types: {', '.join(sorted(unknown))}")
+        exit(1)
+
+    missing = [path for path in args.paths if not Path(path).exists()]
+    if missing:
+        print(f"❌ Not found: {', '.join(missing)}")
+        exit(1)
+
+    notebooks = [Notebook(path) for path in discover(args.paths, types)]
+    if not notebooks:
+        print(f"📝 No notebooks found in: {', '.join(args.paths)}")
+        return
+
+    try:
+        link_dependencies(notebooks)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+
+    dependent = sum(1 for notebook in notebooks if notebook.upstream)
+    print(f"📓 {len(notebooks)} notebooks ({dependent} with upstream notebooks), {args.workers} workers")
+
+    state = load_state()
+    start = time.perf_counter()
+    results = run_all(notebooks, state, workers=args.workers, force=args.force,
+                      dry_run=args.dry_run, timeout=args.timeout)
+    if not args.dry_run:
+        save_state(state)
+    print_summary(results, time.perf_counter() - start)
+
+    if any(status in ('failed', 'timeout', 'blocked') for status, _ in results.values()):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,351 @@
+"""
+Chunked, parallel model evaluation.
+
+The test set is split into chunks (byte ranges of a CSV aligned to line
+breaks, or Parquet row groups) that worker processes read and score
+themselves, so no process ever holds more than one chunk. Each worker
+loads the joblib model with ``mmap_mode='r'``: the model's numpy arrays
+are mapped from the file and shared through the page cache instead of
+being copied into every process (this needs an uncompressed joblib dump).
+
+Workers return small partial aggregates (confusion counts, per-class
+score histograms, calibration bins, log-loss sums) that are merged as
+they arrive, so the classification report, ROC AUC and calibration cover
+the whole holdout without materialising its predictions.
+
+Usage:
+    python run-evaluation-pipeline.py <model_path> <test_data> [--target COL] [--workers N]
+                                      [--chunk-mb N] [--output metrics.yaml]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.metrics import classification_report
-import sys
+import yaml
+
+DEFAULT_TARGET = "target"
+DEFAULT_CHUNK_MB = 64
+ROC_BINS = 1000
+CALIBRATION_BINS = 10
+EPSILON = 1e-15
+
+_MODEL = None
+
+
+class EvaluationAggregate:
+    """Mergeable sufficient statistics for classification metrics."""
+
+    def __init__(self, classes=None):
+        self.classes = list(classes) if classes is not None else None
+        self.rows = 0
+        self.confusion = {}
+        self.log_loss_sum = 0.0
+        self.positive_hist = None
+        self.negative_hist = None
+        self.calibration_count = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.calibration_confidence = np.zeros(CALIBRATION_BINS)
+        self.calibration_hits = np.zeros(CALIBRATION_BINS)
+
+    @property
+    def has_scores(self):
+        return self.positive_hist is not None
+
+    def update(self, y_true, y_pred, proba=None):
+        y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+        self.rows += len(y_true)
+        pairs = pd.DataFrame({'true': y_true, 'pred': y_pred}).value_counts()
+        for (true, pred), count in pairs.items():
+            key = (_scalar(true), _scalar(pred))
+            self.confusion[key] = self.confusion.get(key, 0) + int(count)
+
+        if proba is None or self.classes is None:
+            return
+        proba = np.asarray(proba, dtype=float)
+        edges = np.linspace(0.0, 1.0, ROC_BINS + 1)
+        if self.positive_hist is None:
+            self.positive_hist = np.zeros((len(self.classes), ROC_BINS), dtype=np.int64)
+            self.negative_hist = np.zeros((len(self.classes), ROC_BINS), dtype=np.int64)
+        for index, label in enumerate(self.classes):
+            is_label = y_true == label
+            self.positive_hist[index] += np.histogram(proba[is_label, index], edges)[0]
+            self.negative_hist[index] += np.histogram(proba[~is_label, index], edges)[0]
+
+        # Log loss of the probability given to the true class
+        class_index = {label: index for index, label in enumerate(self.classes)}
+        true_index = np.array([class_index.get(_scalar(label), -1) for label in y_true])
+        known = true_index >= 0
+        true_proba = proba[np.flatnonzero(known), true_index[known]]
+        self.log_loss_sum -= float(np.log(np.clip(true_proba, EPSILON, 1.0)).sum())
+
+        # Binary: reliability of the positive class; multiclass: of the top label
+        if len(self.classes) == 2:
+            confidence, hit = proba[:, 1], (y_true == self.classes[1])
+        else:
+            confidence, hit = proba.max(axis=1), (y_pred == y_true)
+        bins = np.minimum((confidence * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+        self.calibration_count += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.calibration_confidence += np.bincount(bins, weights=confidence, minlength=CALIBRATION_BINS)
+        self.calibration_hits += np.bincount(bins, weights=hit.astype(float), minlength=CALIBRATION_BINS)
+
+    def merge(self, other):
+        self.rows += other.rows
+        for key, count in other.confusion.items():
+            self.confusion[key] = self.confusion.get(key, 0) + count
+        self.log_loss_sum += other.log_loss_sum
+        if other.has_scores:
+            if self.positive_hist is None:
+                self.positive_hist = np.zeros_like(other.positive_hist)
+                self.negative_hist = np.zeros_like(other.negative_hist)
+            self.positive_hist += other.positive_hist
+            self.negative_hist += other.negative_hist
+        self.calibration_count += other.calibration_count
+        self.calibration_confidence += other.calibration_confidence
+        self.calibration_hits += other.calibration_hits
+        return self
+
+    def labels(self):
+        seen = {label for pair in self.confusion for label in pair}
+        ordered = [label for label in (self.classes or []) if label in seen]
+        return ordered + sorted((label for label in seen if label not in ordered), key=str)
+
+    def accuracy(self):
+        correct = sum(count for (true, pred), count in self.confusion.items() if true == pred)
+        return correct / self.rows if self.rows else 0.0
+
+    def per_class(self):
+        """Precision, recall, F1 and support per label (zero when undefined, as sklearn)."""
+        stats = {}
+        for label in self.labels():
+            tp = self.confusion.get((label, label), 0)
+            predicted = sum(count for (_, pred), count in self.confusion.items() if pred == label)
+            support = sum(count for (true, _), count in self.confusion.items() if true == label)
+            precision = tp / predicted if predicted else 0.0
+            recall = tp / support if support else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            stats[label] = {'precision': precision, 'recall': recall, 'f1-score': f1, 'support': support}
+        return stats
+
+    def roc_auc(self):
+        """One-vs-rest AUC per class from the binned score histograms."""
+        if not self.has_scores:
+            return {}
+        aucs = {}
+        for index, label in enumerate(self.classes):
+            positives, negatives = self.positive_hist[index], self.negative_hist[index]
+            if not positives.sum() or not negatives.sum():
+                continue
+            # Sweep thresholds from the top bin down; scores sharing a bin count as ties
+            tpr = np.concatenate([[0.0], np.cumsum(positives[::-1]) / positives.sum()])
+            fpr = np.concatenate([[0.0], np.cumsum(negatives[::-1]) / negatives.sum()])
+            aucs[label] = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+        return aucs
+
+    def calibration(self):
+        bins = []
+        for index in range(CALIBRATION_BINS):
+            count = int(self.calibration_count[index])
+            if count:
+                bins.append({
+                    'bin': f"{index / CALIBRATION_BINS:.1f}-{(index + 1) / CALIBRATION_BINS:.1f}",
+                    'count': count,
+                    'mean_confidence': float(self.calibration_confidence[index] / count),
+                    'observed_rate': float(self.calibration_hits[index] / count),
+                })
+        total = self.calibration_count.sum()
+        ece = float(np.abs(self.calibration_confidence - self.calibration_hits).sum() / total) if total else None
+        return bins, ece
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def classification_report_text(aggregate, digits=2):
+    """Text report in the layout of sklearn.metrics.classification_report."""
+    per_class = aggregate.per_class()
+    names = [str(label) for label in per_class]
+    width = max(len(name) for name in names + ['weighted avg'])
+    headers = ["precision", "recall", "f1-score", "support"]
+    lines = [f"{'':>{width}s} " + "".join(f" {header:>9}" for header in headers), ""]
+    for name, stats in zip(names, per_class.values()):
+        lines.append(f"{name:>{width}s} " + "".join(f" {stats[key]:>9.{digits}f}" for key in headers[:3])
+                     + f" {stats['support']:>9}")
+    lines.append("")
+
+    total = aggregate.rows
+    lines.append(f"{'accuracy':>{width}s}  {'':>9} {'':>9} {aggregate.accuracy():>9.{digits}f} {total:>9}")
+    for average in ('macro avg', 'weighted avg'):
+        weights = [stats['support'] if average == 'weighted avg' else 1 for stats in per_class.values()]
+        values = [sum(w * stats[key] for w, stats in zip(weights, per_class.values())) / sum(weights)
+                  for key in headers[:3]]
+        lines.append(f"{average:>{width}s} " + "".join(f" {value:>9.{digits}f}" for value in values)
+                     + f" {total:>9}")
+    return "\n".join(lines)
+
+
+def plan_chunks(test_data, chunk_bytes):
+    """Chunk descriptors that workers can read independently."""
+    path = Path(test_data)
+    if path.suffix.lower() == '.parquet':
+        import pyarrow.parquet as pq
+        return [('parquet', str(path), group) for group in range(pq.ParquetFile(path).num_row_groups)]
+
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        header = f.readline()
+        boundaries = [f.tell()]
+        position = boundaries[0] + chunk_bytes
+        while position < size:
+            f.seek(position)
+            f.readline()  # move to the next line break
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+            position = boundary + chunk_bytes
+    boundaries.append(size)
+    # NOTE: quoted CSV fields containing line breaks are not supported
+    return [('csv', str(path), header, start, end)
+            for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def read_chunk(chunk):
+    if chunk[0] == 'parquet':
+        import pyarrow.parquet as pq
+        _, path, group = chunk
+        return pq.ParquetFile(path).read_row_group(group).to_pandas()
+    _, path, header, start, end = chunk
+    with open(path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + body))
+
+
+def _init_worker(model_path):
+    global _MODEL
+    _MODEL = joblib.load(model_path, mmap_mode='r')
+
+
+def score_chunk(chunk, target):
+    df = read_chunk(chunk)
+    if target not in df.columns:
+        raise KeyError(f"Target column '{target}' not found in test data")
+    y_true = df.pop(target).to_numpy()
+    features = list(getattr(_MODEL, 'feature_names_in_', df.columns))
+    X = df[features]
+
+    classes = getattr(_MODEL, 'classes_', None)
+    aggregate = EvaluationAggregate([_scalar(label) for label in classes] if classes is not None else None)
+    proba = _MODEL.predict_proba(X) if hasattr(_MODEL, 'predict_proba') and classes is not None else None
+    y_pred = classes[np.argmax(proba, axis=1)] if proba is not None else _MODEL.predict(X)
+    aggregate.update(y_true, y_pred, proba)
+    return aggregate
+
+
+def evaluate(model_path, test_data, target=DEFAULT_TARGET, workers=None, chunk_mb=DEFAULT_CHUNK_MB,
+             progress=print):
+    """Score ``test_data`` chunk by chunk on a process pool and merge the aggregates."""
+    chunks = plan_chunks(test_data, int(chunk_mb * 1024 * 1024))
+    workers = min(workers or os.cpu_count() or 1, max(1, len(chunks)))
+    total = EvaluationAggregate()
+    report_every = max(1, len(chunks) // 20)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as executor:
+        futures = [executor.submit(score_chunk, chunk, target) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            partial = future.result()
+            if total.classes is None:
+                total.classes = partial.classes
+            total.merge(partial)
+            if done % report_every == 0 or done == len(chunks):
+                progress(f"📊 {done}/{len(chunks)} chunks, {total.rows:,} rows, "
+                         f"running accuracy {total.accuracy():.4f}")
+    return total
+
+
+def metrics_summary(aggregate):
+    per_class = aggregate.per_class()
+    summary = {
+        'rows': aggregate.rows,
+        'accuracy': aggregate.accuracy(),
+        'classification_report': {str(label): stats for label, stats in per_class.items()},
+        'confusion_matrix': {
+            'labels': [str(label) for label in per_class],
+            'counts': [[aggregate.confusion.get((true, pred), 0) for pred in per_class] for true in per_class],
+        },
+    }
+    if aggregate.has_scores:
+        summary['log_loss'] = aggregate.log_loss_sum / aggregate.rows if aggregate.rows else None
+        aucs = aggregate.roc_auc()
+        summary['roc_auc'] = {str(label): auc for label, auc in aucs.items()}
+        if len(aggregate.classes) == 2 and aggregate.classes[1] in aucs:
+            summary['roc_auc_binary'] = aucs[aggregate.classes[1]]
+        elif aucs:
+            summary['roc_auc_macro_ovr'] = float(np.mean(list(aucs.values())))
+        bins, ece = aggregate.calibration()
+        summary['calibration'] = {'bins': bins, 'expected_calibration_error': ece}
+    return summary
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Evaluate a joblib model on a test set in parallel chunks.")
+    parser.add_argument("model_path", help="joblib model (uncompressed dumps are memory-mapped)")
+    parser.add_argument("test_data", help="Test set (.csv or .parquet) including the target column")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help=f"Target column (default: {DEFAULT_TARGET})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=DEFAULT_CHUNK_MB,
+                        help=f"CSV bytes per chunk (default: {DEFAULT_CHUNK_MB}); Parquet uses row groups")
+    parser.add_argument("--output", default=None, help="Save metrics as YAML")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    for path in (args.model_path, args.test_data):
+        if not Path(path).exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    aggregate = evaluate(args.model_path, args.test_data, args.target, args.workers, args.chunk_mb)
+    elapsed = time.perf_counter() - start
+
+    summary = metrics_summary(aggregate)
+    print()
+    print(classification_report_text(aggregate))
+    print()
+    print("Confusion matrix (rows: true, columns: predicted):")
+    labels = summary['confusion_matrix']['labels']
+    width = max(len(label) for label in labels + ['true'])
+    print(f"{'':>{width}} " + " ".join(f"{label:>10}" for label in labels))
+    for label, row in zip(labels, summary['confusion_matrix']['counts']):
+        print(f"{label:>{width}} " + " ".join(f"{count:>10}" for count in row))
+    if 'roc_auc_binary' in summary:
+        print(f"\nROC AUC: {summary['roc_auc_binary']:.4f}")
+    elif 'roc_auc_macro_ovr' in summary:
+        print(f"\nROC AUC (macro one-vs-rest): {summary['roc_auc_macro_ovr']:.4f}")
+    if 'log_loss' in summary:
+        print(f"Log loss: {summary['log_loss']:.4f}")
+        ece = summary['calibration']['expected_calibration_error']
+        if ece is not None:
+            print(f"Expected calibration error: {ece:.4f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            yaml.dump(summary, f, default_flow_style=False)
+        print(f"\n📄 Metrics saved: {args.output}")
 
-if len(sys.argv) != 3:
-    print("Usage: python run-evaluation-pipeline.py <model_path> <test_data>")
-    sys.exit(1)
+    print(f"\n✅ Model evaluation completed: {aggregate.rows:,} rows in {elapsed:.1f}s")
 
-model_path = sys.argv[1]
-test_data = sys.argv[2]
 
-model = joblib.load(model_path)
-test_df = pd.read_csv(test_data)
-# Add your evaluation logic here
-print('Model evaluation completed')
+if __name__ == "__main__":
+    main()
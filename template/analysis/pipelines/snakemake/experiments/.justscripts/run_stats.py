@@ -0,0 +1,309 @@
+"""
+Statistics over Snakemake runs.
+
+Every ``--stats`` file written by smk-run-experiment / smk-resume-run is one
+run. For each run this computes:
+
+- per-rule runtime distributions (from ``benchmark:`` files when the rules
+  have them, otherwise from the mean/min/max Snakemake records); benchmark
+  files are attributed to the run during which they were written, by mtime,
+  since all runs of an experiment share one benchmark directory,
+- the critical path, estimated from the schedule as the longest chain of
+  jobs that waited on each other rather than on free cores (how short the
+  run could get with more cores),
+- parallel efficiency: busy core-seconds over wall time x max_threads.
+
+Across runs of all experiments it flags rules whose mean runtime keeps
+growing.
+"""
+
+import bisect
+import json
+import math
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+EXCLUDED_RUN_DIRS = {'templates', 'archived'}
+BENCHMARK_DIR = "benchmarks"
+BENCHMARK_SLACK_S = 5
+DEFAULT_MAX_THREADS = 1
+DEFAULT_GROWTH = 0.05
+MIN_TREND_RUNS = 3
+
+
+def parse_time(value):
+    """Stats timestamps are ``time.ctime()`` strings (or epoch seconds)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.strptime(value.strip(), "%a %b %d %H:%M:%S %Y").timestamp()
+
+
+def max_threads(experiment_dir, base_config):
+    """``max_threads`` from the run's config.yaml, else ``resources.max_threads`` in base.yaml."""
+    for config_file, keys in ((Path(experiment_dir) / "config.yaml", ('max_threads',)),
+                              (Path(base_config), ('resources', 'max_threads'))):
+        if config_file.exists():
+            with open(config_file, 'r') as f:
+                value = yaml.safe_load(f) or {}
+            for key in keys:
+                value = value.get(key) if isinstance(value, dict) else None
+            if value:
+                return int(value)
+    return DEFAULT_MAX_THREADS
+
+
+def load_jobs(stats):
+    """
+    One row per job from the ``files`` section.
+
+    The outputs of one job share its start, stop and duration. Start and
+    stop only have 1-second resolution, so concurrent jobs often share
+    them; the float ``duration`` tells such jobs apart.
+    """
+    jobs = {}
+    for output, info in (stats.get('files') or {}).items():
+        try:
+            start, stop = parse_time(info['start-time']), parse_time(info['stop-time'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        resources = info.get('resources') or {}
+        cores = resources.get('_cores') or resources.get('threads') or 1
+        duration = info.get('duration')
+        key = (start, stop, duration if duration is not None else output)
+        jobs[key] = {
+            'start': start,
+            'stop': stop,
+            'duration': float(duration) if duration is not None else stop - start,
+            'cores': int(cores),
+        }
+    return pd.DataFrame(list(jobs.values()), columns=['start', 'stop', 'duration', 'cores'])
+
+
+def critical_path(jobs, threads):
+    """
+    Estimate the critical path from the schedule.
+
+    A job that started the moment earlier jobs finished, while cores were
+    free, was waiting on their outputs, so it extends the longest chain
+    that ended before it. A job that started when all ``threads`` cores
+    were busy may only have been waiting for a core, so it starts a new
+    chain; otherwise core contention would look like a dependency.
+    """
+    if jobs.empty:
+        return 0.0
+    ordered = jobs.sort_values('stop').reset_index(drop=True)
+    starts = ordered['start'].to_numpy()
+    stops = ordered['stop'].to_numpy()
+    cores = ordered['cores'].to_numpy()
+    stop_list = stops.tolist()
+    best_until = []  # longest chain among the first i+1 jobs by stop time
+    longest = 0.0
+    for start, duration, job_cores in zip(starts, ordered['duration'], cores):
+        # Jobs stamped as stopping in the second this one started had finished
+        busy = cores[(starts < start) & (stops > start)].sum()
+        previous = bisect.bisect_right(stop_list, start) - 1
+        if previous >= 0 and busy + job_cores <= threads:
+            chain = duration + best_until[previous]
+        else:
+            chain = duration
+        longest = max(longest, chain)
+        best_until.append(longest)
+    return float(longest)
+
+
+def rule_for_benchmark(path, rules):
+    """Rule owning ``<rule>_<wildcards>.txt`` (longest matching rule name)."""
+    name = Path(path).stem
+    matches = [rule for rule in rules if name == rule or name.startswith(f"{rule}_")]
+    return max(matches, key=len) if matches else name.split('_')[0]
+
+
+def load_benchmarks(benchmark_dir, rules, window=None):
+    """
+    One row per benchmarked job: rule, seconds, max RSS (MB) and CPU time.
+
+    Every run of an experiment writes to the same benchmark directory, so
+    with a ``(start, stop)`` window only files written during that run
+    (a benchmark file is written when its job finishes) are read.
+    """
+    rows = []
+    if benchmark_dir is None or not Path(benchmark_dir).is_dir():
+        return pd.DataFrame(columns=['rule', 's', 'max_rss', 'cpu_time'])
+    for path in Path(benchmark_dir).rglob("*"):
+        if not path.is_file() or path.suffix not in ('.txt', '.tsv'):
+            continue
+        if window is not None and not window[0] <= path.stat().st_mtime <= window[1]:
+            continue
+        try:
+            df = pd.read_csv(path, sep='\t')
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+            continue
+        if 's' not in df.columns or df.empty:
+            continue
+        # Repeated benchmarks write one row per repeat
+        rows.append({
+            'rule': rule_for_benchmark(path, rules),
+            's': pd.to_numeric(df['s'], errors='coerce').mean(),
+            'max_rss': pd.to_numeric(df['max_rss'], errors='coerce').max() if 'max_rss' in df else None,
+            'cpu_time': pd.to_numeric(df['cpu_time'], errors='coerce').mean() if 'cpu_time' in df else None,
+        })
+    return pd.DataFrame(rows, columns=['rule', 's', 'max_rss', 'cpu_time'])
+
+
+def rule_distributions(stats, benchmarks):
+    """Per-rule runtime summary, preferring benchmark samples over Snakemake's aggregates."""
+    distributions = {}
+    for rule, info in (stats.get('rules') or {}).items():
+        distributions[rule] = {
+            'mean_s': info.get('mean-runtime'),
+            'min_s': info.get('min-runtime'),
+            'max_s': info.get('max-runtime'),
+            'source': 'stats',
+        }
+    for rule, group in benchmarks.groupby('rule'):
+        seconds = group['s'].dropna()
+        if seconds.empty:
+            continue
+        entry = {
+            'jobs': int(len(seconds)),
+            'mean_s': float(seconds.mean()),
+            'min_s': float(seconds.min()),
+            'p50_s': float(seconds.quantile(0.5)),
+            'p95_s': float(seconds.quantile(0.95)),
+            'max_s': float(seconds.max()),
+            'total_s': float(seconds.sum()),
+            'source': 'benchmark',
+        }
+        rss = pd.to_numeric(group['max_rss'], errors='coerce').dropna()
+        if not rss.empty:
+            entry['max_rss_mb'] = float(rss.max())
+        distributions[rule] = entry
+    return distributions
+
+
+def analyse_run(stats_file, experiment_dir, base_config):
+    """Summary of one run (one stats file)."""
+    stats_file = Path(stats_file)
+    with open(stats_file, 'r') as f:
+        stats = json.load(f)
+
+    jobs = load_jobs(stats)
+    threads = max_threads(experiment_dir, base_config)
+    output_dir = _output_dir(experiment_dir)
+    # Stats times are truncated to the second; allow for that and for the write itself
+    window = None if jobs.empty else (jobs['start'].min() - 1, jobs['stop'].max() + BENCHMARK_SLACK_S)
+    benchmarks = load_benchmarks(output_dir / BENCHMARK_DIR if output_dir else None,
+                                 stats.get('rules') or {}, window)
+
+    summary = {
+        'stats_file': str(stats_file),
+        'experiment': Path(experiment_dir).name,
+        'total_jobs': stats.get('total_jobs', len(jobs)),
+        'rules': rule_distributions(stats, benchmarks),
+        'total_runtime_s': stats.get('total_runtime'),
+        'max_threads': threads,
+    }
+    if jobs.empty:
+        summary['started'] = stats_file.stat().st_mtime
+        return summary
+
+    wall = float(jobs['stop'].max() - jobs['start'].min())
+    work = float((jobs['duration'] * jobs['cores']).sum())
+    path = critical_path(jobs, threads)
+    summary.update({
+        'started': float(jobs['start'].min()),
+        'wall_s': wall,
+        'busy_core_s': work,
+        'critical_path_s': path,
+        'parallel_efficiency': work / (wall * threads) if wall > 0 else None,
+        # Cores the DAG could keep busy on average if nothing else limited it
+        'available_parallelism': work / path if path > 0 else None,
+    })
+    return summary
+
+
+def _output_dir(experiment_dir):
+    config_file = Path(experiment_dir) / "config.yaml"
+    if not config_file.exists():
+        return None
+    with open(config_file, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    output_dir = config.get('output_dir')
+    return (Path(experiment_dir) / output_dir).resolve() if output_dir else None
+
+
+def scaling_advice(summary):
+    """One line on whether more cores would shorten this run."""
+    parallelism = summary.get('available_parallelism')
+    efficiency = summary.get('parallel_efficiency')
+    if parallelism is None or efficiency is None:
+        return None
+    threads = summary['max_threads']
+    if parallelism > threads * 1.5 and efficiency > 0.7:
+        return (f"cores are the bottleneck: the DAG could use ~{parallelism:.1f} cores, "
+                f"max_threads is {threads}; scaling out should pay off")
+    if summary['critical_path_s'] >= 0.8 * summary['wall_s']:
+        return ("the run is bound by its critical path; more cores will not help, "
+                "speed up the rules on it instead")
+    return (f"cores are underused ({efficiency:.0%} efficiency); "
+            f"check per-job threads and resource limits before scaling out")
+
+
+def discover_runs(runs_dir, logs_dir):
+    """``[(stats_file, experiment_dir), ...]`` for every stats file of every experiment."""
+    found = []
+    runs_dir, logs_dir = Path(runs_dir), Path(logs_dir)
+    if not runs_dir.is_dir():
+        return found
+    for experiment_dir in sorted(runs_dir.iterdir()):
+        if not experiment_dir.is_dir() or experiment_dir.name in EXCLUDED_RUN_DIRS:
+            continue
+        for stats_file in sorted((logs_dir / experiment_dir.name).glob("stats*.json")):
+            found.append((stats_file, experiment_dir))
+    return found
+
+
+def runtime_trends(summaries, growth=DEFAULT_GROWTH):
+    """
+    Rules whose mean runtime grows across runs (ordered by start time).
+
+    A least-squares slope is fitted per rule; rules with at least
+    ``MIN_TREND_RUNS`` runs whose slope exceeds ``growth`` x their mean
+    runtime per run are reported.
+    """
+    series = {}
+    for summary in sorted(summaries, key=lambda s: s['started']):
+        for rule, info in summary['rules'].items():
+            if info.get('mean_s') is not None:
+                series.setdefault(rule, []).append(float(info['mean_s']))
+
+    trends = []
+    for rule, values in series.items():
+        n = len(values)
+        if n < MIN_TREND_RUNS:
+            continue
+        mean_x, mean_y = (n - 1) / 2, sum(values) / n
+        denominator = sum((x - mean_x) ** 2 for x in range(n))
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / denominator
+        if mean_y > 0 and slope / mean_y >= growth:
+            trends.append({
+                'rule': rule,
+                'runs': n,
+                'first_mean_s': values[0],
+                'last_mean_s': values[-1],
+                'growth_per_run': round(slope / mean_y, 3),
+            })
+    return sorted(trends, key=lambda t: t['growth_per_run'], reverse=True)
+
+
+def format_seconds(seconds):
+    if seconds is None or (isinstance(seconds, float) and math.isnan(seconds)):
+        return "N/A"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
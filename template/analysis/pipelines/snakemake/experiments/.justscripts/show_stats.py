@@ -1,18 +1,100 @@
+import argparse
 import json
 import sys
+import yaml
+from pathlib import Path
 
-if len(sys.argv) != 2:
-    print("Usage: python show_stats.py <log_dir>")
-    sys.exit(1)
-
-log_dir = sys.argv[1]
-stats_path = f"{log_dir}/stats.json"
-
-try:
-    with open(stats_path) as f:
-        stats = json.load(f)
-        print(f'Total jobs: {stats.get("total_jobs", "N/A")}')
-        print(f'Rules: {len(stats.get("rules", {}))}')
-        print(f'Runtime: {stats.get("total_runtime", "N/A")} seconds')
-except Exception as e:
-    print(f"Error reading stats: {e}")
+from run_stats import (DEFAULT_GROWTH, analyse_run, discover_runs, format_seconds,
+                       runtime_trends, scaling_advice)
+
+RUNS_DIR = Path("runs")
+LOGS_DIR = Path("logs")
+BASE_CONFIG = Path("config/base.yaml")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Show Snakemake run statistics.")
+    parser.add_argument("log_dir", nargs="?", default=None,
+                        help="Log directory of one experiment (default with --all: every experiment)")
+    parser.add_argument("--all", action="store_true", help="Analyse every run under runs/ and report trends")
+    parser.add_argument("--runs-dir", default=str(RUNS_DIR))
+    parser.add_argument("--logs-dir", default=str(LOGS_DIR))
+    parser.add_argument("--config", default=str(BASE_CONFIG), help="Base config with resources.max_threads")
+    parser.add_argument("--growth", type=float, default=DEFAULT_GROWTH,
+                        help=f"Flag rules whose mean runtime grows by this fraction per run (default: {DEFAULT_GROWTH})")
+    parser.add_argument("--output", default=None, help="Also save the statistics as YAML")
+    args = parser.parse_args()
+    if not args.all and not args.log_dir:
+        parser.error("a log_dir is required unless --all is given")
+    return args
+
+
+def print_run(summary):
+    print(f"\n🐍 {summary['experiment']} ({Path(summary['stats_file']).name})")
+    print(f'Total jobs: {summary.get("total_jobs", "N/A")}')
+    print(f'Rules: {len(summary["rules"])}')
+    print(f'Runtime: {summary.get("total_runtime_s", "N/A")} seconds')
+    if 'wall_s' in summary:
+        efficiency = summary['parallel_efficiency']
+        print(f"Wall time: {format_seconds(summary['wall_s'])}, "
+              f"critical path: {format_seconds(summary['critical_path_s'])}")
+        print(f"Parallel efficiency: {efficiency:.0%} of {summary['max_threads']} threads"
+              if efficiency is not None else "Parallel efficiency: N/A")
+        advice = scaling_advice(summary)
+        if advice:
+            print(f"💡 {advice}")
+
+    print(f"   {'rule':<28} {'jobs':>5} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    ranked = sorted(summary['rules'].items(), key=lambda item: item[1].get('total_s') or item[1].get('mean_s') or 0,
+                    reverse=True)
+    for rule, info in ranked:
+        print(f"   {rule:<28} {info.get('jobs', '-'):>5} {format_seconds(info.get('mean_s')):>9} "
+              f"{format_seconds(info.get('p50_s')):>9} {format_seconds(info.get('p95_s')):>9} "
+              f"{format_seconds(info.get('max_s')):>9}")
+
+
+def main():
+    args = parse_arguments()
+
+    if args.all:
+        runs = discover_runs(args.runs_dir, args.logs_dir)
+    else:
+        log_dir = Path(args.log_dir)
+        stats_files = sorted(log_dir.glob("stats*.json"))
+        if not stats_files:
+            print(f"Error reading stats: no stats*.json in {log_dir}")
+            sys.exit(1)
+        runs = [(stats_file, Path(args.runs_dir) / log_dir.name) for stats_file in stats_files]
+
+    summaries = []
+    for stats_file, experiment_dir in runs:
+        try:
+            summaries.append(analyse_run(stats_file, experiment_dir, args.config))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Error reading stats {stats_file}: {e}")
+
+    if not summaries:
+        print("📝 No Snakemake run statistics found.")
+        return
+
+    for summary in summaries:
+        print_run(summary)
+
+    trends = runtime_trends(summaries, args.growth)
+    if len(summaries) > 1:
+        print("\n📈 Rules with growing runtime:")
+        if not trends:
+            print("   none")
+        for trend in trends:
+            print(f"   ⚠️  {trend['rule']}: {format_seconds(trend['first_mean_s'])} -> "
+                  f"{format_seconds(trend['last_mean_s'])} over {trend['runs']} runs "
+                  f"(+{trend['growth_per_run']:.0%} per run)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            yaml.dump({'runs': summaries, 'growing_rules': trends}, f, default_flow_style=False)
+        print(f"\n📄 Statistics saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Fused per-column statistics engine
+Computes every per-column aggregate needed by the validation reports once
+and shares the result between them
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from type_classification import TypeProfile, classify_series
+
+
+@dataclass
+class ColumnStats:
+    """Aggregates for a single column, computed once and shared by all sub-reports."""
+
+    name: Any
+    dtype: Any
+    length: int
+    null_count: int
+    unique_count: int
+    inferred_dtype: str
+    is_numeric: bool = False
+    is_string: bool = False
+
+    # Numeric aggregates (numpy dtypes only; NaN-free sorted values)
+    sorted_values: Optional[np.ndarray] = field(default=None, repr=False)
+    min_value: Any = None
+    max_value: Any = None
+    has_infinity: Any = None
+    has_negative: Any = None
+    mean: Any = None
+    median: Any = None
+    std: Any = None
+    skewness: Any = None
+    kurtosis: Any = None
+    q1: Any = None
+    q3: Any = None
+
+    # String aggregates
+    lengths: Optional[pd.Series] = field(default=None, repr=False)
+
+    # Value-type histogram (object columns only)
+    type_profile: Optional[TypeProfile] = None
+
+    @property
+    def non_null_count(self) -> np.int64:
+        return np.int64(self.length - self.null_count)
+
+    def count_outside(self, lower: float, upper: float) -> int:
+        """Count values strictly below ``lower`` or strictly above ``upper``."""
+        values = self.sorted_values
+        # Comparisons against NaN bounds never match, mirror that here
+        below = 0 if np.isnan(lower) else np.searchsorted(values, lower, side='left')
+        above = 0 if np.isnan(upper) else len(values) - np.searchsorted(values, upper, side='right')
+        return int(below + above)
+
+
+def _is_plain_numeric(series: pd.Series) -> bool:
+    """Numeric columns backed by a plain numpy array (no extension dtypes)."""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf'
+
+
+def _numeric_stats(stats: ColumnStats, series: pd.Series) -> None:
+    """
+    Fill numeric aggregates from the non-null values.
+
+    Quartiles, median, unique count and sign/infinity flags come from one
+    sort; mean, std, skewness and kurtosis from one central-moments pass.
+    min/max stay pandas reductions for their signed-zero behaviour.
+    """
+    valid = series.dropna()
+    values = np.sort(valid.to_numpy())
+    stats.sorted_values = values
+    n = len(values)
+
+    if n > 0:
+        stats.unique_count = int(np.count_nonzero(values[1:] != values[:-1]) + 1)
+        # pandas' own reductions, not the sorted ends: -0.0 and 0.0 sort as equal,
+        # so values[0] may carry a different sign than Series.min() reports
+        stats.min_value = valid.min()
+        stats.max_value = valid.max()
+        stats.has_negative = values[0] < 0
+        stats.has_infinity = np.isinf(values[0]) | np.isinf(values[-1])
+    else:
+        stats.unique_count = 0
+        stats.min_value = series.min()
+        stats.max_value = series.max()
+        stats.has_negative = np.False_
+        stats.has_infinity = np.False_
+
+    # Boolean columns are numeric for dtype checks but excluded from np.number statistics
+    if series.dtype.kind == 'b' or n == 0:
+        return
+
+    if values.dtype.kind == 'f' and values.dtype != np.float64:
+        # pandas casts reduction results back to narrow float dtypes; let it
+        stats.q1, stats.q3 = (np.float64(q) for q in np.percentile(values, [25, 75]))
+        stats.median = valid.median()
+        stats.mean = valid.mean()
+        stats.std = valid.std()
+        stats.skewness = valid.skew()
+        stats.kurtosis = valid.kurtosis()
+        return
+
+    stats.q1 = _percentile(values, 0.25)
+    stats.median = _median(values)
+    stats.q3 = _percentile(values, 0.75)
+    # numpy picks between 0.0 and -0.0 by partition order, not sort order
+    if stats.q1 == 0 or stats.q3 == 0:
+        stats.q1, stats.q3 = (np.float64(q) for q in np.percentile(values, [25, 75]))
+    if stats.median == 0:
+        stats.median = valid.median()
+    stats.mean, stats.std, stats.skewness, stats.kurtosis = _moments(valid.to_numpy())
+
+
+def _percentile(values: np.ndarray, q: float) -> np.float64:
+    """np.percentile's linear interpolation, read off an already-sorted array."""
+    n = len(values)
+    virtual = q * (n - 1)
+    # Past the last index numpy takes index -1 for both ends, and its gamma
+    # is measured from that -1
+    lower = int(np.floor(virtual)) if virtual < n - 1 else -1
+    upper = lower + 1 if virtual < n - 1 else -1
+    a, b = values[lower], values[upper]
+    gamma = np.float64(virtual - lower)
+    # numpy's _lerp: the difference in the input dtype, then the same branch
+    diff = np.subtract(values[[upper]], values[[lower]])[0]
+    return np.float64(b - diff * (1 - gamma) if gamma >= 0.5 else a + diff * gamma)
+
+
+def _median(values: np.ndarray) -> np.float64:
+    """Series.median from an already-sorted array: the middle value or the mean of the two."""
+    middle = len(values) // 2
+    if len(values) % 2:
+        return np.float64(values[middle])
+    return (np.float64(values[middle - 1]) + np.float64(values[middle])) / 2
+
+
+def _moments(values: np.ndarray) -> Tuple[np.float64, np.float64, np.float64, np.float64]:
+    """
+    Mean, std, skewness and kurtosis from one pass of central moments.
+
+    Follows pandas' nanops arithmetic step for step (float count, same
+    summation order, same near-zero clean-up), so the results equal
+    Series.mean/std/skew/kurtosis exactly. Values must be in row order:
+    pairwise summation rounds differently over a sorted array.
+    """
+    count = np.float64(len(values))
+    mean = values.sum(dtype=np.float64) / count
+    floats = values.astype(np.float64, copy=False)
+    adjusted = floats - floats.sum() / count
+    adjusted2 = adjusted ** 2
+    m2 = adjusted2.sum()
+    m3 = (adjusted2 * adjusted).sum()
+    m4 = (adjusted2 ** 2).sum()
+
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.float64(np.nan)
+
+    skew = np.nan
+    if count >= 3:
+        m2_clean, m3_clean = _zero_out_fperr(m2), _zero_out_fperr(m3)
+        skew = (np.float64(0.0) if m2_clean == 0
+                else (count * (count - 1) ** 0.5 / (count - 2)) * (m3_clean / m2_clean ** 1.5))
+
+    kurt = np.nan
+    if count >= 4:
+        numerator = _zero_out_fperr(count * (count + 1) * (count - 1) * m4)
+        denominator = _zero_out_fperr((count - 2) * (count - 3) * m2 ** 2)
+        kurt = (np.float64(0.0) if denominator == 0
+                else numerator / denominator - 3 * (count - 1) ** 2 / ((count - 2) * (count - 3)))
+
+    return mean, std, skew, kurt
+
+
+def _zero_out_fperr(value: np.float64) -> np.float64:
+    """Round moments that are floating-point noise to zero, as pandas does."""
+    return np.float64(0.0) if np.abs(value) < 1e-14 else value
+
+
+def compute_column_stats(df: pd.DataFrame) -> List[ColumnStats]:
+    """
+    Compute all per-column aggregates once per column.
+
+    Numeric columns cost a dropna, one sort, pandas min/max and one
+    moments pass (see ``_numeric_stats``) instead of a reduction per
+    aggregate; every value equals the matching pandas/numpy call.
+
+    Args:
+        df: DataFrame to analyze
+
+    Returns:
+        List of ColumnStats in column order
+
+    Raises:
+        ValueError: If column names are not unique
+    """
+    if not df.columns.is_unique:
+        duplicated = df.columns[df.columns.duplicated()].unique().tolist()
+        raise ValueError(f"Duplicate column names: {duplicated}")
+
+    results = []
+
+    for col, series in df.items():
+        type_profile = classify_series(series) if series.dtype == object else None
+        stats = ColumnStats(
+            name=col,
+            dtype=series.dtype,
+            length=len(series),
+            null_count=int(series.isna().sum()),
+            unique_count=0,
+            inferred_dtype=(type_profile.inferred_dtype if type_profile is not None
+                            else pd.api.types.infer_dtype(series)),
+            is_numeric=pd.api.types.is_numeric_dtype(series.dtype),
+            is_string=pd.api.types.is_string_dtype(series.dtype),
+            type_profile=type_profile,
+        )
+
+        if _is_plain_numeric(series):
+            _numeric_stats(stats, series)
+        else:
+            stats.unique_count = series.nunique()
+            if stats.is_string and not series.empty:
+                stats.lengths = series.str.len()
+
+        results.append(stats)
+
+    return results
+
+
+def stats_by_name(column_stats: List[ColumnStats]) -> Dict[Any, ColumnStats]:
+    """Index column statistics by column name."""
+    return {stats.name: stats for stats in column_stats}
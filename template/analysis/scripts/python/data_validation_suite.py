@@ -15,6 +15,8 @@ from pandera import Column, DataFrameSchema, Check
 import logging
 from datetime import datetime
 
+from column_stats import ColumnStats, compute_column_stats, stats_by_name
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -133,17 +135,20 @@ class DataValidationSuite:
         # 1. Basic structure validation
         results['validations']['structure'] = self._validate_structure(df)
         
+        # Per-column aggregates are computed once and shared by every sub-report
+        column_stats = compute_column_stats(df)
+        
         # 2. Missing value analysis
-        results['validations']['missing_values'] = self._validate_missing_values(df)
+        results['validations']['missing_values'] = self._validate_missing_values(df, column_stats)
         
         # 3. Duplicate detection
         results['validations']['duplicates'] = self._validate_duplicates(df)
         
         # 4. Data type validation
-        results['validations']['data_types'] = self._validate_data_types(df)
+        results['validations']['data_types'] = self._validate_data_types(df, column_stats)
         
         # 5. Statistical validation
-        results['validations']['statistics'] = self._validate_statistics(df)
+        results['validations']['statistics'] = self._validate_statistics(df, column_stats)
         
         # 6. Business rule validation
         results['validations']['business_rules'] = self._validate_business_rules(df)
@@ -161,9 +166,16 @@ class DataValidationSuite:
             'duplicate_columns': len(df.columns) != len(set(df.columns))
         }
     
-    def _validate_missing_values(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_missing_values(self, df: pd.DataFrame,
+                                 column_stats: Optional[List[ColumnStats]] = None) -> Dict[str, Any]:
         """Analyze missing value patterns."""
-        missing_stats = df.isnull().sum()
+        if column_stats is None:
+            column_stats = compute_column_stats(df)
+        missing_stats = pd.Series(
+            [stats.null_count for stats in column_stats],
+            index=df.columns,
+            dtype='int64' if len(df.columns) else 'float64'
+        )
         missing_percent = (missing_stats / len(df)) * 100
         
         return {
@@ -185,42 +197,86 @@ class DataValidationSuite:
             'duplicate_indices': df[duplicates].index.tolist()
         }
     
-    def _validate_data_types(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_data_types(self, df: pd.DataFrame,
+                             column_stats: Optional[List[ColumnStats]] = None) -> Dict[str, Any]:
         """Validate data types and detect inconsistencies."""
+        if column_stats is None:
+            column_stats = compute_column_stats(df)
         type_info = {}
         
-        for col in df.columns:
-            dtype = df[col].dtype
+        for stats in column_stats:
+            col = stats.name
+            dtype = stats.dtype
             type_info[col] = {
                 'current_dtype': str(dtype),
-                'inferred_dtype': pd.api.types.infer_dtype(df[col]),
-                'non_null_count': df[col].count(),
-                'unique_count': df[col].nunique()
+                'inferred_dtype': stats.inferred_dtype,
+                'non_null_count': stats.non_null_count,
+                'unique_count': stats.unique_count
             }
             
+            if stats.type_profile is not None:
+                type_info[col].update({
+                    'value_types': stats.type_profile.histogram,
+                    'string_content': stats.type_profile.string_content,
+                    'mixed_types': stats.type_profile.is_mixed
+                })
+                if stats.type_profile.string_content_sampled:
+                    type_info[col]['string_content_sampled'] = stats.type_profile.string_content_sampled
+            
             # Type-specific validations
-            if pd.api.types.is_numeric_dtype(dtype):
+            if stats.sorted_values is not None:
+                type_info[col].update({
+                    'has_infinity': stats.has_infinity,
+                    'has_negative': stats.has_negative,
+                    'min_value': stats.min_value,
+                    'max_value': stats.max_value
+                })
+            elif stats.is_numeric:
                 type_info[col].update({
                     'has_infinity': np.isinf(df[col]).any(),
                     'has_negative': (df[col] < 0).any(),
                     'min_value': df[col].min(),
                     'max_value': df[col].max()
                 })
-            elif pd.api.types.is_string_dtype(dtype):
+            elif stats.is_string:
                 type_info[col].update({
-                    'max_length': df[col].str.len().max() if not df[col].empty else 0,
-                    'min_length': df[col].str.len().min() if not df[col].empty else 0,
+                    'max_length': stats.lengths.max() if stats.lengths is not None else 0,
+                    'min_length': stats.lengths.min() if stats.lengths is not None else 0,
                     'has_special_chars': df[col].str.contains(r'[^a-zA-Z0-9\\s]').any()
                 })
         
         return type_info
     
-    def _validate_statistics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _validate_statistics(self, df: pd.DataFrame,
+                             column_stats: Optional[List[ColumnStats]] = None) -> Dict[str, Any]:
         """Statistical validation and outlier detection."""
+        if column_stats is None:
+            column_stats = compute_column_stats(df)
+        shared = stats_by_name(column_stats)
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         stats = {}
         
         for col in numeric_cols:
+            col_stats = shared[col]
+            if col_stats.mean is not None:
+                values = col_stats.sorted_values
+                Q1, Q3 = col_stats.q1, col_stats.q3
+                IQR = Q3 - Q1
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    zscores = np.abs((values - col_stats.mean) / col_stats.std)
+                
+                stats[col] = {
+                    'mean': col_stats.mean,
+                    'median': col_stats.median,
+                    'std': col_stats.std,
+                    'skewness': col_stats.skewness,
+                    'kurtosis': col_stats.kurtosis,
+                    'outliers_iqr': col_stats.count_outside(Q1 - 1.5*IQR, Q3 + 1.5*IQR),
+                    'outliers_zscore': int(np.count_nonzero(zscores > 3))
+                }
+                continue
+            
+            # Extension dtypes (e.g. nullable Int64) are not covered by the fused engine
             series = df[col].dropna()
             if len(series) > 0:
                 Q1 = series.quantile(0.25)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Vectorized value-type classification
+Builds per-column histograms of the Python types held by object columns
+without looping over cells in Python
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+import datetime
+import decimal
+import warnings
+import numpy as np
+import pandas as pd
+
+# infer_dtype labels that guarantee every non-null value shares one category
+HOMOGENEOUS_LABELS = {
+    'string': 'string',
+    'bytes': 'bytes',
+    'integer': 'integer',
+    'floating': 'floating',
+    'decimal': 'decimal',
+    'complex': 'complex',
+    'boolean': 'boolean',
+    'datetime': 'datetime',
+    'datetime64': 'datetime',
+    'date': 'date',
+    'time': 'time',
+    'timedelta': 'timedelta',
+    'timedelta64': 'timedelta',
+    'period': 'period',
+    'interval': 'interval',
+}
+
+# Strings date-parsed per column; date parsing is the expensive part of classification
+STRING_CONTENT_SAMPLE = 10_000
+
+
+def _empty_sample() -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.uint64), np.empty(0, dtype=bool)
+
+
+def _bottom(sample: Tuple[np.ndarray, np.ndarray], size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """The ``size`` entries of a (hashes, values) pair with the smallest hashes."""
+    hashes, parsed = sample
+    if len(hashes) <= size:
+        return hashes, parsed
+    keep = np.argpartition(hashes, size - 1)[:size]
+    return hashes[keep], parsed[keep]
+
+
+def _with_date_counts(numeric: int, non_numeric: int, parsed: np.ndarray) -> Tuple[Dict[str, int], int]:
+    """string_content and string_content_sampled from the date flags of the sampled strings."""
+    sampled = len(parsed) if len(parsed) < non_numeric else 0
+    dates = int(round(parsed.mean() * non_numeric)) if sampled else int(parsed.sum())
+    content = {'numeric': numeric, 'datetime': dates, 'text': non_numeric - dates}
+    return {key: count for key, count in content.items() if count}, sampled
+
+
+@dataclass
+class TypeProfile:
+    """Value-type breakdown of one column."""
+
+    inferred_dtype: str
+    histogram: Dict[str, int] = field(default_factory=dict)
+    string_content: Dict[str, int] = field(default_factory=dict)
+    # Strings date-parsed when the datetime/text split of string_content was
+    # estimated from a sample; 0 when every count is exact
+    string_content_sampled: int = 0
+    # Row-label hashes of the date-parsed strings and whether each parsed
+    date_sample: Tuple[np.ndarray, np.ndarray] = field(default_factory=_empty_sample, repr=False, compare=False)
+
+    @property
+    def is_mixed(self) -> bool:
+        return len(self.histogram) > 1
+
+    def merge(self, other: 'TypeProfile') -> 'TypeProfile':
+        """Combine profiles of two chunks of the same column."""
+        if not self.histogram:
+            self.inferred_dtype = other.inferred_dtype
+        elif other.histogram and other.inferred_dtype != self.inferred_dtype:
+            self.inferred_dtype = 'mixed'
+        for key, count in other.histogram.items():
+            self.histogram[key] = self.histogram.get(key, 0) + count
+
+        non_numeric = sum(profile.string_content.get(key, 0) for profile in (self, other)
+                          for key in ('datetime', 'text'))
+        numeric = self.string_content.get('numeric', 0) + other.string_content.get('numeric', 0)
+        # The smallest row hashes overall are among each side's smallest, so
+        # chunked and whole-column classification date-parse the same rows
+        self.date_sample = _bottom(tuple(np.concatenate(parts) for parts in zip(self.date_sample, other.date_sample)),
+                                   STRING_CONTENT_SAMPLE)
+        self.string_content, self.string_content_sampled = _with_date_counts(numeric, non_numeric,
+                                                                             self.date_sample[1])
+        return self
+
+
+def _category(value_type: type) -> str:
+    """Map a Python type to its histogram category."""
+    if issubclass(value_type, (bool, np.bool_)):
+        return 'boolean'
+    if issubclass(value_type, (int, np.integer)):
+        return 'integer'
+    if issubclass(value_type, (float, np.floating)):
+        return 'floating'
+    if issubclass(value_type, str):
+        return 'string'
+    if issubclass(value_type, bytes):
+        return 'bytes'
+    if issubclass(value_type, decimal.Decimal):
+        return 'decimal'
+    if issubclass(value_type, (datetime.datetime, np.datetime64)):
+        return 'datetime'
+    if issubclass(value_type, datetime.date):
+        return 'date'
+    if issubclass(value_type, (datetime.timedelta, np.timedelta64)):
+        return 'timedelta'
+    return value_type.__name__
+
+
+_type_of = np.frompyfunc(type, 1, 1)
+
+
+def classify_string_content(strings: np.ndarray, labels: np.ndarray, sample_size: int = STRING_CONTENT_SAMPLE
+                            ) -> Tuple[Dict[str, int], int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Classify string values as numeric-like, date-like or free text.
+
+    Numeric-like strings are counted exactly with one vectorized coercion.
+    Of the rest, the ``sample_size`` whose row ``labels`` hash lowest are
+    date-parsed, each on its own (``format='mixed'``), and the datetime/text
+    split is scaled up from them. The sample depends only on the row labels,
+    so a column classified in chunks and merged gets the same counts.
+
+    Returns:
+        Tuple of (counts per content class, number of strings date-parsed
+        if the datetime/text split is a sampled estimate else 0, the date
+        sample as row-label hashes and parsed flags)
+    """
+    stripped = pd.Series(strings, dtype=object).str.strip()
+    numeric = pd.to_numeric(stripped, errors='coerce').notna().to_numpy()
+    rest = stripped[~numeric]
+
+    hashes, positions = _bottom((pd.util.hash_array(np.asarray(labels)[~numeric]), np.arange(len(rest))),
+                                sample_size)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parsed = pd.to_datetime(rest.iloc[positions], errors='coerce', format='mixed').notna().to_numpy()
+
+    content, sampled = _with_date_counts(int(numeric.sum()), len(rest), parsed)
+    return content, sampled, (hashes, parsed)
+
+
+def classify_series(series: pd.Series) -> TypeProfile:
+    """
+    Build the value-type histogram of a column.
+
+    Args:
+        series: Column to classify
+
+    Returns:
+        TypeProfile with counts per value category (nulls excluded)
+    """
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+
+    if series.dtype != object:
+        count = int(series.count())
+        if count == 0:
+            return TypeProfile(inferred_dtype=inferred)
+        category = {'b': 'boolean', 'i': 'integer', 'u': 'integer', 'f': 'floating',
+                    'c': 'complex', 'M': 'datetime', 'm': 'timedelta'}.get(series.dtype.kind, str(series.dtype))
+        return TypeProfile(inferred_dtype=inferred, histogram={category: count})
+
+    values = series.to_numpy()
+    present = pd.notna(values)
+    values, labels = values[present], series.index.to_numpy()[present]
+
+    if len(values) == 0:
+        return TypeProfile(inferred_dtype=inferred)
+
+    strings, string_labels = values, labels
+    if inferred in HOMOGENEOUS_LABELS:
+        # infer_dtype already proved every value has the same category
+        histogram = {HOMOGENEOUS_LABELS[inferred]: len(values)}
+    else:
+        # type() runs in a C ufunc loop; only the distinct types are mapped in Python
+        types = _type_of(values)
+        type_counts = pd.Series(types, dtype=object).value_counts(sort=False)
+        histogram = {}
+        string_types = []
+        for value_type, count in type_counts.items():
+            category = _category(value_type)
+            histogram[category] = histogram.get(category, 0) + int(count)
+            if category == 'string':
+                string_types.append(value_type)
+        is_string = np.isin(types, string_types)
+        strings, string_labels = values[is_string], labels[is_string]
+
+    string_content, sampled, sample = {}, 0, _empty_sample()
+    if histogram.get('string'):
+        string_content, sampled, sample = classify_string_content(strings, string_labels)
+
+    return TypeProfile(inferred_dtype=inferred, histogram=histogram, string_content=string_content,
+                       string_content_sampled=sampled, date_sample=sample)
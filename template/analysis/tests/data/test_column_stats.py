@@ -0,0 +1,60 @@
+"""Fused numeric aggregates must equal the pandas/numpy reductions they replace."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts" / "python"))
+
+from column_stats import compute_column_stats  # noqa: E402
+
+rng = np.random.default_rng(0)
+CASES = {
+    "floats": rng.normal(size=1001) * 1e3,
+    "floats with nulls": np.where(rng.random(500) < 0.3, np.nan, rng.normal(size=500)),
+    "large ints": rng.integers(-(2**62), 2**62, 1000),
+    "uint64": rng.integers(0, 2**64 - 1, 11, dtype=np.uint64),
+    "small ints": rng.integers(-5, 5, 300).astype(np.int8),
+    "constant": np.full(50, 3.3),
+    "near-constant": 1e15 + rng.integers(0, 3, 400) * 1e-1,
+    "signed zeros": rng.choice([0.0, -0.0, 1.0], 2001),
+    "infinity": np.array([1.0, np.inf, 2.0, 3.0]),
+    "one value": np.array([-0.0]),
+    "three values": np.array([1, 2, 4]),
+}
+
+
+def expected_stats(values: pd.Series) -> dict:
+    q1, q3 = (np.float64(q) for q in np.percentile(np.sort(values.to_numpy()), [25, 75]))
+    return {
+        "q1": q1,
+        "q3": q3,
+        "median": values.median(),
+        "mean": values.mean(),
+        "std": values.std(),
+        "skewness": values.skew(),
+        "kurtosis": values.kurtosis(),
+    }
+
+
+def assert_same(actual, expected) -> None:
+    """Equal value, type and sign of zero; NaN equals NaN."""
+    assert type(actual) is type(expected)
+    if np.isnan(expected):
+        assert np.isnan(actual)
+    else:
+        assert actual == expected and np.signbit(actual) == np.signbit(expected)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("name", list(CASES))
+def test_matches_pandas(name: str) -> None:
+    series = pd.Series(CASES[name])
+    stats = compute_column_stats(pd.DataFrame({"x": series}))[0]
+    for key, value in expected_stats(series.dropna()).items():
+        assert_same(getattr(stats, key), value)
@@ -0,0 +1,52 @@
+"""Streamed duplicate-row counts must match ``DataFrame.duplicated``."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "data" / ".justscripts"))
+
+from streaming import DuplicateTracker  # noqa: E402
+
+CASES = {
+    "signed zero": pd.DataFrame({"x": [0.0, -0.0, 1.0], "y": ["a", "a", "a"]}),
+    "large ints": pd.DataFrame({"id": [2**53, 2**53 + 1, 2**62 + 1, 2**62 + 2], "y": [1, 1, 1, 1]}),
+    "nulls": pd.DataFrame({"x": [1.5, np.nan, np.nan, 1.5], "y": ["a", None, np.nan, "a"]}),
+}
+
+
+def count_duplicates(chunks, budget: int | None, spill_dir: Path) -> int:
+    tracker = DuplicateTracker(memory_budget_bytes=budget, spill_dir=spill_dir)
+    try:
+        for chunk in chunks:
+            tracker.update(chunk)
+        return tracker.duplicates
+    finally:
+        tracker.close()
+
+
+@pytest.mark.parametrize("budget", [None, 1], ids=["in memory", "spilled"])
+@pytest.mark.parametrize("name", list(CASES))
+def test_matches_pandas(name: str, budget: int | None, tmp_path: Path) -> None:
+    """Whole frame, then one row per chunk."""
+    df = CASES[name]
+    expected = int(df.duplicated().sum())
+    assert count_duplicates([df], budget, tmp_path) == expected
+    chunks = [df.iloc[[i]] for i in range(len(df))]
+    assert count_duplicates(chunks, budget, tmp_path) == expected
+
+
+@pytest.mark.parametrize("budget", [None, 1], ids=["in memory", "spilled"])
+def test_chunks_parsed_as_different_dtypes(budget: int | None, tmp_path: Path) -> None:
+    """A column read as int/bool in one CSV chunk and float/object in another."""
+    whole = pd.DataFrame({"a": [1.0, 1.0, np.nan, np.nan], "b": [True, True, None, None]})
+    chunks = [
+        pd.DataFrame({"a": [1], "b": [True]}),
+        pd.DataFrame({"a": [1.0, np.nan, np.nan], "b": [True, None, None]}),
+    ]
+    assert count_duplicates(chunks, budget, tmp_path) == int(whole.duplicated().sum())
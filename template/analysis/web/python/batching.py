@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Micro-batching for model scoring.
+
+Concurrent requests are queued and coalesced into one scoring call as soon
+as either ``max_batch_size`` rows are waiting or the oldest request has
+waited ``max_wait_ms``. Results are fanned back out to each caller in order.
+
+With an ``InferenceExecutor`` the batcher waits for a free scoring slot
+before collecting the next batch, so up to ``max_concurrency`` batches are
+scored at once and, while all slots are busy, requests accumulate into
+fuller batches.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from executor import InferenceExecutor
+
+
+@dataclass
+class _Pending:
+    rows: List[Dict[str, Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Coalesce concurrent scoring requests into shared batches."""
+
+    def __init__(self, score: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 executor: Optional[InferenceExecutor] = None):
+        self.score = score
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batches = 0
+        self.rows_scored = 0
+        self._queue = None
+        self._arrived = None
+        self._carry = None
+        self._worker = None
+        self._scoring = set()
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._arrived = asyncio.Event()
+        self._carry = None
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for task in list(self._scoring):
+            task.cancel()
+        await asyncio.gather(*self._scoring, return_exceptions=True)
+
+    async def submit(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score ``rows`` as part of the next batch and return their predictions."""
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher.start() has not been called")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Pending(rows, future))
+        self._arrived.set()
+        return await future
+
+    async def _collect(self) -> List[_Pending]:
+        first, self._carry = self._carry, None
+        if first is None:
+            first = await self._queue.get()
+        batch, size = [first], len(first.rows)
+        deadline = first.enqueued_at + self.max_wait
+        while size < self.max_batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                continue
+            pending = self._queue.get_nowait()
+            # A request is never split; one that would overflow opens the next batch
+            if size + len(pending.rows) > self.max_batch_size:
+                self._carry = pending
+                break
+            batch.append(pending)
+            size += len(pending.rows)
+        return batch
+
+    async def _run(self):
+        while True:
+            if self.executor is None:
+                await self._score(await self._collect())
+                continue
+            await self.executor.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self.executor.release()
+                raise
+            task = asyncio.create_task(self._score(batch))
+            self._scoring.add(task)
+            task.add_done_callback(self._scored)
+
+    def _scored(self, task):
+        self._scoring.discard(task)
+        self.executor.release()
+
+    async def _score(self, batch: List[_Pending]):
+        # Requests whose caller went away (client disconnect or timeout) are not scored
+        batch = [pending for pending in batch if not pending.future.cancelled()]
+        if not batch:
+            return
+        rows = [row for pending in batch for row in pending.rows]
+        try:
+            # Scoring blocks on the H2O JVM, so keep it off the event loop
+            if self.executor is None:
+                predictions = await asyncio.to_thread(self.score, rows)
+            else:
+                predictions = await self.executor.call(self.score, rows)
+            if len(predictions) != len(rows):
+                raise RuntimeError(f"Scored {len(rows)} rows but got {len(predictions)} predictions")
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows_scored += len(rows)
+        start = 0
+        for pending in batch:
+            end = start + len(pending.rows)
+            if not pending.future.done():
+                pending.future.set_result(predictions[start:end])
+            start = end
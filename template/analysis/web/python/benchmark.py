@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the inference API.
+
+Fires ``--requests`` calls with ``--concurrency`` in flight and reports
+throughput and latency percentiles. Compare micro-batching against
+per-request scoring by starting the server twice:
+
+    PREDICT_MAX_BATCH_SIZE=1 uvicorn main:app --port 8080   # one frame per request
+    uvicorn main:app --port 8080                            # batched (default 64 rows / 5 ms)
+
+    python3 benchmark.py --url http://localhost:8080 --requests 2000 --concurrency 64
+    python3 benchmark.py --url http://localhost:8080 --batch 100   # /predict/batch
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the inference API.")
+    parser.add_argument("--url", default="http://localhost:8080", help="Server base URL")
+    parser.add_argument("--requests", type=int, default=1000, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    parser.add_argument("--batch", type=int, default=0,
+                        help="Rows per /predict/batch call (default: single-row /predict)")
+    parser.add_argument("--features", nargs="+", default=["feature1", "feature2"],
+                        help="Feature names to send")
+    return parser.parse_args()
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def make_row(features):
+    return {name: random.random() for name in features}
+
+
+async def run(args):
+    if args.batch:
+        endpoint = f"{args.url}/predict/batch"
+        payload = lambda: {"rows": [make_row(args.features) for _ in range(args.batch)]}
+    else:
+        endpoint = f"{args.url}/predict"
+        payload = lambda: make_row(args.features)
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(args.requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in remaining:
+            body = payload()
+            start = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=body)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def main():
+    args = parse_arguments()
+    latencies, errors, elapsed = asyncio.run(run(args))
+
+    if not latencies:
+        print(f"❌ All {errors} requests failed")
+        exit(1)
+
+    rows = len(latencies) * (args.batch or 1)
+    print(f"📊 {len(latencies)} requests ({errors} errors) in {elapsed:.2f}s, concurrency {args.concurrency}")
+    print(f"   throughput: {len(latencies) / elapsed:.1f} req/s, {rows / elapsed:.1f} rows/s")
+    print(f"   latency ms: p50 {percentile(latencies, 50) * 1000:.1f}, "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}, "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}, "
+          f"max {max(latencies) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Prediction cache.
+
+Predictions are cached per row under a hash of the canonical JSON of the
+row's features plus the model name and version, so a hot-swapped model
+never serves its predecessor's results; ``invalidate`` additionally frees
+the superseded entries. The in-process store is an LRU bounded by
+``max_entries`` whose entries expire after ``ttl_seconds``. Identical rows
+requested concurrently are scored once: later callers wait for the first.
+
+An optional shared backend (Redis, ``redis`` package) sits behind the
+in-process store so several uvicorn workers share each other's hits.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+Row = Dict[str, Any]
+
+
+class RedisBackend:
+    """Shared cache entries in Redis, expiring with the same TTL."""
+
+    def __init__(self, url: str, prefix: str = "predict:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError("A shared prediction cache needs redis: pip install redis")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        values = await self.client.mget([self.prefix + key for key in keys])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def put_many(self, items: List[Tuple[str, Any]], ttl_seconds: float):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items:
+                pipe.set(self.prefix + key, json.dumps(value), px=int(ttl_seconds * 1000))
+            await pipe.execute()
+
+
+class PredictionCache:
+    """Size-bounded LRU with TTL in front of model scoring."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0, backend: Optional[RedisBackend] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(model: str, version: str, row: Row) -> str:
+        features = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{model}\0{version}\0{features}".encode()).hexdigest()
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, model: str, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, model, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, model: Optional[str] = None):
+        """Drop the entries of ``model`` (all entries without one)."""
+        if model is None:
+            self._entries.clear()
+            return
+        for key in [key for key, (_, owner, _) in self._entries.items() if owner == model]:
+            del self._entries[key]
+
+    async def _get_shared(self, keys: List[str]) -> List[Optional[Any]]:
+        if self.backend is None or not keys:
+            return [None] * len(keys)
+        try:
+            return await self.backend.get_many(keys)
+        except Exception as e:
+            logger.warning("Shared prediction cache unavailable: %s", e)
+            return [None] * len(keys)
+
+    async def _put_shared(self, items: List[Tuple[str, Any]]):
+        if self.backend is None or not items:
+            return
+        try:
+            await self.backend.put_many(items, self.ttl_seconds)
+        except Exception as e:
+            logger.warning("Shared prediction cache unavailable: %s", e)
+
+    async def predict(self, model: str, version: str, rows: List[Row],
+                      score: Callable[[List[Row]], Awaitable[List[Any]]],
+                      current_version: Callable[[], str]) -> List[Any]:
+        """
+        Predictions for ``rows``, scoring only the rows not cached.
+
+        Results are stored only if ``current_version()`` still equals
+        ``version`` after scoring, so a swap during scoring cannot leave
+        entries of the old model behind.
+        """
+        keys = [self.key(model, version, row) for row in rows]
+        results: List[Optional[Any]] = [self._get_local(key) for key in keys]
+        self.hits += sum(result is not None for result in results)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        shared = await self._get_shared([keys[i] for i in missing])
+        for i, value in zip(missing, shared):
+            if value is not None:
+                results[i] = value
+                self.shared_hits += 1
+                self._put_local(model, keys[i], value)
+
+        # Rows nobody is scoring yet are scored here; the others wait for their scorer
+        to_score: Dict[str, Row] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        for i, result in enumerate(results):
+            if result is not None:
+                continue
+            self.misses += 1
+            key = keys[i]
+            if key in self._inflight:
+                waiting[key] = self._inflight[key]
+                self.coalesced += 1
+            elif key not in to_score:
+                to_score[key] = rows[i]
+                self._inflight[key] = asyncio.get_running_loop().create_future()
+
+        scored: Dict[str, Any] = {}
+        if to_score:
+            try:
+                predictions = await score(list(to_score.values()))
+                scored = dict(zip(to_score, predictions))
+            except BaseException as e:
+                for key in to_score:
+                    future = self._inflight.pop(key)
+                    future.set_exception(e if isinstance(e, Exception) else RuntimeError("Scoring was cancelled"))
+                    future.add_done_callback(lambda f: f.exception())  # waiters may be gone
+                raise
+            store = current_version() == version
+            for key, value in scored.items():
+                self._inflight.pop(key).set_result(value)
+                if store:
+                    self._put_local(model, key, value)
+            if store:
+                await self._put_shared(list(scored.items()))
+        for key, future in waiting.items():
+            scored[key] = await asyncio.shield(future)
+
+        return [result if result is not None else scored[key] for result, key in zip(results, keys)]
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            # Misses answered by a concurrent request's scoring instead of their own
+            'coalesced': self.coalesced,
+            'hit_rate': round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'shared_backend': self.backend is not None,
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Bounded execution of blocking model calls.
+
+Scoring runs on a dedicated thread pool of ``max_concurrency`` threads, so
+it neither blocks the event loop nor competes with other ``to_thread``
+work. Admission control caps the number of outstanding requests (queued
+or being scored): beyond ``max_queue`` of them, new requests are rejected
+at once with ``Overloaded`` instead of piling up behind a burst.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; the server should answer 503."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Thread pool with a concurrency limit and a bounded admission queue."""
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 256):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(1, max_queue)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.outstanding = 0
+        self.running = 0
+        self._pool = None
+        self._slots = None
+
+    def start(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="inference")
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @contextmanager
+    def admit(self):
+        """Hold an admission ticket for one request, or raise ``Overloaded``."""
+        if self.outstanding >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"{self.outstanding} requests already waiting for scoring")
+        self.outstanding += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.outstanding -= 1
+
+    async def acquire(self):
+        """Wait for a free scoring slot (pair with ``release``)."""
+        await self._slots.acquire()
+
+    def release(self):
+        self._slots.release()
+
+    async def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` on the pool; the caller must hold a slot."""
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.running -= 1
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Wait for a slot, then run ``fn(*args)`` on the pool."""
+        await self.acquire()
+        try:
+            return await self.call(fn, *args)
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'outstanding': self.outstanding,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+        }
@@ -1,16 +1,22 @@
 #!/usr/bin/env python3
 
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 import h2o
 import os
+import sys
 
-app = FastAPI()
-
-# Initialize H2O and load the pre-built model
-h2o.init()
-model_path = os.path.join(os.path.dirname(__file__), "model", "model.zip")
-model = h2o.import_mojo(model_path)  # Use h2o.load_model if not a MOJO
+sys.path.insert(0, os.path.dirname(__file__))
+from batching import MicroBatcher
+from cache import PredictionCache, RedisBackend
+from executor import InferenceExecutor, Overloaded
+from metrics import Metrics, SamplingProfiler, timed_route
+from models import ModelManager, ModelUnavailable
 
 
 class PredictRequest(BaseModel):
@@ -20,16 +26,211 @@ class PredictRequest(BaseModel):
     # Add more features as needed
 
 
+class BatchPredictRequest(BaseModel):
+    rows: List[PredictRequest]
+
+
+metrics = Metrics()
+
+
+def score_rows(model, rows, name=None):
+    """
+    Score many rows with a single H2O frame round-trip; with a model
+    ``name`` the stages and the batch are recorded in ``metrics``.
+    """
+    if name is None:
+        frame = h2o.H2OFrame(rows)
+        pred = model.predict(frame)
+        # Convert prediction to a serializable format
+        return pred.as_data_frame().to_dict(orient="records")
+    with metrics.stage_seconds.time(stage="frame"):
+        frame = h2o.H2OFrame(rows)
+    with metrics.stage_seconds.time(stage="predict"):
+        pred = model.predict(frame)
+    with metrics.stage_seconds.time(stage="convert"):
+        predictions = pred.as_data_frame().to_dict(orient="records")
+    metrics.record_batch(name, len(rows))
+    return predictions
+
+
+# H2O and the MOJOs in model/ load in the background; every *.zip is a named version
+fields = getattr(PredictRequest, "model_fields", None) or PredictRequest.__fields__
+models = ModelManager(
+    os.path.join(os.path.dirname(__file__), "model"),
+    score_rows,
+    warmup_rows=[{name: 0.0 for name in fields}],
+    default=os.environ.get("MODEL_DEFAULT", "model"),
+    poll_seconds=float(os.environ.get("MODEL_POLL_SECONDS", 5)),
+)
+
+# Scoring runs on its own bounded pool; requests beyond the queue depth get a 503
+executor = InferenceExecutor(
+    max_concurrency=int(os.environ.get("PREDICT_MAX_CONCURRENCY", 2)),
+    max_queue=int(os.environ.get("PREDICT_MAX_QUEUE", 256)),
+)
+# Requests not answered within this budget are dropped with a 503 (0 disables)
+request_timeout = float(os.environ.get("PREDICT_TIMEOUT_MS", 10000)) / 1000 or None
+max_batch_size = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", 64))
+
+# Optional prediction cache (PREDICT_CACHE_SIZE > 0), shared across workers through Redis
+cache = None
+if int(os.environ.get("PREDICT_CACHE_SIZE", 0)) > 0:
+    redis_url = os.environ.get("PREDICT_CACHE_REDIS_URL")
+    cache = PredictionCache(
+        max_entries=int(os.environ["PREDICT_CACHE_SIZE"]),
+        ttl_seconds=float(os.environ.get("PREDICT_CACHE_TTL_SECONDS", 60)),
+        backend=RedisBackend(redis_url) if redis_url else None,
+    )
+    models.listeners.append(cache.invalidate)
+
+metrics.gauge("inference_outstanding_requests", "Requests admitted and waiting for or in scoring",
+              lambda: executor.outstanding)
+metrics.gauge("inference_scoring_running", "Scoring calls running on the pool", lambda: executor.running)
+metrics.gauge("inference_rejected_requests", "Requests shed with a 503 since start",
+              lambda: executor.rejected + executor.timed_out)
+metrics.gauge("inference_model_ready", "1 once the default model is loaded", lambda: int(models.ready))
+if cache is not None:
+    metrics.gauge("inference_cache_entries", "Predictions held in the cache", lambda: cache.stats()["entries"])
+    metrics.gauge("inference_cache_hits", "Cache hits since start", lambda: cache.hits + cache.shared_hits)
+    metrics.gauge("inference_cache_misses", "Cache misses since start", lambda: cache.misses)
+
+# Optional sampling profiler: PREDICT_PROFILE_HZ > 0 samples all threads; the collapsed
+# stacks are served on /profile and written to PREDICT_PROFILE_OUTPUT on shutdown
+profile_hz = float(os.environ.get("PREDICT_PROFILE_HZ", 0))
+profiler = SamplingProfiler(profile_hz) if profile_hz > 0 else None
+
+# One batcher per model version name; each batch scores with the version
+# being served when it runs, so a hot swap takes effect between batches
+batchers = {}
+
+
+async def batcher_for(name):
+    if name not in batchers:
+        batcher = MicroBatcher(
+            lambda rows: score_rows(models.get(name).model, rows, name),
+            max_batch_size=max_batch_size,
+            max_wait_ms=float(os.environ.get("PREDICT_MAX_WAIT_MS", 5)),
+            executor=executor,
+        )
+        await batcher.start()
+        batchers[name] = batcher
+    return batchers[name]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if profiler is not None:
+        profiler.start()
+    executor.start()
+    await models.start()
+    yield
+    await models.stop()
+    for batcher in batchers.values():
+        await batcher.stop()
+    executor.stop()
+    if profiler is not None:
+        profiler.stop()
+        profiler.dump(os.environ.get("PREDICT_PROFILE_OUTPUT", "profile.folded"))
+
+
+app = FastAPI(lifespan=lifespan)
+# Every route records its latency, status, in-flight count and parse/respond stages
+app.router.route_class = timed_route(metrics)
+
+
+def resolve_model(name: Optional[str]) -> str:
+    """Name of a loaded model version, or the matching HTTP error."""
+    try:
+        return models.get(name).name
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+
+
+async def admitted(score, *args):
+    """Await ``score(*args)`` under admission control and the request deadline."""
+    try:
+        with executor.admit():
+            return await asyncio.wait_for(score(*args), request_timeout)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(int(e.retry_after))})
+    except asyncio.TimeoutError:
+        executor.timed_out += 1
+        raise HTTPException(status_code=503, detail="Timed out waiting for scoring capacity",
+                            headers={"Retry-After": "1"})
+
+
+async def score_admitted(name, rows):
+    # Large client batches skip the window and are scored as one frame
+    if len(rows) >= max_batch_size:
+        return await admitted(executor.run, score_rows, models.get(name).model, rows, name)
+    batcher = await batcher_for(name)
+    return await admitted(batcher.submit, rows)
+
+
+def served_version(name):
+    try:
+        return models.get(name).version
+    except (KeyError, ModelUnavailable):
+        return None
+
+
+async def predict_rows(name, rows):
+    """Predictions for ``rows``, served from the cache where possible."""
+    if cache is None:
+        return await score_admitted(name, rows)
+    return await cache.predict(name, served_version(name), rows,
+                               lambda missing: score_admitted(name, missing),
+                               lambda: served_version(name))
+
+
 @app.post("/predict")
-async def predict(request: PredictRequest):
-    data_dict = request.dict()
-    frame = h2o.H2OFrame([data_dict])
-    pred = model.predict(frame)
-    # Convert prediction to a serializable format
-    result = pred.as_data_frame().to_dict(orient="records")
+async def predict(request: PredictRequest, model: Optional[str] = None):
+    name = resolve_model(model)
+    result = await predict_rows(name, [request.dict()])
     return {"prediction": result}
 
 
+@app.post("/predict/batch")
+async def predict_batch(request: BatchPredictRequest, model: Optional[str] = None):
+    name = resolve_model(model)
+    rows = [row.dict() for row in request.rows]
+    if not rows:
+        return {"predictions": []}
+    return {"predictions": await predict_rows(name, rows)}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the default model is loaded and warmed, 503 before."""
+    return JSONResponse(models.status(), status_code=200 if models.ready else 503)
+
+
+@app.get("/models")
+async def list_models():
+    return models.status()
+
+
+@app.get("/cache")
+async def cache_stats():
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/profile", response_class=PlainTextResponse)
+async def profile(reset: bool = False):
+    """Collapsed stacks for flamegraph.pl / speedscope (PREDICT_PROFILE_HZ > 0)."""
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler disabled; set PREDICT_PROFILE_HZ")
+    return PlainTextResponse(profiler.collapsed(reset=reset))
+
+
 @app.get("/")
 async def root():
     return {"message": "H2O Model Inference API is running."}
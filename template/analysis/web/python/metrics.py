@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Latency and resource instrumentation for the inference API.
+
+Requests are timed per stage so optimisation can go where the time goes:
+
+    parse     request received -> endpoint called (body read, JSON, pydantic)
+    frame     ``h2o.H2OFrame`` construction
+    predict   ``model.predict`` (the JVM round-trip)
+    convert   ``as_data_frame()`` and conversion to records
+    respond   endpoint returned -> response built (serialisation)
+
+Together with request and batch counts, in-flight requests and process
+memory/CPU they are rendered in the Prometheus text format by ``render``;
+no client library is needed. Metrics are per process: with several uvicorn
+workers, each scrape sees the worker that answered it.
+
+``SamplingProfiler`` samples the stacks of every thread at a fixed rate and
+keeps them in the collapsed format read by ``flamegraph.pl`` and speedscope.
+"""
+
+import contextvars
+import functools
+import inspect
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally labelled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, Labels, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, or is read from ``collect`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, collect: Optional[Callable[[], float]] = None):
+        super().__init__(name, help)
+        self.collect = collect
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    def samples(self):
+        if self.collect is not None:
+            value = self.collect()
+            return [] if value is None else [(self.name, (), value)]
+        return super().samples()
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        result = []
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                result.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative))
+            result.append((f"{self.name}_sum", key, values[-2]))
+            result.append((f"{self.name}_count", key, values[-1]))
+        return result
+
+
+def _process_status() -> Dict[str, int]:
+    # Linux exposes current RSS/VM sizes; elsewhere only the peak RSS is known
+    status = {}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmSize", "VmHWM"):
+                    status[key] = int(value.split()[0]) * 1024
+                elif key == "Threads":
+                    status[key] = int(value)
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        status["VmHWM"] = peak if sys.platform == "darwin" else peak * 1024
+        status["Threads"] = threading.active_count()
+    return status
+
+
+class Metrics:
+    """Registry of the server's metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._metrics = []
+        self.requests = self.add(Counter("inference_requests_total", "HTTP requests by route and status code"))
+        self.request_seconds = self.add(Histogram("inference_request_duration_seconds",
+                                                  "End-to-end request latency by route"))
+        self.in_flight = self.add(Gauge("inference_requests_in_flight", "Requests being handled"))
+        self.stage_seconds = self.add(Histogram("inference_stage_duration_seconds",
+                                                "Latency of each request or batch stage"))
+        self.batches = self.add(Counter("inference_batches_total", "Scoring calls (one H2O frame each) by model"))
+        self.batch_rows = self.add(Histogram("inference_batch_rows", "Rows per scoring call", SIZE_BUCKETS))
+        self.rows = self.add(Counter("inference_rows_scored_total", "Rows scored by model"))
+        self.add(Gauge("process_resident_memory_bytes", "Resident set size",
+                       lambda: _process_status().get("VmRSS")))
+        self.add(Gauge("process_virtual_memory_bytes", "Virtual memory size",
+                       lambda: _process_status().get("VmSize")))
+        self.add(Gauge("process_resident_memory_max_bytes", "Peak resident set size",
+                       lambda: _process_status().get("VmHWM")))
+        self.add(Gauge("process_threads", "OS threads", lambda: _process_status().get("Threads")))
+        cpu = self.add(Gauge("process_cpu_seconds_total", "User and system CPU time", time.process_time))
+        cpu.kind = "counter"
+        self.add(Gauge("process_start_time_seconds", "Start time since the epoch", lambda: self.started_at))
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, collect: Callable[[], float]) -> Gauge:
+        """Register a gauge read from ``collect`` at scrape time."""
+        return self.add(Gauge(name, help, collect))
+
+    def record_batch(self, model: str, rows: int):
+        self.batches.inc(model=model)
+        self.rows.inc(rows, model=model)
+        self.batch_rows.observe(rows)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# perf_counter marks of the request being handled: received, entered, returned
+_marks: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("request_marks", default=None)
+
+
+def timed_route(metrics: Metrics):
+    """
+    ``APIRoute`` class recording latency, status, in-flight count and the
+    parse/respond stages of every request; use as ``route_class``.
+    """
+
+    class TimedRoute(APIRoute):
+        def __init__(self, path: str, endpoint: Callable, **kwargs):
+            if inspect.iscoroutinefunction(endpoint):
+                endpoint = self._marked(endpoint)
+            super().__init__(path, endpoint, **kwargs)
+
+        @staticmethod
+        def _marked(endpoint: Callable) -> Callable:
+            # Mark entry and exit of async endpoints; the wrapper keeps their signature
+            @functools.wraps(endpoint)
+            async def marked(*args, **kwargs):
+                marks = _marks.get()
+                if marks is not None:
+                    marks["entered"] = time.perf_counter()
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    if marks is not None:
+                        marks["returned"] = time.perf_counter()
+
+            return marked
+
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+            route = self.path
+
+            async def timed_handler(request: Request):
+                marks = {"received": time.perf_counter()}
+                token = _marks.set(marks)
+                metrics.in_flight.inc()
+                status = 500
+                try:
+                    response = await handler(request)
+                    status = response.status_code
+                    return response
+                except HTTPException as e:
+                    status = e.status_code
+                    raise
+                except RequestValidationError:
+                    status = 422
+                    raise
+                finally:
+                    done = time.perf_counter()
+                    metrics.in_flight.dec()
+                    _marks.reset(token)
+                    metrics.requests.inc(route=route, code=status)
+                    metrics.request_seconds.observe(done - marks["received"], route=route)
+                    if "entered" in marks:
+                        metrics.stage_seconds.observe(marks["entered"] - marks["received"], stage="parse")
+                    if "returned" in marks and status < 400:
+                        metrics.stage_seconds.observe(done - marks["returned"], stage="respond")
+
+            return timed_handler
+
+    return TimedRoute
+
+
+class SamplingProfiler:
+    """
+    Sample every thread's stack ``hz`` times a second into collapsed stacks
+    (``thread;outer;...;inner count`` per line) for flamegraph tools.
+    """
+
+    def __init__(self, hz: float = 100.0):
+        self.interval = 1.0 / max(hz, 0.1)
+        self.samples = 0
+        self._stacks: StackCounter = StackCounter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            sampled = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)).replace(";", ":"))
+                sampled.append(";".join(reversed(stack)))
+            with self._lock:
+                self._stacks.update(sampled)
+                self.samples += 1
+
+    def collapsed(self, reset: bool = False) -> str:
+        with self._lock:
+            stacks = self._stacks
+            if reset:
+                self._stacks = StackCounter()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.collapsed())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Background model loading, warm-up and hot reload.
+
+Every ``*.zip`` MOJO in the model directory is served as a named version
+(``model/model.zip`` is ``model``, ``model/churn-v2.zip`` is ``churn-v2``).
+Nothing is loaded at import time: the server accepts connections at once
+while H2O starts and the models are imported in a background thread.
+
+The directory is polled; a new or changed file is loaded once its size and
+mtime have stopped changing, scored on warm-up rows so the first real
+request does not pay for JIT and frame setup, and only then swapped in.
+Requests keep using the previous version until the swap, which is a
+single dictionary rebinding.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class ModelUnavailable(Exception):
+    """Raised when a requested model version is not loaded (yet)."""
+
+
+@dataclass
+class ModelVersion:
+    name: str
+    path: Path
+    model: Any
+    version: str
+    load_seconds: float
+    warmup_seconds: float
+    loaded_at: float = field(default_factory=time.time)
+
+    def info(self):
+        return {
+            'path': str(self.path),
+            'version': self.version,
+            'load_seconds': round(self.load_seconds, 3),
+            'warmup_seconds': round(self.warmup_seconds, 3),
+            'loaded_at': self.loaded_at,
+        }
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+class ModelManager:
+    """Load, warm and hot-swap the MOJOs of one directory."""
+
+    def __init__(self, model_dir: str, score: Callable[[Any, List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 warmup_rows: Optional[List[Dict[str, Any]]] = None,
+                 default: str = "model", poll_seconds: float = 5.0):
+        self.model_dir = Path(model_dir)
+        self.score = score
+        self.warmup_rows = warmup_rows or []
+        self.default = default
+        self.poll_seconds = poll_seconds
+        self.started_at = time.perf_counter()
+        self.cold_start_seconds = None
+        self.last_swap = None
+        self.errors: Dict[str, str] = {}
+        # Called with a model name whenever the version served under it changes or goes away
+        self.listeners: List[Callable[[str], None]] = []
+        self._versions: Dict[str, ModelVersion] = {}
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._retired: List[ModelVersion] = []
+        self._h2o_ready = False
+        self._watcher = None
+
+    async def start(self):
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    @property
+    def ready(self) -> bool:
+        return self.default in self._versions
+
+    def get(self, name: Optional[str] = None) -> ModelVersion:
+        name = name or self.default
+        version = self._versions.get(name)
+        if version is None:
+            if name in self._seen or name == self.default:
+                raise ModelUnavailable(f"Model '{name}' is not loaded yet")
+            raise KeyError(name)
+        return version
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'default': self.default,
+            'cold_start_seconds': self.cold_start_seconds,
+            'last_swap': self.last_swap,
+            'models': {name: version.info() for name, version in sorted(self._versions.items())},
+            'errors': dict(self.errors),
+        }
+
+    def _notify(self, name: str):
+        for listener in self.listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.warning("Model change listener failed for %s: %s", name, e)
+
+    def _warmup_rows(self) -> List[Dict[str, Any]]:
+        # model/warmup.json (a list of feature rows) overrides the built-in sample
+        warmup_file = self.model_dir / "warmup.json"
+        if warmup_file.exists():
+            with open(warmup_file, 'r') as f:
+                return json.load(f)
+        return self.warmup_rows
+
+    def _load(self, name: str, path: Path) -> ModelVersion:
+        """Import and warm one MOJO (blocking; runs in a worker thread)."""
+        import h2o
+
+        if not self._h2o_ready:
+            h2o.init()
+            self._h2o_ready = True
+        start = time.perf_counter()
+        model = h2o.import_mojo(str(path.resolve()))  # Use h2o.load_model if not a MOJO
+        loaded = time.perf_counter()
+        rows = self._warmup_rows()
+        if rows:
+            predictions = self.score(model, rows)
+            if len(predictions) != len(rows):
+                raise RuntimeError(f"Warm-up scored {len(rows)} rows but got {len(predictions)} predictions")
+        warmed = time.perf_counter()
+        return ModelVersion(name=name, path=path, model=model, version=_file_hash(path),
+                            load_seconds=loaded - start, warmup_seconds=warmed - loaded)
+
+    def _scan(self) -> Dict[str, Tuple[Path, Tuple[int, int]]]:
+        found = {}
+        if self.model_dir.is_dir():
+            for path in sorted(self.model_dir.glob("*.zip")):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                found[path.stem] = (path, (stat.st_mtime_ns, stat.st_size))
+        return found
+
+    def _release_retired(self):
+        # Superseded models are dropped from the H2O cluster one poll after the
+        # swap, once batches that picked them up before the swap have finished
+        if not self._retired:
+            return
+        import h2o
+
+        for old in self._retired:
+            try:
+                h2o.remove(old.model)
+            except Exception as e:
+                logger.warning("Could not remove model %s (%s) from H2O: %s", old.name, old.version, e)
+        self._retired = []
+
+    async def _swap_in(self, name: str, path: Path):
+        detected = time.perf_counter()
+        try:
+            version = await asyncio.to_thread(self._load, name, path)
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.error("Loading model %s from %s failed: %s", name, path, e)
+            return
+        self.errors.pop(name, None)
+        old = self._versions.get(name)
+        if old is not None and old.version == version.version:
+            # Touched but unchanged: keep the warm model already serving
+            self._retired.append(version)
+            return
+        self._versions = {**self._versions, name: version}
+        if old is not None:
+            self._retired.append(old)
+            self._notify(name)
+        swap_seconds = time.perf_counter() - detected
+        self.last_swap = {'model': name, 'version': version.version, 'previous': old.version if old else None,
+                          'swap_seconds': round(swap_seconds, 3), 'at': time.time()}
+        if self.cold_start_seconds is None and name == self.default:
+            self.cold_start_seconds = round(time.perf_counter() - self.started_at, 3)
+            logger.info("Model %s ready after %.2fs cold start", name, self.cold_start_seconds)
+        logger.info("Serving model %s version %s (load %.2fs, warm-up %.2fs, swap %.2fs)",
+                    name, version.version, version.load_seconds, version.warmup_seconds, swap_seconds)
+
+    async def _watch(self):
+        pending: Dict[str, Tuple[int, int]] = {}
+        first_scan = True
+        while True:
+            self._release_retired()
+            found = self._scan()
+            # The default model first, so readiness does not wait on the others
+            for name in sorted(found, key=lambda name: name != self.default):
+                path, signature = found[name]
+                if self._seen.get(name) == signature:
+                    continue
+                # Load only once size and mtime hold still across two polls (copy finished);
+                # files present at startup are loaded straight away
+                if first_scan or pending.get(name) == signature:
+                    pending.pop(name, None)
+                    self._seen[name] = signature
+                    await self._swap_in(name, path)
+                else:
+                    pending[name] = signature
+            for name in set(self._versions) - set(found):
+                # Removed from disk: stop serving it
+                self._retired.append(self._versions[name])
+                self._versions = {key: value for key, value in self._versions.items() if key != name}
+                self._seen.pop(name, None)
+                self._notify(name)
+                logger.info("Model %s removed", name)
+            first_scan = False
+            await asyncio.sleep(self.poll_seconds)
@@ -8,3 +8,36 @@ uvicorn app.main:app --reload --host 0.0.0.0 --port 8080
 curl -X POST -H "Content-Type: application/json" \
   -d '{"feature1": 1.0, "feature2": 2.0}' \
   $(waypoint url)/predict
+
+curl -X POST -H "Content-Type: application/json" \
+  -d '{"rows": [{"feature1": 1.0, "feature2": 2.0}, {"feature1": 3.0, "feature2": 4.0}]}' \
+  $(waypoint url)/predict/batch
+
+# Load benchmark: compare PREDICT_MAX_BATCH_SIZE=1 (one frame per request) against the default
+python3 python/benchmark.py --url http://localhost:8080 --requests 2000 --concurrency 64
+
+# Admission control: PREDICT_MAX_CONCURRENCY scoring threads, at most PREDICT_MAX_QUEUE
+# outstanding requests (503 + Retry-After beyond that), PREDICT_TIMEOUT_MS per request
+PREDICT_MAX_CONCURRENCY=2 PREDICT_MAX_QUEUE=256 PREDICT_TIMEOUT_MS=10000 \
+  uvicorn app.main:app --host 0.0.0.0 --port 8080
+
+# Models load in the background: poll readiness, list versions with load/warm-up/swap timings
+curl $(waypoint url)/ready
+curl $(waypoint url)/models
+# Every model/*.zip is served by name; copying a new file in hot-swaps it after warm-up
+curl -X POST -H "Content-Type: application/json" \
+  -d '{"feature1": 1.0, "feature2": 2.0}' \
+  "$(waypoint url)/predict?model=churn-v2"
+
+# Prediction cache: LRU of PREDICT_CACHE_SIZE rows with PREDICT_CACHE_TTL_SECONDS expiry,
+# keyed by features + model version; PREDICT_CACHE_REDIS_URL shares hits across workers
+PREDICT_CACHE_SIZE=100000 PREDICT_CACHE_TTL_SECONDS=60 uvicorn app.main:app --host 0.0.0.0 --port 8080 --workers 4
+curl $(waypoint url)/cache
+
+# Instrumentation: Prometheus metrics with per-stage latency (parse, frame, predict,
+# convert, respond), request/batch counts, in-flight requests and process memory
+curl $(waypoint url)/metrics
+# Sampling profiler: PREDICT_PROFILE_HZ samples per second of every thread, as collapsed
+# stacks on /profile and in PREDICT_PROFILE_OUTPUT at shutdown
+PREDICT_PROFILE_HZ=100 PREDICT_PROFILE_OUTPUT=profile.folded uvicorn app.main:app --host 0.0.0.0 --port 8080
+curl -s $(waypoint url)/profile > profile.folded && flamegraph.pl profile.folded > profile.svg
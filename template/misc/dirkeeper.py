@@ -10,6 +10,8 @@ import sys
 import argparse
 import datetime
 import getpass
+import json
+import time
 from pathlib import Path
 
 def parse_arguments():
@@ -23,31 +25,59 @@ def parse_arguments():
         default=".",
         help="Target directory (defaults to current directory)"
     )
+    parser.add_argument(
+        "-n", "--dry-run",
+        action="store_true",
+        help="Only report where .gitkeep files would be added"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print a machine-readable JSON summary instead of the log"
+    )
     return parser.parse_args()
 
-def is_dir_effectively_empty(directory):
+def walk_effectively_empty(root):
     """
-    Check if a directory is empty or only contains .gitkeep files and empty directories.
-    """
-    # Skip .git directories
-    if ".git" in directory.parts:
-        return False
-
-    # Check contents
-    has_real_content = False
-    for item in directory.iterdir():
-        if item.is_file() and item.name != ".gitkeep":
-            has_real_content = True
-            break
-        elif item.is_dir():
-            # Recursively check if subdirectory has real content
-            if not is_dir_effectively_empty(item):
-                has_real_content = True
-                break
-
-    return not has_real_content
+    Post-order walk yielding (path, effectively_empty, has_gitkeep, has_entries).
 
-def add_gitkeep_files(target_dir):
+    A directory is effectively empty when nothing in its subtree but
+    .gitkeep files and directories. Every directory is listed once with
+    os.scandir; each child's result is consumed by its parent and then
+    dropped, so memory stays proportional to the open part of the tree.
+    .git directories and symlinks count as content and are not entered.
+    """
+    empty = {}
+    pending = {}
+    stack = [(root, False)]
+    while stack:
+        path, listed = stack.pop()
+        if not listed:
+            subdirs, has_content, has_gitkeep, has_entries = [], False, False, False
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        has_entries = True
+                        if entry.name == ".git":
+                            has_content = True
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name == ".gitkeep" and not entry.is_symlink():
+                            has_gitkeep = True
+                        else:
+                            has_content = True
+            except PermissionError:
+                has_content = True
+            pending[path] = (subdirs, has_content, has_gitkeep, has_entries)
+            stack.append((path, True))
+            stack.extend((subdir, False) for subdir in subdirs)
+        else:
+            subdirs, has_content, has_gitkeep, has_entries = pending.pop(path)
+            children_empty = [empty.pop(subdir) for subdir in subdirs]
+            empty[path] = not has_content and all(children_empty)
+            yield path, empty[path], has_gitkeep, has_entries
+
+def add_gitkeep_files(target_dir, dry_run=False, as_json=False):
     """Add .gitkeep files to empty directories."""
     target_path = Path(target_dir).resolve()
 
@@ -55,53 +85,57 @@ def add_gitkeep_files(target_dir):
         print(f"Error: Directory '{target_dir}' does not exist.")
         sys.exit(1)
 
-    print(f"Adding .gitkeep files to empty directories in: {target_path}")
-    print(f"Started at: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-    print(f"Running as: {getpass.getuser()}")
-    print("-" * 40)
+    log = (lambda message: None) if as_json else print
+    started = time.perf_counter()
+    log(f"Adding .gitkeep files to empty directories in: {target_path}" + (" (dry run)" if dry_run else ""))
+    log(f"Started at: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+    log(f"Running as: {getpass.getuser()}")
+    log("-" * 40)
 
-    added_count = 0
+    created = []
     existing_count = 0
-
-    # Process all directories
-    for root, dirs, files in os.walk(target_path, topdown=True):
-        # Skip .git directories
-        dirs[:] = [d for d in dirs if d != ".git"]
-
-        path = Path(root)
-
-        # Check if directory is empty
-        if len(files) == 0 and len(dirs) == 0:
-            gitkeep_path = path / ".gitkeep"
-            if gitkeep_path.exists():
-                print(f"EXISTING: {gitkeep_path}")
-                existing_count += 1
-            else:
-                gitkeep_path.touch()
-                print(f"CREATED:  {gitkeep_path}")
-                added_count += 1
-
-    # Second pass for directories that contain only .gitkeep files and empty subdirectories
-    for directory in sorted(target_path.glob("**/*")):
-        if directory.is_dir() and ".git" not in directory.parts:
-            gitkeep_path = directory / ".gitkeep"
-
-            # If directory doesn't have a .gitkeep and is effectively empty
-            if not gitkeep_path.exists() and is_dir_effectively_empty(directory):
-                gitkeep_path.touch()
-                print(f"CREATED:  {gitkeep_path} (dir with only empty subdirs)")
-                added_count += 1
+    scanned = 0
+    root = str(target_path)
+
+    # Every effectively empty directory gets a .gitkeep; the target itself
+    # only when it is completely empty
+    for path, effectively_empty, has_gitkeep, has_entries in walk_effectively_empty(root):
+        scanned += 1
+        if not effectively_empty or (path == root and has_entries):
+            continue
+        gitkeep_path = os.path.join(path, ".gitkeep")
+        if has_gitkeep:
+            existing_count += 1
+            continue
+        if not dry_run:
+            Path(gitkeep_path).touch()
+        log(f"{'WOULD CREATE' if dry_run else 'CREATED'}:  {gitkeep_path}")
+        created.append(gitkeep_path)
+
+    elapsed = time.perf_counter() - started
+    if as_json:
+        print(json.dumps({
+            "directory": root,
+            "dry_run": dry_run,
+            "directories_scanned": scanned,
+            "added": len(created),
+            "existing": existing_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "added_paths": created,
+        }, indent=2))
+        return
 
     print("-" * 40)
     print("Summary:")
-    print(f"- Added {added_count} .gitkeep files")
+    print(f"- {'Would add' if dry_run else 'Added'} {len(created)} .gitkeep files")
     print(f"- Found {existing_count} existing .gitkeep files")
+    print(f"- Scanned {scanned} directories in {elapsed:.2f}s")
     print(f"Completed at: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
 
 def main():
     """Main function."""
     args = parse_arguments()
-    add_gitkeep_files(args.directory)
+    add_gitkeep_files(args.directory, dry_run=args.dry_run, as_json=args.json)
 
 if __name__ == "__main__":
     main()
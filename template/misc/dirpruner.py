@@ -7,34 +7,12 @@ USAGE: ./pbin/dirpruner.py data
 
 import os
 import sys
-from functools import reduce
-from typing import List, Callable
+from typing import List
 import argparse
 import shutil
 import yaml
 
 
-def list_directory_contents(directory: str) -> List[str]:
-    """Return full paths of all files and directories in the given directory."""
-    try:
-        return [os.path.join(directory, item) for item in os.listdir(directory)]
-    except (PermissionError, FileNotFoundError):
-        return []
-
-
-def is_directory(path: str) -> bool:
-    """Check if a path points to a directory."""
-    return os.path.isdir(path)
-
-
-def should_prune(directory: str) -> bool:
-    """Check if a directory contains only a .gitkeep file."""
-    contents = list_directory_contents(directory)
-    return (len(contents) == 1 and
-            os.path.isfile(contents[0]) and
-            os.path.basename(contents[0]) == '.gitkeep')
-
-
 def remove_file(file_path: str) -> bool:
     """Remove a file and return True if successful."""
     try:
@@ -86,52 +64,58 @@ def force_delete_directory(directory: str, keep_folders: set):
         return False
 
 
-def prune_directory(directory: str, dryrun: bool = False, keep_folders: set = None) -> bool:
-    """Remove .gitkeep file and its containing directory if it should be pruned. If dryrun, only print and do not delete."""
-    abs_dir = os.path.abspath(directory)
-    if keep_folders and abs_dir in keep_folders:
-        print(f"[KEEP] Skipping prune for: {directory}")
-        return False
-    if not should_prune(directory):
-        return False
-
-    if dryrun:
-        print(f"[DRYRUN] Would prune: {directory}")
+def is_prunable(entries: List[str], pruned_children: int) -> bool:
+    """
+    Decide prunability from what is left in a directory once its pruned
+    subdirectories are gone: only a .gitkeep file, or nothing at all when
+    pruning its children is what emptied it.
+    """
+    if entries == ['.gitkeep']:
         return True
-
-    gitkeep_path = os.path.join(directory, '.gitkeep')
-    return remove_file(gitkeep_path) and remove_directory(directory)
-
-
-def get_all_subdirectories(base_dir: str) -> List[str]:
-    """Recursively get all subdirectories in a directory."""
-    if not is_directory(base_dir):
-        return []
-
-    # Get immediate subdirectories as a list (not a filter object)
-    subdirs = [item for item in list_directory_contents(base_dir) if is_directory(item)]
-
-    # Recursively get all subdirectories
-    all_subdirs = list(subdirs)
-    for subdir in subdirs:
-        all_subdirs.extend(get_all_subdirectories(subdir))
-
-    return all_subdirs
+    return not entries and pruned_children > 0
+
+
+def prune_tree(base_dir: str, dryrun: bool = False, keep_folders: set = None) -> List[str]:
+    """
+    Prune one tree bottom-up in a single pass and return the pruned directories.
+
+    Every directory is listed once by os.walk (scandir underneath, so entry
+    types come from the cached DirEntry without extra stat calls) and is
+    decided after all of its children, which lets pruning cascade to
+    parents that become empty. Symlinks are never followed and count as
+    content. In dryrun mode the cascade is simulated without deleting.
+    """
+    keep_folders = keep_folders or set()
+    pruned = set()
+    order = []
+    for dirpath, dirnames, filenames in os.walk(base_dir, topdown=False):
+        if dirpath == base_dir:
+            continue
+        kept_dirs = [name for name in dirnames if os.path.join(dirpath, name) not in pruned]
+        if not is_prunable(kept_dirs + filenames, len(dirnames) - len(kept_dirs)):
+            continue
+        if os.path.abspath(dirpath) in keep_folders:
+            print(f"[KEEP] Skipping prune for: {dirpath}")
+            continue
+
+        if dryrun:
+            print(f"[DRYRUN] Would prune: {dirpath}")
+        else:
+            if filenames and not remove_file(os.path.join(dirpath, '.gitkeep')):
+                continue
+            if not remove_directory(dirpath):
+                continue
+        pruned.add(dirpath)
+        order.append(dirpath)
+    return order
 
 
 def prune_directories(directories: List[str], dryrun: bool = False, keep_folders: set = None) -> List[str]:
     """Prune all eligible subdirectories and return a list of pruned directories. If dryrun, only print."""
-    all_subdirs = reduce(
-        lambda acc, dir: acc + get_all_subdirectories(dir),
-        directories,
-        []
-    )
-    all_subdirs.sort(key=lambda x: x.count(os.sep), reverse=True)
-    pruned = filter(
-        lambda subdir: prune_directory(subdir, dryrun=dryrun, keep_folders=keep_folders),
-        all_subdirs
-    )
-    return list(pruned)
+    pruned = []
+    for directory in directories:
+        pruned.extend(prune_tree(directory, dryrun=dryrun, keep_folders=keep_folders))
+    return pruned
 
 
 def parse_args():